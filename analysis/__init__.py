@@ -0,0 +1,7 @@
+"""Moonshot research scripts.
+
+Each module also runs standalone (`python analysis/<script>.py`): sibling
+imports are package-relative, with a plain-name fallback when there is no
+package, so importing `analysis` leaves `sys.path` alone. Nothing heavy is
+imported at package import time.
+"""
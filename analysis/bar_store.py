@@ -0,0 +1,91 @@
+"""Persistent per-ticker daily bar store for the micro-cap screen.
+
+Keeps the handful of per-ticker fields the screen needs (dollar volume,
+absolute open→close move, close) for every grouped-daily session already
+downloaded, so a rerun only fetches the days it has not seen yet. Backed by a
+single SQLite file; `fetched_days` also remembers dates that came back empty
+(weekends/holidays) so they are not re-requested either.
+"""
+from __future__ import annotations
+
+import math
+import pathlib
+import sqlite3
+from typing import Iterable
+
+BAR_COLUMNS = ["day", "ticker", "dollar_volume", "move", "close"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_bars (
+    day TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    dollar_volume REAL NOT NULL,
+    move REAL,
+    close REAL NOT NULL,
+    PRIMARY KEY (day, ticker)
+);
+CREATE TABLE IF NOT EXISTS fetched_days (
+    day TEXT PRIMARY KEY,
+    row_count INTEGER NOT NULL,
+    settled INTEGER NOT NULL
+);
+"""
+
+
+class DailyBarStore:
+    def __init__(self, path: pathlib.Path | str) -> None:
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "DailyBarStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def settled_day(self, day: str) -> int | None:
+        """Return the stored row count for a settled day, or None if it must be fetched."""
+        row = self.conn.execute(
+            "SELECT row_count FROM fetched_days WHERE day = ? AND settled = 1",
+            (day,),
+        ).fetchone()
+        return None if row is None else int(row[0])
+
+    def save_day(
+        self,
+        day: str,
+        rows: Iterable[tuple[str, float, float | None, float]],
+        settled: bool,
+    ) -> int:
+        """Replace the stored bars for `day` with (ticker, dollar_volume, move, close) rows."""
+        values = [
+            (day, ticker, dollar_volume, None if move is None or math.isnan(move) else move, close)
+            for ticker, dollar_volume, move, close in rows
+        ]
+        with self.conn:
+            self.conn.execute("DELETE FROM daily_bars WHERE day = ?", (day,))
+            self.conn.executemany(
+                "INSERT INTO daily_bars (day, ticker, dollar_volume, move, close) "
+                "VALUES (?, ?, ?, ?, ?)",
+                values,
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO fetched_days (day, row_count, settled) VALUES (?, ?, ?)",
+                (day, len(values), int(settled)),
+            )
+        return len(values)
+
+    def load_rows(self, days: list[str]) -> list[tuple]:
+        """Return `BAR_COLUMNS` tuples for the given session dates."""
+        if not days:
+            return []
+        placeholders = ",".join("?" for _ in days)
+        return self.conn.execute(
+            f"SELECT {', '.join(BAR_COLUMNS)} FROM daily_bars WHERE day IN ({placeholders})",
+            days,
+        ).fetchall()
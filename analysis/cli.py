@@ -0,0 +1,91 @@
+"""Single entry point for the analysis scripts.
+
+    python -m analysis <subcommand> [options]
+
+Each subcommand is one of the standalone scripts; its module (and whatever
+heavy dependencies it needs) is imported only when that subcommand runs, so
+`python -m analysis --help` and cron wrappers for the light probes start
+without loading pandas or matplotlib. Everything after the subcommand name is
+passed through to the script's own argument parser.
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import sys
+from typing import Sequence
+
+PROG = "moonshot-analysis"
+
+# subcommand -> (module, summary)
+SUBCOMMANDS = {
+    "grid-hygiene": (
+        "grid_hygiene_summary",
+        "Markdown/PNG summary of a grid export, or run-over-run history",
+    ),
+    "grid-backtest": (
+        "grid_backtest",
+        "Vectorised local grid backtest over exported daily inputs",
+    ),
+    "grid-sweep": (
+        "grid_sweep",
+        "Sharded multi-process grid sweep merged into one grid file",
+    ),
+    "microcap-screen": (
+        "polygon_screen_microcaps",
+        "Screen micro/meme-cap stocks from Polygon grouped daily bars",
+    ),
+    "earnings-probe": (
+        "finnhub_earnings_probe",
+        "Fetch earnings events and report provider coverage",
+    ),
+    "st-calibration": (
+        "stocktwits_reddit_calibration_summary",
+        "StockTwits vs Reddit polarity overlap and correlations",
+    ),
+    "st-follower-weighted": (
+        "stocktwits_follower_weighted_summary",
+        "Follower-weighted StockTwits sentiment vs Reddit",
+    ),
+    "leadlag": (
+        "leadlag",
+        "StockTwits vs Reddit lead/lag from the local message cache",
+    ),
+    "feature-cube": (
+        "feature_cube",
+        "Build or slice the memory-mapped ticker x session feature cube",
+    ),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    width = max(map(len, SUBCOMMANDS))
+    listing = "\n".join(
+        f"  {name:<{width}}  {summary}" for name, (_, summary) in SUBCOMMANDS.items()
+    )
+    parser = argparse.ArgumentParser(
+        prog=PROG,
+        description="Moonshot analysis tools.",
+        epilog=f"subcommands:\n{listing}\n\n"
+        f"Run `{PROG} <subcommand> --help` for subcommand options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", metavar="subcommand", choices=SUBCOMMANDS)
+    parser.add_argument("args", metavar="...", nargs=argparse.REMAINDER)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    module_name, _ = SUBCOMMANDS[args.command]
+    if __package__:
+        module = importlib.import_module(f".{module_name}", __package__)
+    else:
+        module = importlib.import_module(module_name)
+    # Sub-parsers take their usage prefix from argv[0].
+    sys.argv[0] = f"{PROG} {args.command}"
+    return module.main(args.args) or 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
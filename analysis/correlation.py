@@ -0,0 +1,199 @@
+"""Vectorised Pearson/Spearman correlation for the calibration reports.
+
+Everything reduces along the last axis, so one call correlates a stack of
+series against the same target (e.g. simple and follower-weighted sentiment
+against Reddit). `bootstrap_ci` scores a whole block of resamples at once as
+a matrix of draw counts over the distinct pairs. Pairs where either side is
+NaN are ignored; a correlation with fewer than two pairs or zero variance
+comes back as NaN rather than None.
+
+`grouped_correlation` computes the same statistics per group (e.g. per
+symbol) with segment sums over factorised keys instead of a Python loop.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+if __package__:
+    from .lazy_import import lazy_import
+else:  # run as a script: `python analysis/correlation.py`
+    from lazy_import import lazy_import
+
+np = lazy_import("numpy", "python3 -m pip install --user numpy pandas")
+pd = lazy_import("pandas", "python3 -m pip install --user numpy pandas")
+
+DEFAULT_RESAMPLES = 2000
+DEFAULT_CONFIDENCE = 0.95
+# Upper bound on the elements of one bootstrap block (resamples x pairs).
+BOOTSTRAP_BLOCK = 4_000_000
+
+
+def _pairs(x: Any, y: Any) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+    valid = ~(np.isnan(x) | np.isnan(y))
+    return x, y, valid
+
+
+def pearson(x: Any, y: Any) -> np.ndarray:
+    """Pearson r along the last axis (a float for 1-d input)."""
+    x, y, valid = _pairs(x, y)
+    n = valid.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if valid.all() and x.shape[-1]:
+            dx = x - x.mean(axis=-1, keepdims=True)
+            dy = y - y.mean(axis=-1, keepdims=True)
+        else:
+            dx = np.where(valid, x, 0.0)
+            dy = np.where(valid, y, 0.0)
+            dx = np.where(valid, dx - (dx.sum(axis=-1) / n)[..., None], 0.0)
+            dy = np.where(valid, dy - (dy.sum(axis=-1) / n)[..., None], 0.0)
+        var_x = (dx * dx).sum(axis=-1)
+        var_y = (dy * dy).sum(axis=-1)
+        r = (dx * dy).sum(axis=-1) / np.sqrt(var_x * var_y)
+    return np.where((n >= 2) & (var_x > 0) & (var_y > 0), r, np.nan)[()]
+
+
+def average_ranks(values: Any) -> np.ndarray:
+    """Ranks along the last axis, ties averaged and NaN left as NaN."""
+    values = np.asarray(values, dtype=np.float64)
+    if not values.size:
+        return values.copy()
+    flat = values.reshape(-1, values.shape[-1]) if values.ndim else values.reshape(1, 1)
+    ranks = pd.DataFrame(flat).rank(axis=1, method="average").to_numpy()
+    return ranks.reshape(values.shape)
+
+
+def spearman(x: Any, y: Any) -> np.ndarray:
+    """Spearman rho: Pearson on the average ranks of the jointly valid pairs."""
+    x, y, valid = _pairs(x, y)
+    x = np.where(valid, x, np.nan)
+    y = np.where(valid, y, np.nan)
+    return pearson(average_ranks(x), average_ranks(y))
+
+
+def _weighted_pearson(weights: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Pearson r per row of `weights` (resamples x distinct pairs)."""
+    total = weights.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dx = x - (weights * x).sum(axis=1, keepdims=True) / total
+        dy = y - (weights * y).sum(axis=1, keepdims=True) / total
+        var_x = (weights * dx * dx).sum(axis=1)
+        var_y = (weights * dy * dy).sum(axis=1)
+        r = (weights * dx * dy).sum(axis=1) / np.sqrt(var_x * var_y)
+    return np.where((var_x > 0) & (var_y > 0), r, np.nan)
+
+
+def _weighted_ranks(weights: np.ndarray, codes: np.ndarray, uniques: int) -> np.ndarray:
+    """Tie-averaged ranks of each pair's value within every weighted resample.
+
+    The draws per distinct value are summed and run-summed, so resamples are
+    ranked without sorting them.
+    """
+    rows = weights.shape[0]
+    offsets = (np.arange(rows) * uniques)[:, None]
+    counts = np.bincount(
+        (codes + offsets).ravel(), weights=weights.ravel(), minlength=rows * uniques
+    ).reshape(rows, uniques)
+    ranks = np.cumsum(counts, axis=1) - (counts - 1) / 2
+    return np.take_along_axis(ranks, np.broadcast_to(codes, weights.shape), axis=1)
+
+
+def _draw_weights(
+    rng: np.random.Generator,
+    rows: int,
+    n: int,
+    inverse: np.ndarray,
+    counts: np.ndarray,
+) -> np.ndarray:
+    """Bootstrap draw counts per distinct pair, one row per resample of n pairs."""
+    distinct = len(counts)
+    if distinct * 5 < n:
+        # Few distinct pairs: draw the counts directly, independent of n.
+        return rng.multinomial(n, counts / n, size=rows).astype(np.float64)
+    codes = inverse[rng.integers(0, n, size=(rows, n))]
+    codes += (np.arange(rows) * distinct)[:, None]
+    return np.bincount(codes.ravel(), minlength=rows * distinct).reshape(rows, distinct).astype(
+        np.float64
+    )
+
+
+def bootstrap_ci(
+    x: Any,
+    y: Any,
+    method: str = "pearson",
+    resamples: int = DEFAULT_RESAMPLES,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: int | None = 0,
+) -> tuple[float, float]:
+    """Percentile bootstrap interval for the `method` correlation of resampled pairs.
+
+    Each resample is a row of draw counts over the distinct (x, y) pairs, so a
+    block of resamples is scored with a few matrix reductions, and exports
+    with few distinct values (label averages, rounded scores) cost little
+    regardless of row count. Blocks only bound memory.
+    """
+    if method not in ("pearson", "spearman"):
+        raise ValueError(f"Unknown correlation method: {method}")
+    x, y, valid = _pairs(x, y)
+    n = int(valid.sum())
+    if n < 2 or resamples < 1:
+        return (np.nan, np.nan)
+    pairs, inverse, counts = np.unique(
+        np.column_stack([x[valid], y[valid]]), axis=0, return_inverse=True, return_counts=True
+    )
+    inverse = inverse.ravel()
+    px, py = pairs[:, 0], pairs[:, 1]
+    if method == "spearman":
+        x_uniques, x_codes = np.unique(px, return_inverse=True)
+        y_uniques, y_codes = np.unique(py, return_inverse=True)
+    rng = np.random.default_rng(seed)
+    block = max(1, BOOTSTRAP_BLOCK // max(n if len(counts) * 5 >= n else len(counts), 1))
+    scores = []
+    for start in range(0, resamples, block):
+        weights = _draw_weights(rng, min(block, resamples - start), n, inverse, counts)
+        if method == "spearman":
+            scores.append(
+                _weighted_pearson(
+                    weights,
+                    _weighted_ranks(weights, x_codes, len(x_uniques)),
+                    _weighted_ranks(weights, y_codes, len(y_uniques)),
+                )
+            )
+        else:
+            scores.append(_weighted_pearson(weights, px, py))
+    scores = np.concatenate(scores)
+    scores = scores[~np.isnan(scores)]
+    if not len(scores):
+        return (np.nan, np.nan)
+    tail = (1.0 - confidence) / 2 * 100
+    low, high = np.percentile(scores, [tail, 100 - tail])
+    return (float(low), float(high))
+
+
+def _segment_pearson(codes: np.ndarray, x: np.ndarray, y: np.ndarray, groups: int):
+    n = np.bincount(codes, minlength=groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dx = x - (np.bincount(codes, weights=x, minlength=groups) / n)[codes]
+        dy = y - (np.bincount(codes, weights=y, minlength=groups) / n)[codes]
+        var_x = np.bincount(codes, weights=dx * dx, minlength=groups)
+        var_y = np.bincount(codes, weights=dy * dy, minlength=groups)
+        r = np.bincount(codes, weights=dx * dy, minlength=groups) / np.sqrt(var_x * var_y)
+    return n, np.where((n >= 2) & (var_x > 0) & (var_y > 0), r, np.nan)
+
+
+def grouped_correlation(keys: Any, x: Any, y: Any, min_count: int = 2) -> pd.DataFrame:
+    """Per-group pair count, Pearson r and Spearman rho of x against y.
+
+    Groups with fewer than `min_count` valid pairs are dropped; the result is
+    indexed by group key in sorted order.
+    """
+    x, y, valid = _pairs(x, y)
+    codes, labels = pd.factorize(pd.Series(keys)[valid], sort=True)
+    x, y = x[valid], y[valid]
+    groups = len(labels)
+    n, r = _segment_pearson(codes, x, y, groups)
+    rank_x = pd.Series(x).groupby(codes).rank(method="average").to_numpy()
+    rank_y = pd.Series(y).groupby(codes).rank(method="average").to_numpy()
+    _, rho = _segment_pearson(codes, rank_x, rank_y, groups)
+    table = pd.DataFrame({"n": n, "pearson": r, "spearman": rho}, index=labels)
+    return table[table["n"] >= min_count]
@@ -0,0 +1,150 @@
+"""Persistent earnings-event store for the catalyst probes.
+
+Events are keyed by `(provider, ticker, report_date)`; re-fetched events
+replace older copies, so estimates are upgraded to actuals in place. A
+`coverage` table records which date ranges have already been fetched per
+provider/ticker (merged into disjoint intervals), letting callers request only
+the gaps. Coverage is only recorded up to `settled_through` so the most recent
+days are always refreshed. Downstream tagging can read events straight from
+the SQLite file without network access.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import json
+import pathlib
+import sqlite3
+from typing import Any, Iterable
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS earnings_events (
+    provider TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    report_date TEXT NOT NULL,
+    event_json TEXT NOT NULL,
+    PRIMARY KEY (provider, ticker, report_date)
+);
+CREATE TABLE IF NOT EXISTS coverage (
+    provider TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    PRIMARY KEY (provider, ticker, start_date)
+);
+"""
+
+DateRange = tuple[dt.date, dt.date]
+
+
+def merge_ranges(ranges: Iterable[DateRange]) -> list[DateRange]:
+    """Coalesce overlapping or adjacent date ranges."""
+    merged: list[DateRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + dt.timedelta(days=1):
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+            continue
+        merged.append((start, end))
+    return merged
+
+
+class EarningsEventStore:
+    def __init__(self, path: pathlib.Path | str) -> None:
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "EarningsEventStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def covered(self, provider: str, ticker: str) -> list[DateRange]:
+        rows = self.conn.execute(
+            "SELECT start_date, end_date FROM coverage WHERE provider = ? AND ticker = ? "
+            "ORDER BY start_date",
+            (provider, ticker),
+        ).fetchall()
+        return [(dt.date.fromisoformat(start), dt.date.fromisoformat(end)) for start, end in rows]
+
+    def missing_ranges(
+        self,
+        provider: str,
+        ticker: str,
+        start: dt.date,
+        end: dt.date,
+    ) -> list[DateRange]:
+        """Sub-ranges of [start, end] not yet covered for provider/ticker."""
+        gaps: list[DateRange] = []
+        cursor = start
+        for cov_start, cov_end in self.covered(provider, ticker):
+            if cov_end < cursor:
+                continue
+            if cov_start > end:
+                break
+            if cov_start > cursor:
+                gaps.append((cursor, cov_start - dt.timedelta(days=1)))
+            cursor = max(cursor, cov_end + dt.timedelta(days=1))
+            if cursor > end:
+                break
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def save_events(
+        self,
+        provider: str,
+        ticker: str,
+        events: Iterable[dict[str, Any]],
+        start: dt.date,
+        end: dt.date,
+        settled_through: dt.date,
+    ) -> int:
+        """Upsert events fetched for [start, end] and extend coverage up to `settled_through`."""
+        rows = [
+            (provider, ticker, str(evt["reportDate"]), json.dumps(evt, default=str))
+            for evt in events
+            if evt.get("reportDate")
+        ]
+        covered_end = min(end, settled_through)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO earnings_events "
+                "(provider, ticker, report_date, event_json) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            if start <= covered_end:
+                merged = merge_ranges(self.covered(provider, ticker) + [(start, covered_end)])
+                self.conn.execute(
+                    "DELETE FROM coverage WHERE provider = ? AND ticker = ?",
+                    (provider, ticker),
+                )
+                self.conn.executemany(
+                    "INSERT INTO coverage (provider, ticker, start_date, end_date) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (provider, ticker, cov_start.isoformat(), cov_end.isoformat())
+                        for cov_start, cov_end in merged
+                    ],
+                )
+        return len(rows)
+
+    def load_events(
+        self,
+        provider: str,
+        ticker: str,
+        start: dt.date,
+        end: dt.date,
+    ) -> list[dict[str, Any]]:
+        rows = self.conn.execute(
+            "SELECT event_json FROM earnings_events "
+            "WHERE provider = ? AND ticker = ? AND report_date BETWEEN ? AND ? "
+            "ORDER BY report_date",
+            (provider, ticker, start.isoformat(), end.isoformat()),
+        )
+        return [json.loads(event_json) for (event_json,) in rows]
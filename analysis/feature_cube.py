@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""Memory-mapped symbol x trading day x feature cube.
+
+Built once from the per-ticker-day sources the reports otherwise re-derive on
+every run, the StockTwits/Reddit calibration export (via `ticker_days`) and the
+micro-cap screen's SQLite bar store, then opened by any report or sweep
+without parsing anything:
+
+    python -m analysis feature-cube --build --bar-store bars.sqlite --start 2025-06-02
+    python -m analysis feature-cube --symbols GME,AMC --features close,return
+
+The cube is one float32 `.npy` file (by default
+`~/.cache/moonshot-analysis/feature_cube.npy`, C order, so each symbol's
+days x features block is contiguous) plus a JSON sidecar with the symbol,
+session and feature axes. `FeatureCube` maps it read-only; `select`
+returns views for symbol/day/feature ranges and only gathers the requested
+rows otherwise, so a slice touches just the pages it needs.
+
+The day axis is NYSE sessions (`trading_calendar`). Sentiment from weekend or
+holiday days rolls forward into the next session; averages are recomputed
+from the rolled-up sums. Counts are 0 where nothing was observed, ratios and
+market features NaN.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import os
+import pathlib
+import sys
+from typing import Any, Sequence
+
+if __package__:
+    from .bar_store import BAR_COLUMNS, DailyBarStore
+    from .http_cache import cache_root
+    from .lazy_import import lazy_import
+    from .ticker_days import load_ticker_days
+    from .trading_calendar import recent_sessions, sessions_between
+else:  # run as a script: `python analysis/feature_cube.py`
+    from bar_store import BAR_COLUMNS, DailyBarStore
+    from http_cache import cache_root
+    from lazy_import import lazy_import
+    from ticker_days import load_ticker_days
+    from trading_calendar import recent_sessions, sessions_between
+
+np = lazy_import("numpy", "python3 -m pip install --user numpy pandas")
+pd = lazy_import("pandas", "python3 -m pip install --user numpy pandas")
+
+CUBE_PATH = cache_root() / "feature_cube.npy"
+VOL_WINDOW = 20
+SENTIMENT_FEATURES = [
+    "reddit_mentions",
+    "reddit_positive",
+    "reddit_negative",
+    "reddit_avg_score",
+    "st_messages",
+    "st_sentiment",
+    "st_weighted_sentiment",
+]
+MARKET_FEATURES = ["dollar_volume", "close", "move", "return", "volatility"]
+FEATURES = [*SENTIMENT_FEATURES, *MARKET_FEATURES]
+
+
+def meta_path(path: pathlib.Path) -> pathlib.Path:
+    return path.with_suffix(".json")
+
+
+def _positions(found: np.ndarray) -> slice | np.ndarray:
+    """A slice (so indexing stays a view) when positions form an ascending run."""
+    if len(found) and np.array_equal(found, np.arange(found[0], found[0] + len(found))):
+        return slice(int(found[0]), int(found[0]) + len(found))
+    return found
+
+
+class FeatureCube:
+    """Read-only view of a cube written by `build_cube`."""
+
+    def __init__(self, path: pathlib.Path | str = CUBE_PATH) -> None:
+        self.path = pathlib.Path(path)
+        try:
+            meta = json.loads(meta_path(self.path).read_text())
+            self.values = np.load(self.path, mmap_mode="r")
+        except FileNotFoundError:
+            raise SystemExit(f"Feature cube not found: {self.path} (run with --build first)")
+        self.meta = meta
+        self.symbols = np.asarray(meta["symbols"], dtype=str)
+        self.days = np.asarray(meta["days"], dtype="datetime64[D]")
+        self.features = list(meta["features"])
+        expected = (len(self.symbols), len(self.days), len(self.features))
+        if self.values.shape != expected:
+            raise SystemExit(f"Feature cube {self.path} does not match its metadata")
+
+    def symbol_rows(self, symbols: Sequence[str] | None = None) -> slice | np.ndarray:
+        if symbols is None:
+            return slice(None)
+        wanted = np.asarray([symbol.strip().upper() for symbol in symbols], dtype=str)
+        found = np.searchsorted(self.symbols, wanted)
+        missing = (found >= len(self.symbols)) | (
+            self.symbols[np.minimum(found, len(self.symbols) - 1)] != wanted
+        )
+        if missing.any():
+            raise KeyError(f"Not in feature cube: {', '.join(wanted[missing])}")
+        return _positions(found)
+
+    def day_rows(self, start: dt.date | None = None, end: dt.date | None = None) -> slice:
+        """Sessions in [start, end]."""
+        first = 0 if start is None else np.searchsorted(self.days, np.datetime64(start, "D"))
+        stop = (
+            len(self.days)
+            if end is None
+            else np.searchsorted(self.days, np.datetime64(end, "D"), side="right")
+        )
+        return slice(int(first), int(stop))
+
+    def feature_columns(self, features: Sequence[str] | None = None) -> slice | np.ndarray:
+        if features is None:
+            return slice(None)
+        unknown = [name for name in features if name not in self.features]
+        if unknown:
+            raise KeyError(f"Unknown features: {', '.join(unknown)}")
+        return _positions(np.asarray([self.features.index(name) for name in features]))
+
+    def select(
+        self,
+        symbols: Sequence[str] | None = None,
+        start: dt.date | None = None,
+        end: dt.date | None = None,
+        features: Sequence[str] | None = None,
+    ) -> np.ndarray:
+        """(symbols x days x features) block; a view of the map when every axis is a range."""
+        # Days first: slicing them is a view, so a symbol gather copies only those days.
+        block = self.values[:, self.day_rows(start, end)][self.symbol_rows(symbols)]
+        return block[:, :, self.feature_columns(features)]
+
+    def frame(
+        self,
+        symbols: Sequence[str] | None = None,
+        start: dt.date | None = None,
+        end: dt.date | None = None,
+        features: Sequence[str] | None = None,
+    ) -> pd.DataFrame:
+        """`select` as a long table: one row per (day, symbol), one column per feature."""
+        block = self.select(symbols, start, end, features)
+        names = self.symbols[self.symbol_rows(symbols)]
+        days = [day.item() for day in self.days[self.day_rows(start, end)]]
+        index = pd.MultiIndex.from_product([names, days], names=["symbol", "day"])
+        table = pd.DataFrame(
+            block.reshape(-1, block.shape[2]),
+            index=index,
+            columns=features or self.features,
+        )
+        return table.swaplevel().sort_index().reset_index()
+
+
+def _sentiment_planes(
+    ticker_days: pd.DataFrame,
+    symbols: pd.Index,
+    sessions: np.ndarray,
+) -> dict[str, np.ndarray]:
+    shape = (len(symbols), len(sessions))
+    days = pd.to_datetime(ticker_days["day"]).to_numpy("datetime64[D]")
+    # Each day counts towards the first session on or after it.
+    position = np.searchsorted(sessions, days)
+    keep = (position < len(sessions)) & (days >= sessions[0])
+    rows = ticker_days[keep]
+    cells = symbols.get_indexer(rows["symbol"]) * len(sessions) + position[keep]
+    size = shape[0] * shape[1]
+
+    def total(values: Any) -> np.ndarray:
+        weights = np.nan_to_num(np.asarray(values, dtype=np.float64))
+        return np.bincount(cells, weights=weights, minlength=size).reshape(shape)
+
+    reddit_mentions = total(rows["reddit_mentions"])
+    messages = total(rows["messages"])
+    follower_sum = total(rows["follower_sum"])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {
+            "reddit_mentions": reddit_mentions,
+            "reddit_positive": total(rows["reddit_positive"]),
+            "reddit_negative": total(rows["reddit_negative"]),
+            "reddit_avg_score": np.where(
+                reddit_mentions > 0,
+                total(rows["reddit_avg"] * rows["reddit_mentions"]) / reddit_mentions,
+                np.nan,
+            ),
+            "st_messages": messages,
+            "st_sentiment": np.where(
+                messages > 0, total(rows["sentiment_sum"]) / messages, np.nan
+            ),
+            "st_weighted_sentiment": np.where(
+                follower_sum > 0, total(rows["weighted_sum"]) / follower_sum, np.nan
+            ),
+        }
+
+
+def _market_planes(
+    bars: pd.DataFrame,
+    symbols: pd.Index,
+    sessions: np.ndarray,
+    lookback: int,
+    vol_window: int,
+) -> dict[str, np.ndarray]:
+    """Market features per session; the first `lookback` sessions only seed returns/volatility."""
+    shape = (len(symbols), len(sessions))
+    bar_days = pd.to_datetime(bars["day"]).to_numpy("datetime64[D]")
+    position = np.minimum(np.searchsorted(sessions, bar_days), len(sessions) - 1)
+    on_axis = sessions[position] == bar_days
+    rows = symbols.get_indexer(bars["ticker"][on_axis])
+    planes = {}
+    for name in ("dollar_volume", "close", "move"):
+        plane = np.full(shape, np.nan)
+        plane[rows, position[on_axis]] = bars[name][on_axis].to_numpy(np.float64, na_value=np.nan)
+        planes[name] = plane
+    close = planes["close"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = np.full(shape, np.nan)
+        returns[:, 1:] = close[:, 1:] / close[:, :-1] - 1.0
+    planes["return"] = returns
+    planes["volatility"] = (
+        pd.DataFrame(returns.T).rolling(vol_window, min_periods=vol_window).std().to_numpy().T
+    )
+    return {name: plane[:, lookback:] for name, plane in planes.items()}
+
+
+def build_cube(
+    path: pathlib.Path,
+    start: dt.date,
+    end: dt.date,
+    calibration: pathlib.Path | None = None,
+    bar_store: pathlib.Path | None = None,
+    vol_window: int = VOL_WINDOW,
+) -> tuple[int, int, int]:
+    """Write the cube for sessions in [start, end]; returns its shape.
+
+    Written next to the target and swapped in, so open readers keep the old map.
+    """
+    sessions = np.asarray(
+        [session.date for session in sessions_between(start, end)], dtype="datetime64[D]"
+    )
+    if not len(sessions):
+        raise SystemExit(f"No NYSE sessions between {start} and {end}")
+    ticker_days = load_ticker_days(calibration) if calibration else None
+    bars = None
+    if bar_store:
+        # Enough earlier sessions to seed the first return and volatility window.
+        seed = [session.date for session in recent_sessions(vol_window + 2, sessions[0].item())]
+        bar_sessions = np.asarray(sorted(seed)[:-1], dtype="datetime64[D]")
+        bar_sessions = np.concatenate([bar_sessions, sessions])
+        with DailyBarStore(bar_store) as store:
+            bars = pd.DataFrame(
+                store.load_rows([str(day) for day in bar_sessions]), columns=BAR_COLUMNS
+            )
+        bars["ticker"] = bars["ticker"].str.strip().str.upper()
+    names = []
+    if ticker_days is not None:
+        ticker_days["symbol"] = ticker_days["symbol"].astype(str)
+        names.append(ticker_days["symbol"])
+    if bars is not None:
+        names.append(bars["ticker"])
+    symbols = pd.Index(pd.concat(names).unique() if names else [], dtype=object).sort_values()
+
+    planes: dict[str, np.ndarray] = {}
+    if ticker_days is not None:
+        planes.update(_sentiment_planes(ticker_days, symbols, sessions))
+    if bars is not None:
+        lookback = len(bar_sessions) - len(sessions)
+        planes.update(_market_planes(bars, symbols, bar_sessions, lookback, vol_window))
+    shape = (len(symbols), len(sessions), len(FEATURES))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.tmp")
+    cube = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=shape)
+    for index, name in enumerate(FEATURES):
+        # Features of a source that was not given stay NaN.
+        cube[:, :, index] = planes.get(name, np.nan)
+    cube.flush()
+    del cube
+    meta = {
+        "symbols": list(symbols),
+        "days": [str(day) for day in sessions],
+        "features": FEATURES,
+        "vol_window": vol_window,
+        "sources": {
+            "calibration": str(calibration) if calibration else None,
+            "bar_store": str(bar_store) if bar_store else None,
+        },
+        "built_at": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+    }
+    meta_tmp = meta_path(tmp)
+    meta_tmp.write_text(json.dumps(meta))
+    os.replace(tmp, path)
+    os.replace(meta_tmp, meta_path(path))
+    return shape
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Build or inspect the ticker x day feature cube."
+    )
+    parser.add_argument(
+        "--cube",
+        type=pathlib.Path,
+        default=CUBE_PATH,
+        help="Cube file (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--build", action="store_true", help="(Re)build the cube from the sources"
+    )
+    parser.add_argument(
+        "--calibration",
+        type=pathlib.Path,
+        help="stocktwits_reddit_calibration.csv export for the sentiment features",
+    )
+    parser.add_argument(
+        "--bar-store",
+        type=pathlib.Path,
+        help="SQLite bar store (polygon_screen_microcaps.py --store) for the market features",
+    )
+    parser.add_argument("--start", type=dt.date.fromisoformat, help="First session")
+    parser.add_argument("--end", type=dt.date.fromisoformat, help="Last session (inclusive)")
+    parser.add_argument(
+        "--vol-window",
+        type=int,
+        default=VOL_WINDOW,
+        help="Sessions in the rolling return volatility (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--symbols",
+        type=lambda value: [symbol.strip() for symbol in value.split(",") if symbol.strip()],
+        help="Comma-separated symbols to print",
+    )
+    parser.add_argument(
+        "--features",
+        type=lambda value: [name.strip() for name in value.split(",") if name.strip()],
+        help="Comma-separated features to print (default: all)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.build:
+        if not (args.calibration or args.bar_store):
+            parser.error("--build needs --calibration and/or --bar-store")
+        end = args.end or dt.date.today()
+        start = args.start or end - dt.timedelta(days=365)
+        shape = build_cube(args.cube, start, end, args.calibration, args.bar_store, args.vol_window)
+        print(f"Wrote {args.cube}: {shape[0]} symbols x {shape[1]} sessions x {shape[2]} features")
+        return 0
+
+    cube = FeatureCube(args.cube)
+    print(
+        f"{cube.path}: {len(cube.symbols)} symbols x {len(cube.days)} sessions "
+        f"({cube.days[0]} .. {cube.days[-1]}) x {len(cube.features)} features, "
+        f"built {cube.meta.get('built_at')}"
+    )
+    if args.symbols:
+        try:
+            table = cube.frame(args.symbols, args.start, args.end, args.features)
+        except KeyError as exc:
+            raise SystemExit(str(exc.args[0]))
+        print(table.to_markdown(tablefmt="pipe", index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
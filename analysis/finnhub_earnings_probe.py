@@ -5,11 +5,24 @@ import argparse
 import datetime as dt
 import json
 import os
+import pathlib
 import sys
+import threading
 import time
 import urllib.parse
-import urllib.request
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Sequence
+
+if __package__:
+    from .event_store import EarningsEventStore, merge_ranges
+    from .http_cache import ResponseCache, add_cache_args, cache_from_args
+    from .http_client import HttpClient, HttpError, add_http_args
+    from .rate_limit import TokenBucket, get_limiter
+else:  # run as a script: `python analysis/finnhub_earnings_probe.py`
+    from event_store import EarningsEventStore, merge_ranges
+    from http_cache import ResponseCache, add_cache_args, cache_from_args
+    from http_client import HttpClient, HttpError, add_http_args
+    from rate_limit import TokenBucket, get_limiter
 
 # Supported providers
 PROVIDER_POLYGON = "polygon"
@@ -23,8 +36,29 @@ API_PATTERNS = (
     "https://api.polygon.io/{version}/reference/earnings/{ticker}",
 )
 
+HTTP = HttpClient("moonshot-polygon-earnings-test/1.0")
+
+# How long a discovered Polygon earnings endpoint is trusted when persisted.
+ENDPOINT_MEMO_TTL_SECONDS = 7 * 24 * 3600
+ENDPOINT_MEMO_FILENAME = "polygon_earnings_endpoints.json"
+
+FINNHUB_CALENDAR_URL = "https://finnhub.io/api/v1/calendar/earnings"
+FINNHUB_WINDOW_DAYS = 90
+
+# Days before today after which stored events are treated as final; anything
+# newer is re-fetched on every --store run so estimates become actuals.
+EVENT_SETTLE_DAYS = 7
+
+# Default request budgets (requests/second) used by the shared limiter in
+# concurrent mode. Finnhub's free tier allows 60 calls/minute; the Polygon
+# default mirrors the historical 0.25s pacing.
+DEFAULT_RATE_LIMITS = {
+    PROVIDER_POLYGON: 4.0,
+    PROVIDER_FINNHUB: 1.0,
+}
 
-def parse_args() -> argparse.Namespace:
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Fetch Polygon earnings events and report coverage stats for a ticker set.",
     )
@@ -64,29 +98,60 @@ def parse_args() -> argparse.Namespace:
         choices=[PROVIDER_POLYGON, PROVIDER_FINNHUB],
         help="Data provider to query (polygon | finnhub). Default: polygon",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help=(
+            "Number of parallel fetch workers (default: 1 = sequential). Values > 1 "
+            "fan out tickers and date windows behind a shared rate limiter and "
+            "ignore --sleep"
+        ),
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help=(
+            "Provider request budget in requests/second for concurrent mode "
+            "(default: polygon=4, finnhub=1)"
+        ),
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help=(
+            "Finnhub only: fetch the whole-market calendar once per 90-day window "
+            "and split events by ticker locally instead of one call per symbol"
+        ),
+    )
+    parser.add_argument(
+        "--store",
+        type=pathlib.Path,
+        help=(
+            "SQLite earnings-event store. Only date ranges not already stored are "
+            "fetched; coverage is computed from the stored events"
+        ),
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="With --store, report from stored events only without any API calls",
+    )
+    add_cache_args(parser)
+    add_http_args(parser)
+    args = parser.parse_args(argv)
+    if args.rate is not None and args.rate <= 0:
+        parser.error("--rate must be > 0")
+    return args
 
 
-def http_get(url: str) -> dict[str, Any]:
-    req = urllib.request.Request(
-        url,
-        headers={"User-Agent": "moonshot-polygon-earnings-test/1.0"},
-    )
-    for attempt in range(5):
-        try:
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                if resp.status != 200:
-                    payload = resp.read().decode("utf-8", errors="ignore")
-                    raise RuntimeError(
-                        f"HTTP {resp.status} for {url} :: {payload[:200]}"
-                    )
-                return json.loads(resp.read().decode("utf-8"))
-        except Exception as exc:  # noqa: BLE001
-            if attempt == 4:
-                raise RuntimeError(f"Polygon request failed: {exc}") from exc
-            wait_for = (attempt + 1) * 1.5
-            time.sleep(wait_for)
-    raise RuntimeError("Polygon request failed after retries")
+def http_get(
+    url: str,
+    limiter: TokenBucket | None = None,
+    cache: ResponseCache | None = None,
+    settled_through: dt.date | None = None,
+) -> dict[str, Any]:
+    return HTTP.get_json(url, cache=cache, settled_through=settled_through, limiter=limiter)
 
 
 def parse_date(value: Any) -> dt.date | None:
@@ -100,13 +165,89 @@ def parse_date(value: Any) -> dt.date | None:
         return None
 
 
+class EndpointMemo:
+    """Remembers which Polygon earnings endpoint works across tickers.
+
+    The first (version, pattern) combination that returns events is reused
+    for every later ticker, and combinations that answered 404 are never
+    tried again. A 404 from the working `{ticker}` path only means that symbol
+    is unknown, so it leaves the memo alone. With `path`, the memo is persisted
+    as JSON and trusted for `ENDPOINT_MEMO_TTL_SECONDS`.
+    """
+
+    def __init__(self, path: pathlib.Path | None = None) -> None:
+        self.path = path
+        self.working: tuple[str, str] | None = None
+        self.dead: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        if path is not None:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            record = json.loads(self.path.read_text())  # type: ignore[union-attr]
+        except (OSError, ValueError):
+            return
+        if time.time() - record.get("updated_at", 0) > ENDPOINT_MEMO_TTL_SECONDS:
+            return
+        working = record.get("working")
+        self.working = tuple(working) if working else None  # type: ignore[assignment]
+        self.dead = {tuple(combo) for combo in record.get("dead") or []}  # type: ignore[misc]
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        record = {
+            "updated_at": time.time(),
+            "working": list(self.working) if self.working else None,
+            "dead": sorted(list(combo) for combo in self.dead),
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(record, indent=2))
+        except OSError:
+            pass
+
+    def candidates(self) -> list[tuple[str, str]]:
+        with self._lock:
+            if self.working is not None:
+                return [self.working]
+            return [
+                (version, pattern)
+                for version in API_VERSIONS
+                for pattern in API_PATTERNS
+                if (version, pattern) not in self.dead
+            ]
+
+    def mark_working(self, version: str, pattern: str) -> None:
+        with self._lock:
+            if self.working == (version, pattern):
+                return
+            self.working = (version, pattern)
+            self._save()
+
+    def mark_dead(self, version: str, pattern: str) -> None:
+        with self._lock:
+            if "{ticker}" in pattern and self.working == (version, pattern):
+                return
+            self.dead.add((version, pattern))
+            if self.working == (version, pattern):
+                self.working = None
+            self._save()
+
+
 def fetch_polygon_earnings(
     ticker: str,
     start: dt.date,
     end: dt.date,
     api_key: str,
     delay: float,
+    limiter: TokenBucket | None = None,
+    cache: ResponseCache | None = None,
+    endpoints: EndpointMemo | None = None,
 ) -> list[dict[str, Any]]:
+    if endpoints is None:
+        endpoints = EndpointMemo()
     params: dict[str, str] = {
         "order": "asc",
         "sort": "reportDate",
@@ -116,85 +257,95 @@ def fetch_polygon_earnings(
         "reportDate.lte": end.isoformat(),
     }
     last_error: Exception | None = None
-    for version in API_VERSIONS:
-        version_had_events = False
-        for pattern in API_PATTERNS:
-            base_url = pattern.format(version=version, ticker=ticker)
-            if "{ticker}" in pattern:
-                query_params = params.copy()
-                query_params.pop("apiKey", None)  # append separately
-                query_string = urllib.parse.urlencode(query_params)
-                url = f"{base_url}?{query_string}&apiKey={api_key}"
-            else:
-                query_params = params.copy()
-                query_params["ticker"] = ticker
-                url = f"{base_url}?{urllib.parse.urlencode(query_params)}"
+    responded = False
+    for version, pattern in endpoints.candidates():
+        base_url = pattern.format(version=version, ticker=ticker)
+        if "{ticker}" in pattern:
+            query_params = params.copy()
+            query_params.pop("apiKey", None)  # append separately
+            query_string = urllib.parse.urlencode(query_params)
+            url = f"{base_url}?{query_string}&apiKey={api_key}"
+        else:
+            query_params = params.copy()
+            query_params["ticker"] = ticker
+            url = f"{base_url}?{urllib.parse.urlencode(query_params)}"
 
-            events: list[dict[str, Any]] = []
-            next_url: str | None = url
-            try:
-                while next_url:
-                    payload = http_get(next_url)
-                    batch = payload.get("results") or []
-                    events.extend(batch)
-                    next_url = payload.get("next_url")
-                    if next_url and "apiKey=" not in next_url:
-                        connector = "&" if "?" in next_url else "?"
-                        next_url = f"{next_url}{connector}apiKey={api_key}"
-                    if next_url:
-                        time.sleep(delay)
-                if events:
-                    version_had_events = True
-                    return events
-            except Exception as exc:  # noqa: BLE001
-                last_error = exc
-                continue
-        if version_had_events:
-            break
-    if last_error:
+        events: list[dict[str, Any]] = []
+        next_url: str | None = url
+        try:
+            while next_url:
+                payload = http_get(next_url, limiter, cache, end)
+                batch = payload.get("results") or []
+                events.extend(batch)
+                next_url = payload.get("next_url")
+                if next_url and "apiKey=" not in next_url:
+                    connector = "&" if "?" in next_url else "?"
+                    next_url = f"{next_url}{connector}apiKey={api_key}"
+                if next_url and delay > 0:
+                    time.sleep(delay)
+        except HttpError as exc:
+            if exc.status == 404:
+                endpoints.mark_dead(version, pattern)
+            last_error = exc
+            continue
+        except Exception as exc:  # noqa: BLE001
+            last_error = exc
+            continue
+        if events:
+            endpoints.mark_working(version, pattern)
+            return events
+        responded = True
+    if last_error and not responded:
         raise last_error
     return []
 
 
-def fetch_finnhub_earnings(
-    ticker: str,
-    start: dt.date,
-    end: dt.date,
-    api_key: str,
-    delay: float,
-) -> list[dict[str, Any]]:
-    window = dt.timedelta(days=90)
+def finnhub_windows(start: dt.date, end: dt.date) -> list[tuple[dt.date, dt.date]]:
+    window = dt.timedelta(days=FINNHUB_WINDOW_DAYS)
+    windows: list[tuple[dt.date, dt.date]] = []
     cursor = start
-    collected: list[dict[str, Any]] = []
     while cursor <= end:
         chunk_end = min(cursor + window, end)
-        params = {
-            "from": cursor.isoformat(),
-            "to": chunk_end.isoformat(),
-            "symbol": ticker,
-            "token": api_key,
-        }
-        url = (
-            "https://finnhub.io/api/v1/calendar/earnings?"
-            f"{urllib.parse.urlencode(params)}"
-        )
-        payload = http_get(url)
-        events = payload.get("earningsCalendar") or []
-        for evt in events:
-            collected.append(
-                {
-                    "reportDate": evt.get("date"),
-                    "ticker": evt.get("symbol"),
-                    "fiscalPeriod": evt.get("quarter") or evt.get("period"),
-                    "fiscalYear": evt.get("year"),
-                    "epsActual": evt.get("epsActual"),
-                    "epsEstimate": evt.get("epsEstimate"),
-                    "epsSurprisePct": evt.get("epsSurprisePercent"),
-                    "payload": evt,
-                }
-            )
+        windows.append((cursor, chunk_end))
         cursor = chunk_end + dt.timedelta(days=1)
-        time.sleep(delay)
+    return windows
+
+
+def fetch_finnhub_window(
+    ticker: str | None,
+    window_start: dt.date,
+    window_end: dt.date,
+    api_key: str,
+    limiter: TokenBucket | None = None,
+    cache: ResponseCache | None = None,
+) -> list[dict[str, Any]]:
+    """Fetch one calendar window; `ticker=None` requests the whole market."""
+    params = {
+        "from": window_start.isoformat(),
+        "to": window_end.isoformat(),
+        "token": api_key,
+    }
+    if ticker is not None:
+        params["symbol"] = ticker
+    url = f"{FINNHUB_CALENDAR_URL}?{urllib.parse.urlencode(params)}"
+    payload = http_get(url, limiter, cache, window_end)
+    events = payload.get("earningsCalendar") or []
+    return [
+        {
+            "reportDate": evt.get("date"),
+            "ticker": evt.get("symbol"),
+            "fiscalPeriod": evt.get("quarter") or evt.get("period"),
+            "fiscalYear": evt.get("year"),
+            "epsActual": evt.get("epsActual"),
+            "epsEstimate": evt.get("epsEstimate"),
+            "epsSurprisePct": evt.get("epsSurprisePercent"),
+            "payload": evt,
+        }
+        for evt in events
+    ]
+
+
+def dedupe_events(collected: list[dict[str, Any]]) -> list[dict[str, Any]]:
     seen: set[tuple[str | None, str | None]] = set()
     deduped: list[dict[str, Any]] = []
     for evt in sorted(collected, key=lambda e: (e["reportDate"] or "", e["ticker"] or "")):
@@ -206,6 +357,161 @@ def fetch_finnhub_earnings(
     return deduped
 
 
+def fetch_finnhub_earnings(
+    ticker: str,
+    start: dt.date,
+    end: dt.date,
+    api_key: str,
+    delay: float,
+    limiter: TokenBucket | None = None,
+    cache: ResponseCache | None = None,
+) -> list[dict[str, Any]]:
+    collected: list[dict[str, Any]] = []
+    for window_start, window_end in finnhub_windows(start, end):
+        collected.extend(
+            fetch_finnhub_window(
+                ticker, window_start, window_end, api_key, limiter, cache
+            )
+        )
+        if delay > 0:
+            time.sleep(delay)
+    return dedupe_events(collected)
+
+
+def fetch_finnhub_bulk(
+    tickers: list[str],
+    start: dt.date,
+    end: dt.date,
+    api_key: str,
+    delay: float,
+    limiter: TokenBucket | None = None,
+    concurrency: int = 1,
+    cache: ResponseCache | None = None,
+) -> dict[str, list[dict[str, Any]]]:
+    """Fetch the market-wide calendar per window and bucket events by ticker.
+
+    Calls scale with the number of windows (about six for an 18-month
+    backfill) instead of tickers x windows. Events are deduped per ticker on
+    `(reportDate, ticker)` exactly as in the per-symbol path.
+    """
+    wanted = set(tickers)
+    windows = finnhub_windows(start, end)
+    collected: list[dict[str, Any]] = []
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [
+                pool.submit(
+                    fetch_finnhub_window,
+                    None,
+                    window_start,
+                    window_end,
+                    api_key,
+                    limiter,
+                    cache,
+                )
+                for window_start, window_end in windows
+            ]
+            for future in futures:
+                collected.extend(future.result())
+    else:
+        for window_start, window_end in windows:
+            collected.extend(
+                fetch_finnhub_window(
+                    None, window_start, window_end, api_key, limiter, cache
+                )
+            )
+            if delay > 0:
+                time.sleep(delay)
+    by_ticker: dict[str, list[dict[str, Any]]] = {ticker: [] for ticker in tickers}
+    for evt in collected:
+        symbol = (evt.get("ticker") or "").upper()
+        if symbol in wanted:
+            by_ticker[symbol].append(evt)
+    return {ticker: dedupe_events(events) for ticker, events in by_ticker.items()}
+
+
+def fetch_all_concurrent(
+    provider: str,
+    tickers: list[str],
+    start: dt.date,
+    end: dt.date,
+    api_key: str,
+    concurrency: int,
+    limiter: TokenBucket,
+    cache: ResponseCache | None = None,
+    endpoints: EndpointMemo | None = None,
+) -> dict[str, list[dict[str, Any]] | Exception]:
+    """Fetch every ticker in parallel; returns events or the raised error per ticker.
+
+    Finnhub requests are split into (ticker, window) tasks so a long backfill
+    for a single symbol also spreads across workers. Pacing comes entirely from
+    the shared `limiter`, so wall time tracks the provider quota.
+    """
+    results: dict[str, list[dict[str, Any]] | Exception] = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        if provider == PROVIDER_POLYGON:
+            if endpoints is None:
+                endpoints = EndpointMemo()
+            pending = list(tickers)
+            # Until an endpoint is known to work, every in-flight ticker would walk
+            # the whole candidate list; resolve it on the first ticker, then fan out.
+            if endpoints.working is None and pending:
+                first = pending.pop(0)
+                try:
+                    results[first] = fetch_polygon_earnings(
+                        first, start, end, api_key, 0.0, limiter, cache, endpoints
+                    )
+                except Exception as exc:  # noqa: BLE001
+                    results[first] = exc
+            futures = {
+                ticker: pool.submit(
+                    fetch_polygon_earnings,
+                    ticker,
+                    start,
+                    end,
+                    api_key,
+                    0.0,
+                    limiter,
+                    cache,
+                    endpoints,
+                )
+                for ticker in pending
+            }
+            for ticker, future in futures.items():
+                try:
+                    results[ticker] = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    results[ticker] = exc
+            return results
+
+        windows = finnhub_windows(start, end)
+        window_futures = {
+            ticker: [
+                pool.submit(
+                    fetch_finnhub_window,
+                    ticker,
+                    window_start,
+                    window_end,
+                    api_key,
+                    limiter,
+                    cache,
+                )
+                for window_start, window_end in windows
+            ]
+            for ticker in tickers
+        }
+        for ticker, futures_for_ticker in window_futures.items():
+            collected: list[dict[str, Any]] = []
+            try:
+                for future in futures_for_ticker:
+                    collected.extend(future.result())
+            except Exception as exc:  # noqa: BLE001
+                results[ticker] = exc
+                continue
+            results[ticker] = dedupe_events(collected)
+    return results
+
+
 def quarter_key(event: dict[str, Any]) -> str:
     fiscal_period = (
         event.get("fiscalPeriod")
@@ -295,8 +601,114 @@ def dump_sample_events(
         )
 
 
-def main() -> int:
-    args = parse_args()
+def fetch_events(
+    args: argparse.Namespace,
+    tickers: list[str],
+    start: dt.date,
+    end: dt.date,
+    api_key: str,
+    limiter: TokenBucket | None,
+    cache: ResponseCache | None,
+    endpoints: EndpointMemo | None,
+) -> dict[str, list[dict[str, Any]] | Exception]:
+    """Fetch [start, end] for `tickers` via the bulk, concurrent or sequential path.
+
+    Per-ticker failures are returned in place of the events; a failed bulk
+    calendar request raises.
+    """
+    provider = args.provider
+    if args.bulk:
+        return fetch_finnhub_bulk(
+            tickers,
+            start,
+            end,
+            api_key,
+            0.0 if limiter else args.sleep,
+            limiter,
+            args.concurrency,
+            cache,
+        )
+    if limiter is not None:
+        return fetch_all_concurrent(
+            provider,
+            tickers,
+            start,
+            end,
+            api_key,
+            args.concurrency,
+            limiter,
+            cache,
+            endpoints,
+        )
+    fetched: dict[str, list[dict[str, Any]] | Exception] = {}
+    for ticker in tickers:
+        try:
+            if provider == PROVIDER_POLYGON:
+                fetched[ticker] = fetch_polygon_earnings(
+                    ticker,
+                    start,
+                    end,
+                    api_key,
+                    args.sleep,
+                    cache=cache,
+                    endpoints=endpoints,
+                )
+            else:
+                fetched[ticker] = fetch_finnhub_earnings(
+                    ticker, start, end, api_key, args.sleep, cache=cache
+                )
+        except Exception as exc:  # noqa: BLE001
+            fetched[ticker] = exc
+    return fetched
+
+
+def refresh_store(
+    store: EarningsEventStore,
+    args: argparse.Namespace,
+    tickers: list[str],
+    start: dt.date,
+    end: dt.date,
+    api_key: str,
+    limiter: TokenBucket | None,
+    cache: ResponseCache | None,
+    endpoints: EndpointMemo | None,
+) -> dict[str, list[dict[str, Any]] | Exception]:
+    """Fetch only the ranges missing from `store`, then read events back from it.
+
+    Tickers are grouped by their missing ranges so a routine daily refresh
+    (every ticker missing the same recent tail) stays a single batched fetch;
+    with --bulk all gaps are merged and fetched once for the whole ticker set.
+    """
+    provider = args.provider
+    settled_through = dt.date.today() - dt.timedelta(days=EVENT_SETTLE_DAYS)
+    groups: dict[tuple[tuple[dt.date, dt.date], ...], list[str]] = {}
+    for ticker in tickers:
+        gaps = tuple(store.missing_ranges(provider, ticker, start, end))
+        if gaps:
+            groups.setdefault(gaps, []).append(ticker)
+    if args.bulk and groups:
+        merged = tuple(merge_ranges(gap for gaps in groups for gap in gaps))
+        groups = {merged: [ticker for group in groups.values() for ticker in group]}
+    errors: dict[str, Exception] = {}
+    for gaps, group in groups.items():
+        for gap_start, gap_end in gaps:
+            fetched = fetch_events(
+                args, group, gap_start, gap_end, api_key, limiter, cache, endpoints
+            )
+            for ticker, events in fetched.items():
+                if isinstance(events, Exception):
+                    errors.setdefault(ticker, events)
+                    continue
+                store.save_events(provider, ticker, events, gap_start, gap_end, settled_through)
+    return {
+        ticker: errors.get(ticker) or store.load_events(provider, ticker, start, end)
+        for ticker in tickers
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    HTTP.timeout = args.timeout
     try:
         start_date = dt.date.fromisoformat(args.start)
         end_date = dt.date.fromisoformat(args.end)
@@ -307,14 +719,17 @@ def main() -> int:
         print("--start must be on or before --end", file=sys.stderr)
         return 1
     provider = args.provider
+    if args.offline and not args.store:
+        print("--offline requires --store", file=sys.stderr)
+        return 1
     if provider == PROVIDER_POLYGON:
-        api_key = os.getenv("POLYGON_API_KEY")
-        if not api_key:
+        api_key = os.getenv("POLYGON_API_KEY") or ""
+        if not api_key and not args.offline:
             print("Missing POLYGON_API_KEY environment variable", file=sys.stderr)
             return 1
     else:
-        api_key = os.getenv("FINNHUB_API_KEY") or os.getenv("FINNHUB_TOKEN")
-        if not api_key:
+        api_key = os.getenv("FINNHUB_API_KEY") or os.getenv("FINNHUB_TOKEN") or ""
+        if not api_key and not args.offline:
             print(
                 "Missing FINNHUB_API_KEY (or FINNHUB_TOKEN) environment variable",
                 file=sys.stderr,
@@ -324,19 +739,44 @@ def main() -> int:
     if not tickers:
         print("No tickers provided", file=sys.stderr)
         return 1
+    if args.concurrency < 1:
+        print("--concurrency must be at least 1", file=sys.stderr)
+        return 1
+    if args.bulk and provider != PROVIDER_FINNHUB:
+        print("--bulk is only supported with --provider finnhub", file=sys.stderr)
+        return 1
+    cache = cache_from_args(args)
+    endpoints = EndpointMemo(args.cache_dir / ENDPOINT_MEMO_FILENAME if cache else None)
+    limiter: TokenBucket | None = None
+    if args.concurrency > 1:
+        rate = args.rate or DEFAULT_RATE_LIMITS[provider]
+        limiter = get_limiter(provider, rate)
+    store = EarningsEventStore(args.store) if args.store else None
+    try:
+        if store is None:
+            fetched = fetch_events(
+                args, tickers, start_date, end_date, api_key, limiter, cache, endpoints
+            )
+        elif args.offline:
+            fetched = {
+                ticker: store.load_events(provider, ticker, start_date, end_date)
+                for ticker in tickers
+            }
+        else:
+            fetched = refresh_store(
+                store, args, tickers, start_date, end_date, api_key, limiter, cache, endpoints
+            )
+    except Exception as exc:  # noqa: BLE001
+        print(f"Error fetching earnings: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        if store is not None:
+            store.close()
     summaries: list[dict[str, Any]] = []
     for ticker in tickers:
-        try:
-            if provider == PROVIDER_POLYGON:
-                events = fetch_polygon_earnings(
-                    ticker, start_date, end_date, api_key, args.sleep
-                )
-            else:
-                events = fetch_finnhub_earnings(
-                    ticker, start_date, end_date, api_key, args.sleep
-                )
-        except Exception as exc:  # noqa: BLE001
-            print(f"Error fetching {ticker}: {exc}", file=sys.stderr)
+        events = fetched[ticker]
+        if isinstance(events, Exception):
+            print(f"Error fetching {ticker}: {events}", file=sys.stderr)
             continue
         summaries.append(summarize_events(ticker, events, start_date, end_date))
         if args.verbose:
@@ -0,0 +1,593 @@
+#!/usr/bin/env python3
+"""Local grid backtest: every threshold combination in one vectorised pass.
+
+Evaluates the per-pocket grid of `reddit-utils/backtest_grid.sql` from the
+arrays exported once by `grid_backtest_inputs.sql` instead of rebuilding temp
+tables in Postgres for every MIN_MENTIONS_LIST x POS_THRESH_LIST x horizon x
+side combination:
+
+    python -m analysis grid-backtest --inputs /tmp/grid_inputs \
+        --start 2025-06-01 --end 2025-09-12 --output /tmp/grid.csv
+
+Per horizon, the forward return of every candidate day is looked up once
+(entry on the first trading day on or after the signal day that has a close
+`hold_days` rows later, as the LATERAL join in the SQL). Per side, the trade
+masks for all (min_mentions, pos_thresh) pairs are a broadcast of the mention
+and score gates, and the per-pocket statistics are segment sums over the
+symbol-sorted candidates. The output carries the grid export columns that
+`grid_hygiene_summary.py` reads (band, trades, sharpe, ...); the optional fold,
+baseline-uplift and volume-percentile stages of the SQL are not reproduced.
+
+Requires numpy + pandas (pyarrow for Parquet inputs/outputs).
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import importlib.util
+import pathlib
+import re
+import sys
+from dataclasses import dataclass, replace
+from typing import Iterator, Sequence
+
+if __package__:
+    from .lazy_import import lazy_import
+else:  # run as a script: `python analysis/grid_backtest.py`
+    from lazy_import import lazy_import
+
+np = lazy_import("numpy", "python3 -m pip install --user numpy pandas")
+pd = lazy_import("pandas", "python3 -m pip install --user numpy pandas")
+
+DAILY_FILE = "grid_daily.csv"
+PRICES_FILE = "grid_prices.csv"
+UNIVERSE_FILE = "grid_universe.csv"
+DAILY_FEATURES = ["volume_zscore_20", "volume_ratio_avg_20", "volume_share_20", "rsi_14"]
+UNIVERSE_FEATURES = [
+    "avg_daily_dollar_volume_30d",
+    "atr_14d",
+    "true_range_pct",
+    "beta_vs_spy",
+    "shares_float",
+    "short_interest_pct_float",
+    "borrow_cost_bps",
+    "hard_to_borrow_flag",
+    "reddit_msgs_30d",
+    "stocktwits_msgs_30d",
+    "sentiment_health_score",
+]
+# Output name of each universe feature (per-symbol, so its mean over trades).
+UNIVERSE_COLUMNS = {
+    name: name if name.startswith("avg_") or name.endswith("_flag") else f"avg_{name}"
+    for name in UNIVERSE_FEATURES
+}
+SIDE_DIRECTIONS = {"LONG": 1, "SHORT": -1}
+# Same column order as the EXPORT_CSV block of backtest_grid.sql, minus the
+# fold and baseline columns.
+RESULT_COLUMNS = [
+    "model_version",
+    "start_date",
+    "end_date",
+    "symbol",
+    "horizon",
+    "side",
+    "min_mentions",
+    "pos_thresh",
+    "band",
+    "trades",
+    "avg_ret",
+    "median_ret",
+    "win_rate",
+    "stdev_ret",
+    "sharpe",
+    "lb",
+    *(f"avg_{name}" for name in DAILY_FEATURES),
+    *UNIVERSE_COLUMNS.values(),
+]
+GRID_SORT = ["symbol", "horizon", "side", "min_mentions", "pos_thresh"]
+# Upper bound on candidate rows x threshold pairs held per block.
+BLOCK_CELLS = 4_000_000
+_HORIZON = re.compile(r"^(\d+)d$")
+
+
+def _csv_list(cast):
+    def parse(value: str) -> tuple:
+        return tuple(cast(item.strip()) for item in value.split(",") if item.strip())
+
+    return parse
+
+
+def hold_days(horizon: str) -> int:
+    match = _HORIZON.match(horizon)
+    if not match or int(match.group(1)) < 1:
+        raise ValueError(f"Unsupported horizon {horizon!r}; expected e.g. '1d', '5d'")
+    return int(match.group(1))
+
+
+@dataclass(frozen=True)
+class GridParams:
+    """Sweep settings; names and defaults follow the psql variables of backtest_grid.sql."""
+
+    min_mentions_list: tuple[int, ...] = (1, 2, 3, 4, 5)
+    pos_thresh_list: tuple[float, ...] = (0.10, 0.15, 0.20, 0.25)
+    horizons: tuple[str, ...] = ("1d", "3d", "5d")
+    sides: tuple[str, ...] = ("LONG", "SHORT")
+    min_mentions_req: int = 3
+    pos_rate_min: float = 0.55
+    avg_abs_min: float = 0.10
+    use_hvv: bool = True
+    min_trades: int = 0
+    min_sharpe: float = -999.0
+    lb_z: float = 1.64
+    band_strong: float = 0.35
+    band_moderate: float = 0.20
+    band_weak: float = 0.10
+    min_volume_z: float | None = None
+    min_volume_ratio: float | None = None
+    min_volume_share: float | None = None
+    rsi_long_max: float | None = None
+    rsi_short_min: float | None = None
+    start: dt.date | None = None
+    end: dt.date | None = None
+    model_version: str = "gpt-sent-v1"
+
+
+def _day_numbers(values: pd.Series) -> np.ndarray:
+    return pd.to_datetime(values).to_numpy("datetime64[D]").astype(np.int64)
+
+
+def _flags(values: pd.Series) -> np.ndarray:
+    """psql booleans ('t'/'f', true/false) as 1.0/0.0, NaN where missing."""
+    text = values.astype(str).str.strip().str.lower()
+    return np.where(values.isna(), np.nan, text.isin(["t", "true", "1"]).astype(np.float64))
+
+
+class GridInputs:
+    """Candidate-day and close arrays, both sorted by (symbol code, day).
+
+    Everything is a plain NumPy array (see `ARRAYS`), so the inputs can be
+    rebuilt around shared or memory-mapped buffers.
+    """
+
+    DAY_ARRAYS = (
+        "day_symbol",
+        "day",
+        "mentions",
+        "avg_raw",
+        "avg_abs",
+        "pos_rate",
+        "neg_rate",
+        "is_hvv",
+        "features",
+    )
+    PRICE_ARRAYS = ("price_symbol", "price_day", "close")
+    ARRAYS = (*DAY_ARRAYS, *PRICE_ARRAYS, "universe")
+
+    def __init__(self, symbols: Sequence[str], arrays: dict[str, np.ndarray]) -> None:
+        self.symbols = np.asarray(symbols, dtype=object)
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    def select_symbols(self, first: int, stop: int) -> "GridInputs":
+        """View of symbol codes [first, stop): row slices, no copies.
+
+        Symbol codes are kept, so results line up with the full inputs.
+        """
+        arrays = self.arrays()
+        day_rows = slice(*np.searchsorted(self.day_symbol, [first, stop]))
+        price_rows = slice(*np.searchsorted(self.price_symbol, [first, stop]))
+        for name in self.DAY_ARRAYS:
+            arrays[name] = arrays[name][day_rows]
+        for name in self.PRICE_ARRAYS:
+            arrays[name] = arrays[name][price_rows]
+        return GridInputs(self.symbols, arrays)
+
+    def window(self, params: GridParams) -> GridParams:
+        """`params` with start/end filled from the exported days when unset."""
+        if (params.start and params.end) or not len(self.day):
+            return params
+        days = self.day.astype("datetime64[D]")
+        return replace(
+            params,
+            start=params.start or days.min().item(),
+            end=params.end or (days.max() + 1).item(),
+        )
+
+    @classmethod
+    def from_frames(
+        cls,
+        daily: pd.DataFrame,
+        prices: pd.DataFrame,
+        universe: pd.DataFrame | None = None,
+    ) -> "GridInputs":
+        daily = daily.assign(symbol=daily["symbol"].str.strip().str.upper())
+        prices = prices.assign(symbol=prices["symbol"].str.strip().str.upper())
+        symbols = pd.Index(pd.concat([daily["symbol"], prices["symbol"]]).unique()).sort_values()
+        daily = daily.assign(_day=_day_numbers(daily["d"])).sort_values(["symbol", "_day"])
+        prices = (
+            prices.assign(_day=_day_numbers(prices["d"]))
+            .sort_values(["symbol", "_day"])
+            .drop_duplicates(["symbol", "_day"], keep="last")
+        )
+        if universe is None:
+            universe = pd.DataFrame(columns=["symbol", *UNIVERSE_FEATURES])
+        universe = universe.assign(symbol=universe["symbol"].astype(str).str.strip().str.upper())
+        universe = universe.drop_duplicates("symbol", keep="last").set_index("symbol")
+        universe = universe.reindex(symbols).reindex(columns=UNIVERSE_FEATURES)
+        universe["hard_to_borrow_flag"] = _flags(universe["hard_to_borrow_flag"])
+        return cls(
+            symbols,
+            {
+                "day_symbol": symbols.get_indexer(daily["symbol"]).astype(np.int64),
+                "day": daily["_day"].to_numpy(np.int64),
+                **{
+                    col: daily[col].to_numpy(np.float64, na_value=np.nan)
+                    for col in ("mentions", "avg_raw", "avg_abs", "pos_rate", "neg_rate")
+                },
+                "is_hvv": _flags(daily["is_hvv"]) == 1,
+                "features": daily.reindex(columns=DAILY_FEATURES).to_numpy(
+                    np.float64, na_value=np.nan
+                ),
+                "price_symbol": symbols.get_indexer(prices["symbol"]).astype(np.int64),
+                "price_day": prices["_day"].to_numpy(np.int64),
+                "close": prices["close"].to_numpy(np.float64, na_value=np.nan),
+                "universe": universe.to_numpy(np.float64, na_value=np.nan),
+            },
+        )
+
+    @classmethod
+    def load(cls, directory: pathlib.Path) -> "GridInputs":
+        """Read the `grid_backtest_inputs.sql` export (CSV or same-named Parquet)."""
+
+        def read(name: str, required: bool = True) -> pd.DataFrame | None:
+            for path in (directory / name, (directory / name).with_suffix(".parquet")):
+                if path.exists():
+                    if path.suffix == ".parquet":
+                        return pd.read_parquet(path)
+                    return pd.read_csv(path, dtype={"symbol": str})
+            if required:
+                raise SystemExit(f"Grid input not found: {directory / name}")
+            return None
+
+        return cls.from_frames(read(DAILY_FILE), read(PRICES_FILE), read(UNIVERSE_FILE, False))
+
+
+def forward_returns(inputs: GridInputs, days: int) -> np.ndarray:
+    """Return of each candidate day held for `days` closes; NaN when not tradable.
+
+    Entry is the first price row on or after the candidate day whose symbol
+    still has a close `days` rows later; a missing or zero entry close drops
+    the trade.
+    """
+    n = len(inputs.close)
+    if not n or not len(inputs.day):
+        return np.full(len(inputs.day), np.nan)
+    rows = np.arange(n)
+    exits = np.minimum(rows + days, n - 1)
+    has_exit = (
+        (rows + days < n)
+        & (inputs.price_symbol[exits] == inputs.price_symbol)
+        & ~np.isnan(inputs.close[exits])
+    )
+    # Next row (at or after each row) that has an exit close; n when none.
+    next_entry = np.append(np.minimum.accumulate(np.where(has_exit, rows, n)[::-1])[::-1], n)
+    first = min(int(inputs.price_day.min()), int(inputs.day.min()))
+    span = max(int(inputs.price_day.max()), int(inputs.day.max())) - first + 1
+    price_keys = inputs.price_symbol * span + (inputs.price_day - first)
+    day_keys = inputs.day_symbol * span + (inputs.day - first)
+    entry = next_entry[np.searchsorted(price_keys, day_keys)]
+    tradable = entry < n
+    entry = np.minimum(entry, n - 1)
+    entry_close = inputs.close[entry]
+    tradable &= (inputs.price_symbol[entry] == inputs.day_symbol) & (entry_close != 0)
+    tradable &= ~np.isnan(entry_close)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = inputs.close[np.minimum(entry + days, n - 1)] / entry_close - 1.0
+    return np.where(tradable, returns, np.nan)
+
+
+def _candidates(inputs: GridInputs, params: GridParams) -> np.ndarray:
+    """Candidate days passing the threshold-independent gates."""
+    keep = np.nan_to_num(inputs.avg_abs) >= params.avg_abs_min
+    if params.use_hvv:
+        keep &= inputs.is_hvv
+    if params.start is not None:
+        keep &= inputs.day >= np.datetime64(params.start, "D").astype(np.int64)
+    if params.end is not None:
+        keep &= inputs.day < np.datetime64(params.end, "D").astype(np.int64)
+    volume_z, volume_ratio, volume_share, _ = inputs.features.T
+    with np.errstate(invalid="ignore"):
+        for value, floor in (
+            (volume_z, params.min_volume_z),
+            (volume_ratio, params.min_volume_ratio),
+            (volume_share, params.min_volume_share),
+        ):
+            if floor is not None:
+                keep &= value >= floor
+    return keep
+
+
+def _side_gate(inputs: GridInputs, params: GridParams, side: str) -> np.ndarray:
+    rsi = inputs.features[:, DAILY_FEATURES.index("rsi_14")]
+    with np.errstate(invalid="ignore"):
+        if side == "LONG":
+            keep = inputs.pos_rate >= params.pos_rate_min
+            if params.rsi_long_max is not None:
+                keep &= rsi <= params.rsi_long_max
+        else:
+            keep = inputs.neg_rate >= params.pos_rate_min
+            if params.rsi_short_min is not None:
+                keep &= rsi >= params.rsi_short_min
+    return keep
+
+
+def _blocks(starts: np.ndarray, rows: int, width: int) -> Iterator[tuple[int, int, np.ndarray]]:
+    """(first row, end row, local segment starts) of symbol-aligned row blocks."""
+    per_block = max(BLOCK_CELLS // max(width, 1), 1)
+    cuts = np.flatnonzero(np.diff(starts // per_block)) + 1
+    for segment in np.split(starts, cuts):
+        end = starts[starts > segment[-1]][:1]
+        stop = int(end[0]) if len(end) else rows
+        yield int(segment[0]), stop, segment - segment[0]
+
+
+def pocket_stats(
+    returns: np.ndarray,
+    mask: np.ndarray,
+    features: np.ndarray,
+    starts: np.ndarray,
+) -> dict[str, np.ndarray]:
+    """Per (segment, column) trade statistics of `returns` where `mask` is set.
+
+    `returns` must be sorted within each segment (for the median); rows are
+    candidates, columns threshold pairs, and segments start at `starts`.
+    """
+    rows, width = mask.shape
+    weights = mask.astype(np.float64)
+    segment = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, rows)))
+    trades = np.add.reduceat(weights, starts, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg = np.add.reduceat(weights * returns[:, None], starts, axis=0) / trades
+        dev = np.where(mask, returns[:, None] - avg[segment], 0.0)
+        stdev = np.sqrt(np.add.reduceat(dev * dev, starts, axis=0) / trades)
+        stats = {
+            "trades": trades,
+            "avg_ret": avg,
+            "win_rate": np.add.reduceat(weights * (returns > 0)[:, None], starts, axis=0) / trades,
+            "stdev_ret": stdev,
+        }
+        # Median: the middle one or two masked rows by running count per segment.
+        rank = np.cumsum(mask, axis=0, dtype=np.int64)
+        rank -= np.vstack([np.zeros((1, width), dtype=np.int64), rank])[starts][segment]
+        count = trades.astype(np.int64)[segment]
+        middle = 0.0
+        for target in ((count - 1) // 2 + 1, count // 2 + 1):
+            middle = middle + np.add.reduceat(
+                np.where(mask & (rank == target), returns[:, None], 0.0), starts, axis=0
+            )
+        stats["median_ret"] = middle / 2
+        for index, name in enumerate(DAILY_FEATURES):
+            value = features[:, index]
+            valid = ~np.isnan(value)
+            total = np.add.reduceat(weights * np.where(valid, value, 0.0)[:, None], starts, axis=0)
+            stats[f"avg_{name}"] = total / np.add.reduceat(
+                weights * valid[:, None], starts, axis=0
+            )
+    return stats
+
+
+def evaluate_grid(inputs: GridInputs, params: GridParams) -> pd.DataFrame:
+    """Per-pocket results for every (symbol, horizon, side, min_mentions, pos_thresh)."""
+    params = inputs.window(params)
+    min_mentions = np.asarray(params.min_mentions_list, dtype=np.int64)
+    pos_thresh = np.asarray(params.pos_thresh_list, dtype=np.float64)
+    width = len(min_mentions) * len(pos_thresh)
+    mention_floor = np.maximum(min_mentions, params.min_mentions_req)
+    candidates = _candidates(inputs, params)
+    frames = []
+    for horizon in params.horizons:
+        returns = forward_returns(inputs, hold_days(horizon))
+        for side in params.sides:
+            direction = SIDE_DIRECTIONS[side]
+            rows = np.flatnonzero(
+                candidates & _side_gate(inputs, params, side) & ~np.isnan(returns)
+            )
+            signed = returns[rows] * direction
+            # Symbol-major, return-minor order: segments per symbol, sorted for the median.
+            order = np.lexsort((signed, inputs.day_symbol[rows]))
+            rows, signed = rows[order], signed[order]
+            symbol = inputs.day_symbol[rows]
+            if not len(rows):
+                continue
+            starts = np.flatnonzero(np.r_[True, symbol[1:] != symbol[:-1]])
+            for first, stop, local in _blocks(starts, len(rows), width):
+                block = rows[first:stop]
+                raw = inputs.avg_raw[block]
+                if side == "LONG":
+                    scores = raw[:, None] >= pos_thresh
+                else:
+                    scores = raw[:, None] <= -pos_thresh
+                mask = (
+                    (inputs.mentions[block][:, None] >= mention_floor)[:, :, None]
+                    & scores[:, None, :]
+                ).reshape(len(block), width)
+                stats = pocket_stats(signed[first:stop], mask, inputs.features[block], local)
+                frames.append(
+                    pd.DataFrame(
+                        {
+                            "symbol_code": np.repeat(symbol[first:stop][local], width),
+                            "horizon": horizon,
+                            "side": side,
+                            "min_mentions": np.tile(
+                                np.repeat(min_mentions, len(pos_thresh)), len(local)
+                            ),
+                            "pos_thresh": np.tile(pos_thresh, len(local) * len(min_mentions)),
+                            **{name: values.ravel() for name, values in stats.items()},
+                        }
+                    )
+                )
+    return _finish(inputs, params, frames)
+
+
+def _finish(inputs: GridInputs, params: GridParams, frames: list[pd.DataFrame]) -> pd.DataFrame:
+    if not frames:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    grid = pd.concat(frames, ignore_index=True)
+    grid = grid[grid["trades"] >= max(params.min_trades, 1)]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stdev = grid["stdev_ret"].to_numpy()
+        sharpe = np.where(stdev > 0, grid["avg_ret"].to_numpy() / stdev, np.nan)
+    grid = grid.assign(sharpe=sharpe)
+    grid = grid[grid["sharpe"].fillna(-999) >= params.min_sharpe].copy()
+    grid["trades"] = grid["trades"].astype(np.int64)
+    grid["lb"] = grid["avg_ret"] - params.lb_z * grid["stdev_ret"] / np.sqrt(grid["trades"])
+    grid["band"] = np.select(
+        [
+            grid["pos_thresh"] >= params.band_strong,
+            grid["pos_thresh"] >= params.band_moderate,
+            grid["pos_thresh"] >= params.band_weak,
+        ],
+        ["STRONG", "MODERATE", "WEAK"],
+        "VERY_WEAK",
+    )
+    codes = grid.pop("symbol_code").to_numpy()
+    grid["symbol"] = inputs.symbols[codes]
+    for index, column in enumerate(UNIVERSE_COLUMNS.values()):
+        grid[column] = inputs.universe[codes, index]
+    grid["hard_to_borrow_flag"] = grid["hard_to_borrow_flag"].map({1.0: True, 0.0: False})
+    grid["model_version"] = params.model_version
+    grid["start_date"] = params.start
+    grid["end_date"] = params.end
+    grid = grid.sort_values(GRID_SORT, kind="stable", ignore_index=True)
+    return grid[RESULT_COLUMNS]
+
+
+def summary_line(grid: pd.DataFrame) -> str:
+    """The overall summary row backtest_grid.sql prints before the grid."""
+    return (
+        f"pockets={len(grid)} n_trades={int(grid['trades'].sum())} "
+        f"avg_ret={grid['avg_ret'].mean():.6f} win_rate={grid['win_rate'].mean():.3f} "
+        f"mean_sharpe={grid['sharpe'].mean():.4f}"
+    )
+
+
+def write_grid(grid: pd.DataFrame, path: pathlib.Path) -> None:
+    """Write Parquet by suffix, else CSV (through pyarrow when installed: the
+    float formatting of `DataFrame.to_csv` dominates a full-grid run)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() in {".parquet", ".pq"}:
+        grid.to_parquet(path, index=False)
+    elif importlib.util.find_spec("pyarrow") is not None:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+
+        pacsv.write_csv(
+            pa.Table.from_pandas(grid, preserve_index=False),
+            path,
+            pacsv.WriteOptions(quoting_style="needed"),
+        )
+    else:
+        grid.to_csv(path, index=False)
+
+
+def add_param_arguments(parser: argparse.ArgumentParser) -> None:
+    """Sweep flags shared by the grid runners (psql variable names, lower-cased)."""
+    defaults = GridParams()
+    parser.add_argument("--start", type=dt.date.fromisoformat, help="First signal day (inclusive)")
+    parser.add_argument("--end", type=dt.date.fromisoformat, help="Last signal day (exclusive)")
+    parser.add_argument("--model-version", default=defaults.model_version)
+    parser.add_argument(
+        "--min-mentions-list", type=_csv_list(int), default=defaults.min_mentions_list
+    )
+    parser.add_argument(
+        "--pos-thresh-list", type=_csv_list(float), default=defaults.pos_thresh_list
+    )
+    parser.add_argument("--horizons", type=_csv_list(str), default=defaults.horizons)
+    parser.add_argument(
+        "--sides", type=_csv_list(lambda side: side.upper()), default=defaults.sides
+    )
+    parser.add_argument("--min-mentions-req", type=int, default=defaults.min_mentions_req)
+    parser.add_argument("--pos-rate-min", type=float, default=defaults.pos_rate_min)
+    parser.add_argument("--avg-abs-min", type=float, default=defaults.avg_abs_min)
+    parser.add_argument(
+        "--no-hvv", action="store_true", help="Do not require the HVV flag (USE_HVV=0)"
+    )
+    parser.add_argument("--min-trades", type=int, default=defaults.min_trades)
+    parser.add_argument("--min-sharpe", type=float, default=defaults.min_sharpe)
+    parser.add_argument("--lb-z", type=float, default=defaults.lb_z)
+    parser.add_argument("--band-strong", type=float, default=defaults.band_strong)
+    parser.add_argument("--band-moderate", type=float, default=defaults.band_moderate)
+    parser.add_argument("--band-weak", type=float, default=defaults.band_weak)
+    for name in ("min-volume-z", "min-volume-ratio", "min-volume-share"):
+        parser.add_argument(f"--{name}", type=float, help="Optional TA gate (default: off)")
+    for name in ("rsi-long-max", "rsi-short-min"):
+        parser.add_argument(f"--{name}", type=float, help="Optional RSI gate (default: off)")
+
+
+def params_from_args(parser: argparse.ArgumentParser, args: argparse.Namespace) -> GridParams:
+    for side in args.sides:
+        if side not in SIDE_DIRECTIONS:
+            parser.error(f"unknown side {side!r}; choose from {', '.join(SIDE_DIRECTIONS)}")
+    for horizon in args.horizons:
+        try:
+            hold_days(horizon)
+        except ValueError as exc:
+            parser.error(str(exc))
+    if args.start and args.end and args.start >= args.end:
+        parser.error("--start must be before --end")
+    return GridParams(
+        min_mentions_list=args.min_mentions_list,
+        pos_thresh_list=args.pos_thresh_list,
+        horizons=args.horizons,
+        sides=args.sides,
+        min_mentions_req=args.min_mentions_req,
+        pos_rate_min=args.pos_rate_min,
+        avg_abs_min=args.avg_abs_min,
+        use_hvv=not args.no_hvv,
+        min_trades=args.min_trades,
+        min_sharpe=args.min_sharpe,
+        lb_z=args.lb_z,
+        band_strong=args.band_strong,
+        band_moderate=args.band_moderate,
+        band_weak=args.band_weak,
+        min_volume_z=args.min_volume_z,
+        min_volume_ratio=args.min_volume_ratio,
+        min_volume_share=args.min_volume_share,
+        rsi_long_max=args.rsi_long_max,
+        rsi_short_min=args.rsi_short_min,
+        start=args.start,
+        end=args.end,
+        model_version=args.model_version,
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Vectorised local grid backtest.")
+    parser.add_argument(
+        "--inputs",
+        type=pathlib.Path,
+        required=True,
+        help="Directory written by grid_backtest_inputs.sql",
+    )
+    parser.add_argument(
+        "--output",
+        type=pathlib.Path,
+        required=True,
+        help="Grid file to write (.csv, or .parquet)",
+    )
+    add_param_arguments(parser)
+    args = parser.parse_args(argv)
+    params = params_from_args(parser, args)
+
+    grid = evaluate_grid(GridInputs.load(args.inputs), params)
+    write_grid(grid, args.output)
+    print(summary_line(grid))
+    print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+-- grid_backtest_inputs.sql
+-- Inputs for the local grid engine (analysis/grid_backtest.py): one export
+-- replaces re-running reddit-utils/backtest_grid.sql per sweep. Writes three
+-- CSVs into OUT_DIR:
+--   grid_daily.csv     blended Reddit/StockTwits sentiment per symbol-day (as
+--                      tmp_daily in backtest_grid.sql) + HVV flag and TA features
+--   grid_prices.csv    closes per symbol-day, padded past END_DATE for exits
+--   grid_universe.csv  ticker_universe features averaged into the grid output
+-- Thresholds, horizons, sides and gates are applied locally, so export a wide
+-- window once and sweep sub-windows with --start/--end.
+-- Usage:
+--   mkdir -p /tmp/grid_inputs && psql "$PGURI" \
+--     -v START_DATE='2025-06-01' \
+--     -v END_DATE='2025-09-12' \
+--     -v OUT_DIR=/tmp/grid_inputs \
+--     -f analysis/grid_backtest_inputs.sql
+--   python -m analysis grid-backtest --inputs /tmp/grid_inputs --output /tmp/grid.csv
+
+\set ON_ERROR_STOP on
+
+\if :{?MODEL_VERSION}     \else \set MODEL_VERSION      'gpt-sent-v1'          \endif
+\if :{?START_DATE}        \else \set START_DATE         '2025-06-01'           \endif
+\if :{?END_DATE}          \else \set END_DATE           '2025-09-12'           \endif
+\if :{?MIN_CONF}          \else \set MIN_CONF           0.70                   \endif
+\if :{?W_REDDIT}          \else \set W_REDDIT           1.0                    \endif
+\if :{?W_STOCKTWITS}      \else \set W_STOCKTWITS       0.0                    \endif
+\if :{?INCLUDE_INACTIVE}  \else \set INCLUDE_INACTIVE   0                      \endif
+\if :{?SYMBOLS}           \else \set SYMBOLS            NULL                   \endif
+-- Calendar days of closes kept after END_DATE so the longest horizon can exit.
+\if :{?EXIT_PAD_DAYS}     \else \set EXIT_PAD_DAYS      21                     \endif
+\if :{?OUT_DIR}           \else \set OUT_DIR            /tmp/grid_inputs       \endif
+
+\set DAILY_CSV :OUT_DIR '/grid_daily.csv'
+\set PRICES_CSV :OUT_DIR '/grid_prices.csv'
+\set UNIVERSE_CSV :OUT_DIR '/grid_universe.csv'
+
+COPY (
+WITH scored AS (
+  SELECT
+    upper(m.symbol)              AS symbol,
+    m.created_utc::date          AS d,
+    s.score::numeric             AS score
+  FROM reddit_mentions m
+  JOIN reddit_sentiment s
+    ON s.mention_id = m.mention_id
+  JOIN ticker_universe tu
+    ON tu.symbol = upper(m.symbol)
+  WHERE s.model_version = :'MODEL_VERSION'
+    AND m.created_utc::date >= (:'START_DATE')::date
+    AND m.created_utc::date <  (:'END_DATE')::date
+    AND COALESCE(s.confidence, 0) >= (:'MIN_CONF')::numeric
+    AND m.doc_type IN ('post', 'comment')
+    AND m.symbol IS NOT NULL AND m.symbol <> ''
+    AND ((:'INCLUDE_INACTIVE')::int = 1 OR tu.active = true)
+    AND (
+          NULLIF(:'SYMBOLS','NULL') IS NULL
+          OR upper(m.symbol) = ANY (string_to_array(upper(NULLIF(:'SYMBOLS','NULL')), ',')::text[])
+        )
+),
+daily_reddit AS (
+  SELECT
+    symbol,
+    d,
+    COUNT(*)                       AS reddit_mentions,
+    AVG(score)                     AS reddit_avg_raw,
+    AVG(ABS(score))                AS reddit_avg_abs,
+    SUM((score > 0)::int)::numeric AS reddit_pos_mentions,
+    SUM((score < 0)::int)::numeric AS reddit_neg_mentions
+  FROM scored
+  GROUP BY 1,2
+),
+stocktwits AS (
+  SELECT
+    trade_date::date                       AS d,
+    upper(symbol)                          AS symbol,
+    COALESCE(total_messages, 0)::numeric   AS st_mentions,
+    COALESCE(bullish_messages, 0)::numeric AS st_pos_messages,
+    COALESCE(bearish_messages, 0)::numeric AS st_neg_messages,
+    COALESCE(sentiment_score, 0)::numeric  AS st_sentiment_score
+  FROM public.v_stocktwits_daily_signals
+  WHERE trade_date >= (:'START_DATE')::date
+    AND trade_date <  (:'END_DATE')::date
+    AND (
+          NULLIF(:'SYMBOLS','NULL') IS NULL
+          OR upper(symbol) = ANY (string_to_array(upper(NULLIF(:'SYMBOLS','NULL')), ',')::text[])
+        )
+),
+merged AS (
+  SELECT
+    COALESCE(r.symbol, s.symbol)       AS symbol,
+    COALESCE(r.d, s.d)                 AS d,
+    COALESCE(r.reddit_mentions, 0)     AS reddit_mentions,
+    COALESCE(r.reddit_pos_mentions, 0) AS reddit_pos_mentions,
+    COALESCE(r.reddit_neg_mentions, 0) AS reddit_neg_mentions,
+    COALESCE(r.reddit_avg_raw, 0)      AS reddit_avg_raw,
+    COALESCE(r.reddit_avg_abs, 0)      AS reddit_avg_abs,
+    COALESCE(s.st_mentions, 0)         AS st_mentions,
+    COALESCE(s.st_pos_messages, 0)     AS st_pos_messages,
+    COALESCE(s.st_neg_messages, 0)     AS st_neg_messages,
+    COALESCE(s.st_sentiment_score, 0)  AS st_sentiment_score
+  FROM daily_reddit r
+  FULL OUTER JOIN stocktwits s
+    ON r.symbol = s.symbol AND r.d = s.d
+),
+weighted AS (
+  SELECT
+    *,
+    (:W_REDDIT::numeric * reddit_mentions + :W_STOCKTWITS::numeric * st_mentions) AS denom_weighted
+  FROM merged
+)
+SELECT
+  w.symbol,
+  w.d,
+  (w.reddit_mentions + w.st_mentions) AS mentions,
+  CASE
+    WHEN w.denom_weighted > 0 THEN (
+      :W_REDDIT::numeric * w.reddit_avg_raw * w.reddit_mentions +
+      :W_STOCKTWITS::numeric * w.st_sentiment_score * w.st_mentions
+    ) / w.denom_weighted
+    ELSE COALESCE(w.reddit_avg_raw, w.st_sentiment_score)
+  END AS avg_raw,
+  CASE
+    WHEN w.denom_weighted > 0 THEN (
+      :W_REDDIT::numeric * w.reddit_avg_abs * w.reddit_mentions +
+      :W_STOCKTWITS::numeric * ABS(w.st_sentiment_score) * w.st_mentions
+    ) / w.denom_weighted
+    ELSE COALESCE(w.reddit_avg_abs, ABS(w.st_sentiment_score))
+  END AS avg_abs,
+  CASE
+    WHEN w.reddit_mentions + w.st_mentions > 0
+      THEN (w.reddit_pos_mentions + w.st_pos_messages) / (w.reddit_mentions + w.st_mentions)
+    ELSE 0
+  END AS pos_rate,
+  CASE
+    WHEN w.reddit_mentions + w.st_mentions > 0
+      THEN (w.reddit_neg_mentions + w.st_neg_messages) / (w.reddit_mentions + w.st_mentions)
+    ELSE 0
+  END AS neg_rate,
+  COALESCE(hvv.is_hvv, false) AS is_hvv,
+  f.volume_zscore_20,
+  f.volume_ratio_avg_20,
+  f.volume_share_20,
+  f.rsi_14
+FROM weighted w
+LEFT JOIN v_market_rolling_features f
+  ON f.symbol = w.symbol
+ AND f.data_date = w.d
+LEFT JOIN hvv_universe_daily hvv
+  ON hvv.symbol = w.symbol
+ AND hvv.data_date = w.d
+ORDER BY w.symbol, w.d
+) TO STDOUT WITH (FORMAT csv, HEADER) \g :DAILY_CSV
+\echo 'Daily inputs written to ' :DAILY_CSV
+
+COPY (
+  SELECT
+    upper(symbol)        AS symbol,
+    data_date::date      AS d,
+    price_close::float8  AS close
+  FROM enhanced_market_data
+  WHERE data_date >= (:'START_DATE')::date
+    AND data_date <  (:'END_DATE')::date + (:'EXIT_PAD_DAYS')::int
+    AND (
+          NULLIF(:'SYMBOLS','NULL') IS NULL
+          OR upper(symbol) = ANY (string_to_array(upper(NULLIF(:'SYMBOLS','NULL')), ',')::text[])
+        )
+  ORDER BY 1, 2
+) TO STDOUT WITH (FORMAT csv, HEADER) \g :PRICES_CSV
+\echo 'Closes written to ' :PRICES_CSV
+
+COPY (
+  SELECT
+    symbol,
+    avg_daily_dollar_volume_30d,
+    atr_14d,
+    true_range_pct,
+    beta_vs_spy,
+    shares_float,
+    short_interest_pct_float,
+    borrow_cost_bps,
+    hard_to_borrow_flag,
+    reddit_msgs_30d,
+    stocktwits_msgs_30d,
+    sentiment_health_score
+  FROM ticker_universe
+  ORDER BY symbol
+) TO STDOUT WITH (FORMAT csv, HEADER) \g :UNIVERSE_CSV
+\echo 'Universe features written to ' :UNIVERSE_CSV
@@ -13,56 +13,279 @@ Typical usage after a sweep:
         --output results/grid_full_summary.md \
         --plots results
 
-The script expects pandas, and the `--plots` option additionally requires
-matplotlib + seaborn (install with `python3 -m pip install --user pandas
-matplotlib seaborn`).
+`--input` may be the CSV export or a Parquet/Arrow file. A CSV is converted on
+first read into a compact Parquet sidecar (`<name>.hygiene.parquet`, only the
+columns used here, categorical keys and float32 metrics) that later runs load
+instead while it is newer than the CSV. For exports larger than RAM,
+`--chunksize N` streams the grid N rows at a time through the same mergeable
+aggregates and produces identical tables (plots need the in-memory path).
+
+`--history-dir DIR` instead indexes every dated export in DIR into the history
+directory `DIR/grid_history/` (one Parquet file per export plus a `runs.json`
+manifest; only files not indexed yet are parsed) and reports
+run-over-run drift: Sharpe of promoted pockets and pockets entering or leaving
+the Sharpe top-K.
+
+Promoted pockets are read from `--promoted` (default: the checked-in
+`promoted_pockets.csv`); point it at an export of `live_sentiment_entry_rules`
+after `promote_rules_from_grid.sql` runs to refresh the set without code edits.
+
+The script expects pandas (plus pyarrow for Parquet/Arrow), and the `--plots`
+option (rendered in parallel worker processes, see `grid_plots.py`)
+additionally requires matplotlib + seaborn (install with `python3 -m pip
+install --user pandas pyarrow matplotlib seaborn`).
 """
 from __future__ import annotations
 
 import argparse
+import datetime as dt
+import importlib.util
+import json
+import os
 import pathlib
+import re
 import sys
-from typing import Dict, Iterable, Tuple
-
-try:
-    import pandas as pd
-except ImportError as exc:  # pragma: no cover - runtime guard
-    raise SystemExit(
-        "pandas is required. install with `python3 -m pip install --user pandas`."
-    ) from exc
-
-# Hard-coded set of promoted pockets from the most recent promotion run.
-PROMOTED_KEYS: set[Tuple[str, str, str, int, float]] = {
-    ("SOFI", "5d", "LONG", 4, 0.15),
-    ("SOUN", "3d", "LONG", 4, 0.15),
-    ("SPY", "5d", "LONG", 2, 0.05),
-    ("SPY", "3d", "LONG", 2, 0.10),
-    ("TSLA", "5d", "LONG", 4, 0.10),
-    ("SOUN", "5d", "LONG", 6, 0.10),
-    ("GOOGL", "5d", "LONG", 6, 0.15),
-    ("SOUN", "1d", "LONG", 6, 0.15),
-    ("FUBO", "5d", "LONG", 6, 0.05),
-    ("MARA", "3d", "LONG", 4, 0.05),
-    ("GOOGL", "3d", "LONG", 6, 0.15),
-    ("MSFT", "5d", "LONG", 4, 0.05),
-    ("SOFI", "3d", "LONG", 6, 0.15),
-    ("AAPL", "3d", "LONG", 6, 0.05),
-    ("PYPL", "1d", "LONG", 2, 0.15),
-    ("FUBO", "3d", "LONG", 6, 0.05),
-    ("HOOD", "5d", "LONG", 2, 0.10),
-    ("BBAI", "3d", "LONG", 6, 0.15),
-    ("INTC", "5d", "LONG", 6, 0.05),
-    ("BBAI", "5d", "LONG", 2, 0.10),
-    ("AAPL", "5d", "LONG", 2, 0.05),
-    ("AMD", "1d", "LONG", 2, 0.15),
-    ("ASTS", "3d", "LONG", 6, 0.15),
-    ("AMD", "5d", "LONG", 4, 0.15),
-    ("SNAP", "3d", "LONG", 4, 0.05),
-    ("HOOD", "3d", "LONG", 2, 0.10),
-    ("BBAI", "1d", "LONG", 6, 0.15),
-    ("ASTS", "1d", "LONG", 6, 0.10),
-    ("AMD", "3d", "LONG", 6, 0.15),
+from typing import Any, Dict, Iterable, Iterator, Sequence, Tuple
+
+if __package__:
+    from .grid_plots import DEFAULT_MAX_POINTS, LARGE_SCATTER_MODES, PLOT_KINDS, render_plots
+    from .lazy_import import lazy_import
+else:  # run as a script: `python analysis/grid_hygiene_summary.py`
+    from grid_plots import DEFAULT_MAX_POINTS, LARGE_SCATTER_MODES, PLOT_KINDS, render_plots
+    from lazy_import import lazy_import
+
+# Loaded on first use so `--help` and argument errors return immediately.
+np = lazy_import("numpy", "python3 -m pip install --user numpy")
+pd = lazy_import("pandas", "python3 -m pip install --user pandas")
+
+GRID_KEY_COLUMNS = ["symbol", "horizon", "side", "min_mentions", "pos_thresh"]
+GRID_COLUMNS = [
+    *GRID_KEY_COLUMNS,
+    "band",
+    "sharpe",
+    "trades",
+    "avg_daily_dollar_volume_30d",
+    "avg_sentiment_health_score",
+    "avg_beta_vs_spy",
+]
+# pos_thresh stays float64 so it compares exactly against promoted thresholds;
+# the integer columns are nullable since exports can leave cells blank.
+GRID_DTYPES: Dict[str, str] = {
+    "symbol": "category",
+    "horizon": "category",
+    "side": "category",
+    "band": "category",
+    "min_mentions": "Int16",
+    "pos_thresh": "float64",
+    "sharpe": "float32",
+    "trades": "Int32",
+    "avg_daily_dollar_volume_30d": "float32",
+    "avg_sentiment_health_score": "float32",
+    "avg_beta_vs_spy": "float32",
 }
+# Metrics averaged by the grouped summary tables, and the Top Pockets layout.
+SUMMARY_METRICS = [
+    "sharpe",
+    "trades",
+    "avg_daily_dollar_volume_30d",
+    "avg_sentiment_health_score",
+]
+TOP_COLUMNS = GRID_COLUMNS
+TOP_K = 20
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+ARROW_SUFFIXES = {".arrow", ".feather", ".ipc"}
+PARQUET_CACHE_SUFFIX = ".hygiene.parquet"
+
+# Grid history index (--history-dir): a directory with one Parquet file of
+# per-pocket metrics per ingested export, plus a JSON ingest manifest.
+HISTORY_INDEX_NAME = "grid_history"
+HISTORY_MANIFEST_NAME = "runs.json"
+HISTORY_CHUNKSIZE = 500_000
+GRID_EXPORT_SUFFIXES = {".csv"} | PARQUET_SUFFIXES | ARROW_SUFFIXES
+_EXPORT_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Promoted pockets default to this checked-in snapshot; pass --promoted with a
+# fresh export of live_sentiment_entry_rules after promote_rules_from_grid.sql.
+DEFAULT_PROMOTED_PATH = pathlib.Path(__file__).with_name("promoted_pockets.csv")
+
+
+def parquet_cache_path(csv_path: pathlib.Path) -> pathlib.Path:
+    return csv_path.with_name(csv_path.stem + PARQUET_CACHE_SUFFIX)
+
+
+def _read_columnar(path: pathlib.Path) -> pd.DataFrame:
+    try:
+        if path.suffix.lower() in ARROW_SUFFIXES:
+            df = pd.read_feather(path, columns=GRID_COLUMNS)
+        else:
+            df = pd.read_parquet(path, columns=GRID_COLUMNS)
+    except ImportError as exc:  # pragma: no cover - runtime guard
+        raise SystemExit(
+            "pyarrow is required for Parquet/Arrow input. install with "
+            "`python3 -m pip install --user pyarrow`."
+        ) from exc
+    return df.astype(GRID_DTYPES)
+
+
+def _sidecar_is_fresh(cached: pathlib.Path, csv_path: pathlib.Path) -> bool:
+    return cached.exists() and cached.stat().st_mtime >= csv_path.stat().st_mtime
+
+
+def load_grid(path: pathlib.Path, parquet_cache: bool = True) -> pd.DataFrame:
+    """Load the grid columns used by `analyse_grid` with compact dtypes."""
+    if path.suffix.lower() in PARQUET_SUFFIXES | ARROW_SUFFIXES:
+        return _read_columnar(path)
+
+    cached = parquet_cache_path(path)
+    if parquet_cache and _sidecar_is_fresh(cached, path):
+        try:
+            return pd.read_parquet(cached, columns=GRID_COLUMNS).astype(GRID_DTYPES)
+        except (ImportError, OSError, ValueError):
+            pass  # unreadable or outdated sidecar; rebuild it below
+
+    df = pd.read_csv(path, usecols=GRID_COLUMNS, dtype=GRID_DTYPES)
+    if parquet_cache:
+        tmp = cached.with_name(cached.name + ".tmp")
+        try:
+            df.to_parquet(tmp, index=False)
+            os.replace(tmp, cached)
+        except (ImportError, OSError) as exc:
+            tmp.unlink(missing_ok=True)
+            print(f"Skipping Parquet cache for {path}: {exc}", file=sys.stderr)
+    return df
+
+
+def _require_pyarrow() -> None:
+    if importlib.util.find_spec("pyarrow") is None:  # pragma: no cover - runtime guard
+        raise SystemExit(
+            "pyarrow is required for Parquet/Arrow input. install with "
+            "`python3 -m pip install --user pyarrow`."
+        )
+
+
+def _iter_columnar_chunks(path: pathlib.Path, chunksize: int) -> Iterator[pd.DataFrame]:
+    _require_pyarrow()
+    import pyarrow.dataset as pads
+
+    fmt = "ipc" if path.suffix.lower() in ARROW_SUFFIXES else "parquet"
+    offset = 0
+    for batch in pads.dataset(path, format=fmt).to_batches(
+        columns=GRID_COLUMNS, batch_size=chunksize
+    ):
+        chunk = batch.to_pandas().astype(GRID_DTYPES)
+        # Keep row labels global, matching what the in-memory path reports.
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield chunk
+
+
+def iter_grid_chunks(
+    path: pathlib.Path,
+    chunksize: int,
+    parquet_cache: bool = True,
+) -> Iterator[pd.DataFrame]:
+    """Yield the grid in frames of at most `chunksize` rows (same columns/dtypes as `load_grid`).
+
+    A CSV streamed this way also writes its Parquet sidecar chunk by chunk, so
+    later runs read the compact copy.
+    """
+    if path.suffix.lower() in PARQUET_SUFFIXES | ARROW_SUFFIXES:
+        yield from _iter_columnar_chunks(path, chunksize)
+        return
+
+    cached = parquet_cache_path(path)
+    if parquet_cache and _sidecar_is_fresh(cached, path):
+        yield from _iter_columnar_chunks(cached, chunksize)
+        return
+
+    writer = None
+    tmp = cached.with_name(cached.name + ".tmp")
+    if parquet_cache:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            print(f"Skipping Parquet cache for {path}: {exc}", file=sys.stderr)
+            parquet_cache = False
+    try:
+        reader = pd.read_csv(path, usecols=GRID_COLUMNS, dtype=GRID_DTYPES, chunksize=chunksize)
+        for chunk in reader:
+            if parquet_cache:
+                try:
+                    table = pa.Table.from_pandas(
+                        chunk,
+                        schema=writer.schema if writer is not None else None,
+                        preserve_index=False,
+                    )
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp, table.schema)
+                    writer.write_table(table)
+                except (OSError, ValueError) as exc:
+                    print(f"Skipping Parquet cache for {path}: {exc}", file=sys.stderr)
+                    parquet_cache = False
+            yield chunk
+        if writer is not None and parquet_cache:
+            writer.close()
+            writer = None
+            os.replace(tmp, cached)
+    finally:
+        if writer is not None:
+            writer.close()
+        tmp.unlink(missing_ok=True)
+
+
+def load_promoted(path: pathlib.Path) -> pd.DataFrame:
+    """Load promoted pocket keys from a CSV/Parquet export of promoted rules.
+
+    Extra columns are ignored; when an `is_enabled` column is present only
+    enabled rules count as promoted.
+    """
+    if path.suffix.lower() in PARQUET_SUFFIXES:
+        promoted = pd.read_parquet(path)
+    else:
+        promoted = pd.read_csv(path)
+    missing = [col for col in GRID_KEY_COLUMNS if col not in promoted.columns]
+    if missing:
+        raise SystemExit(f"{path} is missing promoted-pocket columns: {', '.join(missing)}")
+    if "is_enabled" in promoted.columns:
+        enabled = promoted["is_enabled"].astype(str).str.lower().isin(["true", "t", "1"])
+        promoted = promoted[enabled]
+    keys = pd.DataFrame(
+        {
+            "symbol": promoted["symbol"].astype(str).str.strip().str.upper(),
+            "horizon": promoted["horizon"].astype(str).str.strip(),
+            "side": promoted["side"].astype(str).str.strip().str.upper(),
+            "min_mentions": promoted["min_mentions"].astype("Int16"),
+            "pos_thresh": promoted["pos_thresh"].astype("float64"),
+        }
+    )
+    return keys.drop_duplicates(ignore_index=True)
+
+
+def tag_promoted(df: pd.DataFrame, promoted: pd.DataFrame) -> pd.Series:
+    """Boolean Series aligned with `df`: True where the pocket key is promoted."""
+    # Matching the grid's categorical dtypes lets the join run on integer codes;
+    # keys with a value absent from the grid can never match and are dropped.
+    keys = promoted[GRID_KEY_COLUMNS]
+    categorical = {
+        col: df[col].dtype
+        for col in GRID_KEY_COLUMNS
+        if isinstance(df[col].dtype, pd.CategoricalDtype)
+    }
+    for col, dtype in categorical.items():
+        keys = keys[keys[col].isin(dtype.categories)]
+    keys = keys.astype(categorical)
+    # Only rows for promoted symbols can match, so merge just those.
+    candidates = df["symbol"].isin(keys["symbol"]).to_numpy()
+    matched = df.loc[candidates, GRID_KEY_COLUMNS].merge(
+        keys.assign(_promoted=True),
+        how="left",
+        on=GRID_KEY_COLUMNS,
+        sort=False,
+    )["_promoted"]
+    flags = np.zeros(len(df), dtype=bool)
+    flags[candidates] = matched.notna().to_numpy()
+    return pd.Series(flags, index=df.index, name="is_promoted")
 
 
 def _format_table(df: pd.DataFrame) -> str:
@@ -70,104 +293,529 @@ def _format_table(df: pd.DataFrame) -> str:
     return df.to_markdown(tablefmt="pipe", index=True)  # type: ignore[no-any-return]
 
 
-def analyse_grid(df: pd.DataFrame) -> Tuple[Dict[str, str], Dict[str, pd.DataFrame]]:
-    """Compute summary strings and the underlying DataFrames."""
-    summaries: dict[str, str] = {}
-    tables: dict[str, pd.DataFrame] = {}
-
-    horizon = (
-        df.groupby("horizon")
-        .agg(
-            n=("sharpe", "count"),
-            sharpe_avg=("sharpe", "mean"),
-            trades_avg=("trades", "mean"),
-            adv30_avg=("avg_daily_dollar_volume_30d", "mean"),
-            health_avg=("avg_sentiment_health_score", "mean"),
+class GroupAggregate:
+    """Count / sum / sum-of-squares / max per metric over a joint grouping key.
+
+    Rows are binned once on the combination of all `keys` (e.g. horizon × band
+    × promoted); each single-key table is then a marginal of those cells, so
+    every table comes out of one pass over the metric columns. Cells only ever
+    accumulate, so feeding the grid in chunks gives the same result as one call
+    with the whole frame. Missing metric values are skipped per metric, and
+    missing keys are dropped from that key's table, like pandas `groupby`.
+    """
+
+    def __init__(self, keys: Sequence[str], metrics: Sequence[str]) -> None:
+        self.keys = list(keys)
+        self.metrics = list(metrics)
+        self.cells: dict[tuple[Any, ...], int] = {}
+        width = len(self.metrics)
+        self.rows = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros((width, 0), dtype=np.int64)
+        self.total = np.zeros((width, 0))
+        self.total_sq = np.zeros((width, 0))
+        self.maximum = np.full((width, 0), -np.inf)
+
+    def _cell_ids(self, labels: Iterable[tuple[Any, ...]]) -> np.ndarray:
+        ids = np.array(
+            [self.cells.setdefault(label, len(self.cells)) for label in labels],
+            dtype=np.intp,
         )
-        .assign(
-            sharpe_avg=lambda d: d["sharpe_avg"].round(3),
-            trades_avg=lambda d: d["trades_avg"].round(1),
-            adv30_avg_bil=lambda d: (d["adv30_avg"] / 1e9).round(2),
-            health_avg=lambda d: d["health_avg"].round(2),
+        extra = len(self.cells) - len(self.rows)
+        if extra:
+            width = len(self.metrics)
+            self.rows = np.concatenate([self.rows, np.zeros(extra, dtype=np.int64)])
+            self.count = np.hstack([self.count, np.zeros((width, extra), dtype=np.int64)])
+            self.total = np.hstack([self.total, np.zeros((width, extra))])
+            self.total_sq = np.hstack([self.total_sq, np.zeros((width, extra))])
+            self.maximum = np.hstack([self.maximum, np.full((width, extra), -np.inf)])
+        return ids
+
+    def add(self, keys: Sequence[pd.Series], values: Sequence[np.ndarray]) -> None:
+        """Fold rows in: one Series per key and one float64 array per metric, all aligned."""
+        codes = []
+        uniques = []
+        for series in keys:
+            key_codes, key_uniques = pd.factorize(series, sort=False, use_na_sentinel=False)
+            codes.append(key_codes)
+            uniques.append([None if pd.isna(label) else label for label in key_uniques])
+        shape = tuple(len(labels) for labels in uniques)
+        if not all(shape):
+            return
+        joint = np.ravel_multi_index(codes, shape)
+        size = int(np.prod(shape))
+        rows = np.bincount(joint, minlength=size)
+        seen = np.flatnonzero(rows)
+        combos = zip(*(
+            [labels[i] for i in dim_codes]
+            for labels, dim_codes in zip(uniques, np.unravel_index(seen, shape))
+        ))
+        cell = self._cell_ids(combos)
+        self.rows[cell] += rows[seen]
+        for idx, column in enumerate(values):
+            present = ~np.isnan(column)
+            if present.all():
+                where = joint
+                count = rows
+            else:
+                where = joint[present]
+                column = column[present]
+                count = np.bincount(where, minlength=size)
+            maximum = np.full(size, -np.inf)
+            np.maximum.at(maximum, where, column)
+            self.count[idx, cell] += count[seen]
+            self.total[idx, cell] += np.bincount(where, weights=column, minlength=size)[seen]
+            self.total_sq[idx, cell] += np.bincount(
+                where, weights=column * column, minlength=size
+            )[seen]
+            self.maximum[idx, cell] = np.maximum(self.maximum[idx, cell], maximum[seen])
+
+    def frame(self, key: str) -> pd.DataFrame:
+        """Statistics per value of `key`, sorted by label (as `groupby` does)."""
+        dim = self.keys.index(key)
+        members: dict[Any, list[int]] = {}
+        for label, cell in self.cells.items():
+            if label[dim] is not None:
+                members.setdefault(label[dim], []).append(cell)
+        labels = sorted(members)
+        rows = np.array([self.rows[members[label]].sum() for label in labels], dtype=np.int64)
+        data: dict[str, Any] = {"rows": rows}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for idx, metric in enumerate(self.metrics):
+                count = np.array(
+                    [self.count[idx, members[label]].sum() for label in labels], dtype=np.int64
+                )
+                total = np.array([self.total[idx, members[label]].sum() for label in labels])
+                total_sq = np.array(
+                    [self.total_sq[idx, members[label]].sum() for label in labels]
+                )
+                maximum = np.array(
+                    [self.maximum[idx, members[label]].max() for label in labels]
+                )
+                mean = total / count
+                data[f"{metric}_count"] = count
+                data[f"{metric}_mean"] = mean
+                data[f"{metric}_std"] = np.sqrt(np.clip(total_sq / count - mean * mean, 0.0, None))
+                data[f"{metric}_max"] = np.where(count > 0, maximum, np.nan)
+        return pd.DataFrame(data, index=pd.Index(labels, name=key))
+
+
+class GridSummary:
+    """Accumulates every hygiene table in a single scan over the grid rows.
+
+    The grouped tables share one `GroupAggregate`; "Top Pockets by Sharpe"
+    keeps only the best `top_k` rows seen so far (`nlargest`, no full sort).
+    """
+
+    GROUPINGS = ("horizon", "band", "is_promoted")
+
+    def __init__(self, promoted: pd.DataFrame, top_k: int = TOP_K) -> None:
+        self.promoted = promoted
+        self.top_k = top_k
+        self.groups = GroupAggregate(self.GROUPINGS, SUMMARY_METRICS)
+        self.top: pd.DataFrame | None = None
+
+    def add(self, df: pd.DataFrame) -> None:
+        values = [df[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in SUMMARY_METRICS]
+        self.groups.add([df["horizon"], df["band"], tag_promoted(df, self.promoted)], values)
+        top = df.nlargest(self.top_k, "sharpe")[TOP_COLUMNS]
+        if self.top is not None:
+            top = pd.concat([self.top, top]).nlargest(self.top_k, "sharpe")
+        self.top = top
+
+    @staticmethod
+    def _metric_table(stats: pd.DataFrame, n: pd.Series) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "n": n,
+                "sharpe_avg": stats["sharpe_mean"].round(3),
+                "trades_avg": stats["trades_mean"].round(1),
+                "adv30_avg_bil": (stats["avg_daily_dollar_volume_30d_mean"] / 1e9).round(2),
+                "health_avg": stats["avg_sentiment_health_score_mean"].round(2),
+            }
         )
-        [["n", "sharpe_avg", "trades_avg", "adv30_avg_bil", "health_avg"]]
-    )
-    summaries["Horizon Summary"] = _format_table(horizon)
-    tables["Horizon Summary"] = horizon
 
-    band = (
-        df.groupby("band")["sharpe"]
-        .agg(["count", "mean", "max"])
-        .round({"mean": 3, "max": 3})
-    )
-    summaries["Band vs Sharpe"] = _format_table(band)
-    tables["Band vs Sharpe"] = band
-
-    df = df.copy()
-    df["is_promoted"] = [
-        (
-            row.symbol,
-            row.horizon,
-            row.side,
-            int(row.min_mentions),
-            float(row.pos_thresh),
-        )
-        in PROMOTED_KEYS
-        for row in df.itertuples(index=False)
+    def tables(self) -> Dict[str, pd.DataFrame]:
+        horizon = self.groups.frame("horizon")
+        band = self.groups.frame("band")
+        promoted = self.groups.frame("is_promoted")
+        return {
+            "Horizon Summary": self._metric_table(horizon, horizon["sharpe_count"]),
+            "Band vs Sharpe": pd.DataFrame(
+                {
+                    "count": band["sharpe_count"],
+                    "mean": band["sharpe_mean"].round(3),
+                    "max": band["sharpe_max"].round(3),
+                }
+            ),
+            "Promoted vs Others": self._metric_table(promoted, promoted["rows"]),
+            "Top Pockets by Sharpe": (
+                self.top if self.top is not None else pd.DataFrame(columns=TOP_COLUMNS)
+            ),
+        }
+
+
+def analyse_grid(
+    df: pd.DataFrame,
+    promoted: pd.DataFrame | None = None,
+    top_k: int = TOP_K,
+) -> Tuple[Dict[str, str], Dict[str, pd.DataFrame]]:
+    """Compute summary strings and the underlying DataFrames."""
+    if promoted is None:
+        promoted = load_promoted(DEFAULT_PROMOTED_PATH)
+    summary = GridSummary(promoted, top_k)
+    summary.add(df)
+    tables = summary.tables()
+    summaries = {title: _format_table(table) for title, table in tables.items()}
+    tables["Raw"] = df
+    return summaries, tables
+
+
+def analyse_grid_chunks(
+    chunks: Iterable[pd.DataFrame],
+    promoted: pd.DataFrame | None = None,
+    top_k: int = TOP_K,
+) -> Tuple[Dict[str, str], Dict[str, pd.DataFrame]]:
+    """Out-of-core `analyse_grid`: same tables, built from a stream of row chunks.
+
+    Only the running partial aggregates and the current top-K rows are kept, so
+    memory is bounded by the chunk size; there is no "Raw" table.
+    """
+    if promoted is None:
+        promoted = load_promoted(DEFAULT_PROMOTED_PATH)
+    summary = GridSummary(promoted, top_k)
+    for chunk in chunks:
+        summary.add(chunk)
+    tables = summary.tables()
+    summaries = {title: _format_table(table) for title, table in tables.items()}
+    return summaries, tables
+
+
+def export_run_date(path: pathlib.Path) -> dt.date:
+    """Run date of a grid export: the last YYYY-MM-DD in its name (window end), else its mtime."""
+    for found in reversed(_EXPORT_DATE.findall(path.name)):
+        try:
+            return dt.date.fromisoformat(found)
+        except ValueError:
+            continue
+    return dt.date.fromtimestamp(path.stat().st_mtime)
+
+
+def find_grid_exports(directory: pathlib.Path, index_path: pathlib.Path) -> list[pathlib.Path]:
+    """Grid exports in `directory`, skipping Parquet sidecars and the history index itself."""
+    return [
+        path
+        for path in sorted(directory.iterdir())
+        if path.is_file()
+        and path.suffix.lower() in GRID_EXPORT_SUFFIXES
+        and not path.name.endswith(PARQUET_CACHE_SUFFIX)
+        and path.resolve() != index_path.resolve()
     ]
 
-    promoted = (
-        df.groupby("is_promoted")
-        .agg(
-            n=("symbol", "count"),
-            sharpe_avg=("sharpe", "mean"),
-            trades_avg=("trades", "mean"),
-            adv30_avg=("avg_daily_dollar_volume_30d", "mean"),
-            health_avg=("avg_sentiment_health_score", "mean"),
-        )
-        .assign(
-            sharpe_avg=lambda d: d["sharpe_avg"].round(3),
-            trades_avg=lambda d: d["trades_avg"].round(1),
-            adv30_avg_bil=lambda d: (d["adv30_avg"] / 1e9).round(2),
-            health_avg=lambda d: d["health_avg"].round(2),
+
+class GridHistory:
+    """Per-pocket grid metrics across nightly exports, kept in a Parquet directory.
+
+    Every export gets its own file, tagged with its file name (`source`) and
+    run date. A manifest of ingested exports (size/mtime plus headline stats)
+    sits next to them, so `update` parses only new or re-exported files and
+    never touches the runs already indexed. Drift queries open only the runs
+    they compare and push the `symbol` filter down.
+    """
+
+    COLUMNS = ["source", "run_date", *GRID_KEY_COLUMNS, "band", "sharpe", "trades"]
+
+    def __init__(self, path: pathlib.Path) -> None:
+        _require_pyarrow()
+        self.path = path
+        self.runs: dict[str, dict[str, Any]] = {}
+        manifest = path / HISTORY_MANIFEST_NAME
+        if manifest.exists():
+            self.runs = json.loads(manifest.read_text())
+
+    @staticmethod
+    def _schema() -> Any:
+        import pyarrow as pa
+
+        label = pa.dictionary(pa.int32(), pa.string())
+        return pa.schema(
+            [
+                ("source", pa.string()),
+                ("run_date", pa.date32()),
+                ("symbol", label),
+                ("horizon", label),
+                ("side", label),
+                ("min_mentions", pa.int16()),
+                ("pos_thresh", pa.float64()),
+                ("band", label),
+                ("sharpe", pa.float32()),
+                ("trades", pa.int32()),
+            ]
         )
-        [["n", "sharpe_avg", "trades_avg", "adv30_avg_bil", "health_avg"]]
-    )
-    summaries["Promoted vs Others"] = _format_table(promoted)
-    tables["Promoted vs Others"] = promoted
-
-    top = (
-        df.sort_values("sharpe", ascending=False)
-        .head(20)
-        [[
-            "symbol",
-            "horizon",
-            "side",
-            "min_mentions",
-            "pos_thresh",
-            "band",
-            "sharpe",
-            "trades",
-            "avg_daily_dollar_volume_30d",
-            "avg_sentiment_health_score",
-            "avg_beta_vs_spy",
-        ]]
-    )
-    summaries["Top Pockets by Sharpe"] = _format_table(top)
-    tables["Top Pockets by Sharpe"] = top
 
-    tables["Raw"] = df
+    @staticmethod
+    def _stamp(path: pathlib.Path) -> list[int]:
+        stat = path.stat()
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def run_path(self, source: str) -> pathlib.Path:
+        return self.path / f"{source}.parquet"
+
+    def ordered_runs(self) -> list[str]:
+        return sorted(self.runs, key=lambda source: (self.runs[source]["run_date"], source))
+
+    def update(
+        self,
+        exports: Sequence[pathlib.Path],
+        chunksize: int = HISTORY_CHUNKSIZE,
+        top_k: int = TOP_K,
+    ) -> list[str]:
+        """Ingest new or changed exports; returns the source names (re)indexed.
+
+        Headline stats are recorded per run at ingest time; `top_sharpe_avg` is
+        the mean of that run's best `top_k` Sharpes. The manifest records the
+        K used, and runs indexed with another K are re-scored from their file so
+        every run in the report uses the same one.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        pending = [
+            path
+            for path in exports
+            if self.runs.get(path.name, {}).get("stamp") != self._stamp(path)
+        ]
+        replaced = {path.name for path in pending}
+        rescore = [
+            source
+            for source, run in self.runs.items()
+            if source not in replaced and run.get("top_k", TOP_K) != top_k
+        ]
+        if not pending and not rescore:
+            return []
+        self.path.mkdir(parents=True, exist_ok=True)
+        schema = self._schema()
+        runs = dict(self.runs)
+        for path in pending:
+            run_date = export_run_date(path)
+            pockets = 0
+            sharpe_sum = 0.0
+            sharpe_count = 0
+            best = np.empty(0)
+            target = self.run_path(path.name)
+            tmp = target.with_name(target.name + ".tmp")
+            try:
+                with pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+                    for chunk in iter_grid_chunks(path, chunksize, parquet_cache=False):
+                        sharpe = chunk["sharpe"].to_numpy(dtype=np.float64, na_value=np.nan)
+                        present = sharpe[~np.isnan(sharpe)]
+                        pockets += len(chunk)
+                        sharpe_sum += float(present.sum())
+                        sharpe_count += len(present)
+                        best = np.sort(np.concatenate([best, present]))[-top_k:]
+                        frame = chunk.assign(source=path.name, run_date=run_date)
+                        writer.write_table(
+                            pa.Table.from_pandas(
+                                frame[self.COLUMNS], schema=schema, preserve_index=False
+                            )
+                        )
+                os.replace(tmp, target)
+            finally:
+                tmp.unlink(missing_ok=True)
+            runs[path.name] = {
+                "stamp": self._stamp(path),
+                "run_date": run_date.isoformat(),
+                "pockets": pockets,
+                "sharpe_avg": sharpe_sum / sharpe_count if sharpe_count else None,
+                "top_k": top_k,
+                "top_sharpe_avg": float(best.mean()) if len(best) else None,
+            }
+        for source in rescore:
+            sharpe = pc.drop_null(
+                pq.read_table(self.run_path(source), columns=["sharpe"])["sharpe"]
+            ).to_numpy()
+            best = np.sort(sharpe[~np.isnan(sharpe)].astype(np.float64))[-top_k:]
+            runs[source] = {
+                **runs[source],
+                "top_k": top_k,
+                "top_sharpe_avg": float(best.mean()) if len(best) else None,
+            }
+        manifest = self.path / HISTORY_MANIFEST_NAME
+        tmp = manifest.with_name(manifest.name + ".tmp")
+        tmp.write_text(json.dumps(runs, indent=2))
+        os.replace(tmp, manifest)
+        self.runs = runs
+        return [path.name for path in pending]
+
+    def read(
+        self,
+        sources: Sequence[str],
+        symbols: Iterable[str] | None = None,
+        columns: Sequence[str] | None = None,
+    ) -> pd.DataFrame:
+        """Rows of the given runs, one file each (optionally only `symbols`).
+
+        An export may hold the same pocket more than once (several model
+        versions or windows); the last row per (source, pocket) wins.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        filters = [("symbol", "in", list(symbols))] if symbols is not None else None
+        columns = list(columns or self.COLUMNS)
+        tables = [
+            pq.read_table(self.run_path(source), columns=columns, filters=filters)
+            for source in sources
+        ]
+        if not tables:
+            return pd.DataFrame(columns=columns)
+        frame = pa.concat_tables(tables, promote_options="default").to_pandas()
+        for col in ("symbol", "horizon", "side", "band"):
+            if col in frame.columns:
+                frame[col] = frame[col].astype(str)
+        if "source" in frame.columns and set(GRID_KEY_COLUMNS) <= set(frame.columns):
+            frame = frame.drop_duplicates(["source", *GRID_KEY_COLUMNS], keep="last")
+        return frame.reset_index(drop=True)
+
+    def run_overview(self) -> pd.DataFrame:
+        order = self.ordered_runs()
+        overview = pd.DataFrame(
+            [
+                {
+                    "source": source,
+                    "run_date": self.runs[source]["run_date"],
+                    "pockets": self.runs[source]["pockets"],
+                    "sharpe_avg": self.runs[source]["sharpe_avg"],
+                    "top_k": self.runs[source].get("top_k", TOP_K),
+                    "top_sharpe_avg": self.runs[source]["top_sharpe_avg"],
+                }
+                for source in order
+            ],
+            columns=["source", "run_date", "pockets", "sharpe_avg", "top_k", "top_sharpe_avg"],
+        ).set_index("source")
+        return overview.round({"sharpe_avg": 3, "top_sharpe_avg": 3})
+
+    def promoted_drift(self, promoted: pd.DataFrame) -> pd.DataFrame:
+        """Sharpe of each promoted pocket: first indexed run vs previous vs latest."""
+        order = self.ordered_runs()
+        latest = order[-1]
+        previous = order[-2] if len(order) > 1 else None
+        history = self.read(
+            order,
+            symbols=promoted["symbol"].unique(),
+            columns=["source", *GRID_KEY_COLUMNS, "sharpe"],
+        ).merge(promoted[GRID_KEY_COLUMNS], on=GRID_KEY_COLUMNS)
+        history["sharpe"] = history["sharpe"].astype("float64")
+        history["run"] = history["source"].map({source: idx for idx, source in enumerate(order)})
+        history = history.sort_values("run", kind="stable")
+        by_pocket = history.groupby(GRID_KEY_COLUMNS, sort=False)["sharpe"]
+
+        def run_sharpe(source: str | None) -> pd.Series:
+            rows = history[history["source"] == source]
+            return rows.set_index(GRID_KEY_COLUMNS)["sharpe"]
+
+        index = pd.MultiIndex.from_frame(promoted[GRID_KEY_COLUMNS])
+        drift = pd.DataFrame(index=index)
+        drift["runs"] = by_pocket.count().reindex(index).fillna(0).astype(int)
+        drift["first_sharpe"] = by_pocket.first().reindex(index)
+        drift["prev_sharpe"] = run_sharpe(previous).reindex(index)
+        drift["latest_sharpe"] = run_sharpe(latest).reindex(index)
+        drift["delta_prev"] = drift["latest_sharpe"] - drift["prev_sharpe"]
+        drift["delta_first"] = drift["latest_sharpe"] - drift["first_sharpe"]
+        drift = drift.sort_values(["delta_prev", "delta_first"], na_position="last")
+        return drift.round(3).reset_index()
+
+    def top_k_churn(self, top_k: int = TOP_K) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Pockets entering / leaving the Sharpe top-K between the two latest runs."""
+        order = self.ordered_runs()
+        columns = ["rank", "sharpe", "prev_rank", "prev_sharpe"]
+        if len(order) < 2:
+            empty = pd.DataFrame(columns=columns)
+            return empty, empty
+        previous, latest = order[-2], order[-1]
+        frames = self.read(
+            [previous, latest], columns=["source", *GRID_KEY_COLUMNS, "sharpe"]
+        )
 
-    return summaries, tables
+        def ranked(source: str) -> pd.DataFrame:
+            run = frames[frames["source"] == source].dropna(subset=["sharpe"])
+            sharpe = run["sharpe"].astype("float64")
+            return pd.DataFrame(
+                {
+                    "rank": sharpe.rank(ascending=False, method="min").astype(int).to_numpy(),
+                    "sharpe": sharpe.to_numpy(),
+                },
+                index=pd.MultiIndex.from_frame(run[GRID_KEY_COLUMNS]),
+            )
+
+        now, before = ranked(latest), ranked(previous)
+        now_top = now[now["rank"] <= top_k]
+        before_top = before[before["rank"] <= top_k]
+        entered = now_top[~now_top.index.isin(before_top.index)].join(
+            before.add_prefix("prev_"), how="left"
+        )
+        left = before_top[~before_top.index.isin(now_top.index)].add_prefix("prev_").join(
+            now, how="left"
+        )
+        entered = entered[columns].sort_values("rank")
+        left = left[columns].sort_values("prev_rank")
+        return entered.round(3).reset_index(), left.round(3).reset_index()
+
+
+def history_report(
+    history: GridHistory,
+    promoted: pd.DataFrame,
+    top_k: int = TOP_K,
+) -> Dict[str, str]:
+    """Markdown drift tables over every run in the history index."""
+    order = history.ordered_runs()
+    summaries = {"Grid Runs": _format_table(history.run_overview())}
+    if not order:
+        return summaries
+    latest = order[-1]
+    previous = order[-2] if len(order) > 1 else "-"
+    summaries[f"Promoted Pocket Sharpe Drift ({previous} → {latest})"] = _format_table(
+        history.promoted_drift(promoted)
+    )
+    entered, left = history.top_k_churn(top_k)
+    summaries[f"Entered Top {top_k} ({latest})"] = _format_table(entered)
+    summaries[f"Left Top {top_k} ({latest})"] = _format_table(left)
+    return summaries
 
 
 def main(argv: Iterable[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description=__doc__)
-    parser.add_argument(
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
         "--input",
         type=pathlib.Path,
-        required=True,
-        help="Path to grid CSV exported from backtest_grid.sql",
+        help="Path to grid CSV exported from backtest_grid.sql (or a Parquet/Arrow copy)",
+    )
+    source.add_argument(
+        "--history-dir",
+        type=pathlib.Path,
+        help=(
+            "Directory of dated grid exports: index any new ones into the history "
+            f"directory (<history-dir>/{HISTORY_INDEX_NAME}/, one Parquet file per "
+            "export) and report Sharpe drift / top-K churn across runs"
+        ),
+    )
+    parser.add_argument(
+        "--history-index",
+        type=pathlib.Path,
+        help=(
+            "History directory of per-export Parquet files and runs.json "
+            f"(default: <history-dir>/{HISTORY_INDEX_NAME}/)"
+        ),
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=TOP_K,
+        help=(
+            "Size of the Top Pockets table, the top-K churn tables and the per-run "
+            "top_sharpe_avg (default: %(default)s)"
+        ),
     )
     parser.add_argument(
         "--output",
@@ -179,13 +827,94 @@ def main(argv: Iterable[str] | None = None) -> int:
         type=pathlib.Path,
         help="Optional directory to write PNG charts to",
     )
+    parser.add_argument(
+        "--plot-kinds",
+        type=lambda value: [kind.strip() for kind in value.split(",") if kind.strip()],
+        default=list(PLOT_KINDS),
+        help=f"Comma-separated charts to render with --plots (default: {','.join(PLOT_KINDS)})",
+    )
+    parser.add_argument(
+        "--plot-max-points",
+        type=int,
+        default=DEFAULT_MAX_POINTS,
+        help="Rows above which the ADV scatter is hex-binned or sampled (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--plot-large",
+        choices=LARGE_SCATTER_MODES,
+        default="hexbin",
+        help="How to draw scatters above --plot-max-points (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--plot-workers",
+        type=int,
+        help="Worker processes for chart rendering (default: one per chart, up to CPU count)",
+    )
+    parser.add_argument(
+        "--promoted",
+        type=pathlib.Path,
+        default=DEFAULT_PROMOTED_PATH,
+        help=(
+            "CSV/Parquet of promoted pockets (symbol, horizon, side, min_mentions, "
+            "pos_thresh), e.g. an export of live_sentiment_entry_rules "
+            "(default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--no-parquet-cache",
+        action="store_true",
+        help="Read CSV input directly without creating or using the Parquet sidecar",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        help=(
+            "Stream the grid in chunks of this many rows instead of loading it whole, "
+            "for exports larger than RAM (not combinable with --plots)"
+        ),
+    )
     args = parser.parse_args(argv)
 
-    if not args.input.exists():
-        parser.error(f"CSV not found: {args.input}")
-
-    df = pd.read_csv(args.input)
-    summaries, tables = analyse_grid(df)
+    if args.top_k < 1:
+        parser.error("--top-k must be at least 1")
+    unknown = sorted(set(args.plot_kinds) - set(PLOT_KINDS))
+    if unknown:
+        parser.error(f"Unknown --plot-kinds: {', '.join(unknown)}")
+    if args.plot_max_points < 1:
+        parser.error("--plot-max-points must be at least 1")
+    if args.chunksize is not None:
+        if args.chunksize < 1:
+            parser.error("--chunksize must be at least 1")
+        if args.plots:
+            parser.error("--plots needs the full grid in memory; drop --chunksize")
+    if args.history_dir is not None:
+        if not args.history_dir.is_dir():
+            parser.error(f"Not a directory: {args.history_dir}")
+        if args.plots:
+            parser.error("--plots is not available with --history-dir")
+    elif not args.input.exists():
+        parser.error(f"Input not found: {args.input}")
+
+    promoted = load_promoted(args.promoted)
+    if args.history_dir is not None:
+        index_path = args.history_index or args.history_dir / HISTORY_INDEX_NAME
+        history = GridHistory(index_path)
+        added = history.update(
+            find_grid_exports(args.history_dir, index_path),
+            chunksize=args.chunksize or HISTORY_CHUNKSIZE,
+            top_k=args.top_k,
+        )
+        for source in added:
+            print(f"Indexed {source} into {index_path}", file=sys.stderr)
+        summaries = history_report(history, promoted, args.top_k)
+    elif args.chunksize is not None:
+        chunks = iter_grid_chunks(
+            args.input, args.chunksize, parquet_cache=not args.no_parquet_cache
+        )
+        summaries, tables = analyse_grid_chunks(chunks, promoted, args.top_k)
+    else:
+        df = load_grid(args.input, parquet_cache=not args.no_parquet_cache)
+        summaries, tables = analyse_grid(df, promoted, args.top_k)
 
     report_lines = []
     for title, table in summaries.items():
@@ -202,72 +931,15 @@ def main(argv: Iterable[str] | None = None) -> int:
         print(f"\nWrote summary to {args.output}")
 
     if args.plots:
-        try:
-            import matplotlib.pyplot as plt
-            import seaborn as sns
-        except ImportError as exc:  # pragma: no cover - runtime guard
-            raise SystemExit(
-                "matplotlib and seaborn are required for plotting. install with "
-                "`python3 -m pip install --user matplotlib seaborn`."
-            ) from exc
-
-        plot_dir = args.plots
-        plot_dir.mkdir(parents=True, exist_ok=True)
-
-        horizon_df = tables["Horizon Summary"].reset_index()
-        plt.figure(figsize=(6, 4))
-        sns.barplot(
-            data=horizon_df,
-            x="horizon",
-            y="sharpe_avg",
-            hue="horizon",
-            palette="Blues_d",
-            dodge=False,
-            legend=False,
-        )
-        plt.title("Mean Sharpe by Horizon")
-        plt.ylabel("Mean Sharpe")
-        plt.tight_layout()
-        horizon_path = plot_dir / "grid_sharpe_by_horizon.png"
-        plt.savefig(horizon_path, dpi=200)
-        plt.close()
-
-        raw_df = tables["Raw"].copy()
-        plt.figure(figsize=(6, 4))
-        sns.scatterplot(
-            data=raw_df,
-            x="avg_daily_dollar_volume_30d",
-            y="sharpe",
-            hue="horizon",
-            alpha=0.6,
-        )
-        plt.xscale("log")
-        plt.xlabel("ADV30 (log scale)")
-        plt.title("Sharpe vs Liquidity (ADV30)")
-        plt.tight_layout()
-        adv_path = plot_dir / "grid_sharpe_vs_adv30.png"
-        plt.savefig(adv_path, dpi=200)
-        plt.close()
-
-        plt.figure(figsize=(6, 4))
-        sns.boxplot(
-            data=raw_df,
-            x="band",
-            y="sharpe",
-            order=sorted(raw_df["band"].unique()),
-        )
-        plt.title("Sharpe distribution by band")
-        plt.tight_layout()
-        band_path = plot_dir / "grid_sharpe_by_band.png"
-        plt.savefig(band_path, dpi=200)
-        plt.close()
-
-        print(
-            "Generated plots:\n"
-            f"  - {horizon_path}\n"
-            f"  - {adv_path}\n"
-            f"  - {band_path}"
+        paths = render_plots(
+            tables,
+            args.plots,
+            kinds=args.plot_kinds,
+            max_points=args.plot_max_points,
+            large_mode=args.plot_large,
+            workers=args.plot_workers,
         )
+        print("Generated plots:\n" + "\n".join(f"  - {path}" for path in paths))
 
     return 0
 
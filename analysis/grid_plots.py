@@ -0,0 +1,247 @@
+"""Headless, parallel chart rendering for `grid_hygiene_summary --plots`.
+
+The parent process only reduces the grid to small payloads (the horizon
+table, a scatter sample or the occupied hexbin cells, per-band box
+statistics); each requested chart is then drawn in its own worker process on
+the Agg backend, so matplotlib/seaborn are never imported by the report
+process itself and no worker receives the full grid. `render_plots` returns
+once every chart is written.
+"""
+from __future__ import annotations
+
+import importlib.util
+import math
+import os
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Mapping, Sequence
+
+if __package__:
+    from .lazy_import import lazy_import
+else:  # run as a script: `python analysis/grid_plots.py`
+    from lazy_import import lazy_import
+
+np = lazy_import("numpy", "python3 -m pip install --user numpy")
+
+PLOT_FILES = {
+    "horizon": "grid_sharpe_by_horizon.png",
+    "adv": "grid_sharpe_vs_adv30.png",
+    "band": "grid_sharpe_by_band.png",
+}
+PLOT_KINDS = tuple(PLOT_FILES)
+DEFAULT_MAX_POINTS = 50_000
+LARGE_SCATTER_MODES = ("hexbin", "sample")
+DEFAULT_DPI = 200
+HEXBIN_GRIDSIZE = 60
+
+
+def _horizon_payload(horizon_table: Any) -> dict[str, Any]:
+    return {
+        "horizon": [str(label) for label in horizon_table.index],
+        "sharpe_avg": horizon_table["sharpe_avg"].to_numpy(dtype=np.float64),
+    }
+
+
+def _expand_singular(low: float, high: float, expander: float = 0.1) -> tuple[float, float]:
+    """Widen an empty range the way matplotlib does for hexbin limits."""
+    if high - low <= 1e-15 * max(abs(low), abs(high)):
+        if low == 0 and high == 0:
+            return -expander, expander
+        return low - expander * abs(low), high + expander * abs(high)
+    return low, high
+
+
+def _hexbin_cells(tx: np.ndarray, ty: np.ndarray, gridsize: int) -> dict[str, Any]:
+    """Counts per occupied hexagon, on the same lattice as `Axes.hexbin`.
+
+    Returns each cell's centre (in `tx`/`ty` units) and count plus the extent,
+    so the worker redraws the identical grid from a few thousand cells.
+    """
+    nx = gridsize
+    ny = int(nx / math.sqrt(3))
+    xmin, xmax = _expand_singular(float(tx.min()), float(tx.max()))
+    ymin, ymax = _expand_singular(float(ty.min()), float(ty.max()))
+    padding = 1e-9 * (xmax - xmin)
+    left = xmin - padding
+    sx = (xmax + padding - left) / nx
+    sy = (ymax - ymin) / ny
+    ix = (tx - left) / sx
+    iy = (ty - ymin) / sy
+    ix1, iy1 = np.round(ix), np.round(iy)
+    ix2, iy2 = np.floor(ix) + 0.5, np.floor(iy) + 0.5
+    on_first = (ix - ix1) ** 2 + 3.0 * (iy - iy1) ** 2 < (ix - ix2) ** 2 + 3.0 * (iy - iy2) ** 2
+    cells, counts = np.unique(
+        np.column_stack([np.where(on_first, ix1, ix2), np.where(on_first, iy1, iy2)]),
+        axis=0,
+        return_counts=True,
+    )
+    return {
+        "x": left + cells[:, 0] * sx,
+        "y": ymin + cells[:, 1] * sy,
+        "counts": counts,
+        "extent": (xmin, xmax, ymin, ymax),
+    }
+
+
+def _adv_payload(raw: Any, max_points: int, large_mode: str) -> dict[str, Any]:
+    adv = raw["avg_daily_dollar_volume_30d"].to_numpy(dtype=np.float64, na_value=np.nan)
+    sharpe = raw["sharpe"].to_numpy(dtype=np.float64, na_value=np.nan)
+    keep = np.flatnonzero((adv > 0) & ~np.isnan(sharpe))
+    total = len(keep)
+    if total > max_points and large_mode == "hexbin":
+        cells = _hexbin_cells(np.log10(adv[keep]), sharpe[keep], HEXBIN_GRIDSIZE)
+        return {"mode": "hexbin", **cells, "total": total}
+    if total > max_points:
+        rng = np.random.default_rng(0)
+        keep = np.sort(rng.choice(keep, size=max_points, replace=False))
+    return {
+        "mode": "scatter",
+        "adv": adv[keep],
+        "sharpe": sharpe[keep],
+        "horizon": raw["horizon"].to_numpy(dtype=object)[keep].astype(str),
+        "total": total,
+    }
+
+
+def _band_payload(raw: Any, max_points: int) -> dict[str, Any]:
+    """Tukey box statistics per band (1.5 IQR whiskers, as matplotlib computes them)."""
+    band = raw["band"].to_numpy(dtype=object)
+    sharpe = raw["sharpe"].to_numpy(dtype=np.float64, na_value=np.nan)
+    labels = sorted({label for label in band if isinstance(label, str)})
+    rng = np.random.default_rng(0)
+    flier_cap = max(1, max_points // max(1, len(labels)))
+    stats = []
+    for label in labels:
+        values = sharpe[band == label]
+        values = values[~np.isnan(values)]
+        if not len(values):
+            continue
+        q1, med, q3 = np.percentile(values, [25, 50, 75])
+        iqr = q3 - q1
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        fliers = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+        if len(fliers) > flier_cap:
+            fliers = rng.choice(fliers, size=flier_cap, replace=False)
+        stats.append(
+            {
+                "label": label,
+                "q1": q1,
+                "med": med,
+                "q3": q3,
+                "whislo": inside.min() if len(inside) else q1,
+                "whishi": inside.max() if len(inside) else q3,
+                "fliers": fliers,
+            }
+        )
+    return {"stats": stats}
+
+
+def _render(kind: str, payload: Mapping[str, Any], path: str, dpi: int) -> str:
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(6, 4))
+    if kind == "horizon":
+        sns.barplot(
+            x=payload["horizon"],
+            y=payload["sharpe_avg"],
+            hue=payload["horizon"],
+            palette="Blues_d",
+            dodge=False,
+            legend=False,
+            ax=ax,
+        )
+        ax.set_title("Mean Sharpe by Horizon")
+        ax.set_xlabel("horizon")
+        ax.set_ylabel("Mean Sharpe")
+    elif kind == "adv":
+        if payload["mode"] == "hexbin":
+            cells = ax.hexbin(
+                10 ** payload["x"],
+                payload["y"],
+                C=payload["counts"],
+                reduce_C_function=np.sum,
+                xscale="log",
+                extent=payload["extent"],
+                gridsize=HEXBIN_GRIDSIZE,
+                bins="log",
+                mincnt=1,
+                cmap="Blues",
+            )
+            fig.colorbar(cells, ax=ax, label="pockets")
+            ax.set_title(f"Sharpe vs Liquidity (ADV30), {payload['total']:,} pockets")
+        else:
+            sns.scatterplot(
+                x=payload["adv"],
+                y=payload["sharpe"],
+                hue=payload["horizon"],
+                alpha=0.6,
+                ax=ax,
+            )
+            ax.set_xscale("log")
+            title = "Sharpe vs Liquidity (ADV30)"
+            if len(payload["adv"]) < payload["total"]:
+                title += f", {len(payload['adv']):,} of {payload['total']:,} sampled"
+            ax.set_title(title)
+        ax.set_xlabel("ADV30 (log scale)")
+        ax.set_ylabel("sharpe")
+    elif kind == "band":
+        stats = payload["stats"]
+        boxes = ax.bxp(stats, patch_artist=True)
+        for patch, color in zip(boxes["boxes"], sns.color_palette(n_colors=len(stats))):
+            patch.set_facecolor(color)
+        ax.set_title("Sharpe distribution by band")
+        ax.set_xlabel("band")
+        ax.set_ylabel("sharpe")
+    else:
+        raise ValueError(f"Unknown plot kind: {kind}")
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
+    plt.close(fig)
+    return path
+
+
+def render_plots(
+    tables: Mapping[str, Any],
+    plot_dir: pathlib.Path,
+    kinds: Sequence[str] = PLOT_KINDS,
+    max_points: int = DEFAULT_MAX_POINTS,
+    large_mode: str = "hexbin",
+    workers: int | None = None,
+    dpi: int = DEFAULT_DPI,
+) -> list[pathlib.Path]:
+    """Render the requested charts in parallel worker processes; returns their paths.
+
+    Scatters above `max_points` rows are hex-binned here, so only the occupied
+    cells are sent to a worker (or randomly sampled with `large_mode="sample"`).
+    Blocks until every chart is written.
+    """
+    # Checked without importing: only the workers load matplotlib/seaborn.
+    if any(importlib.util.find_spec(name) is None for name in ("matplotlib", "seaborn")):
+        raise SystemExit(  # pragma: no cover - runtime guard
+            "matplotlib and seaborn are required for plotting. install with "
+            "`python3 -m pip install --user matplotlib seaborn`."
+        )
+
+    plot_dir.mkdir(parents=True, exist_ok=True)
+    payloads: dict[str, Mapping[str, Any]] = {}
+    for kind in kinds:
+        if kind == "horizon":
+            payloads[kind] = _horizon_payload(tables["Horizon Summary"])
+        elif kind == "adv":
+            payloads[kind] = _adv_payload(tables["Raw"], max_points, large_mode)
+        elif kind == "band":
+            payloads[kind] = _band_payload(tables["Raw"], max_points)
+        else:
+            raise ValueError(f"Unknown plot kind: {kind}")
+
+    workers = workers or min(len(payloads), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [
+            pool.submit(_render, kind, payload, str(plot_dir / PLOT_FILES[kind]), dpi)
+            for kind, payload in payloads.items()
+        ]
+        return [pathlib.Path(future.result()) for future in futures]
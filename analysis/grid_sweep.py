@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Sharded multi-process grid sweep over the local backtest inputs.
+
+Runs the `grid_backtest.py` engine on a process pool instead of one psql
+session per window:
+
+    python -m analysis grid-sweep --inputs /tmp/grid_inputs \
+        --start 2025-06-01 --end 2025-09-12 --output /tmp/grid.csv --workers 8
+
+The inputs are loaded once and saved as `.npy` files in a scratch directory
+(`--shared-dir`, e.g. /dev/shm); every worker maps them read-only, so the
+market and sentiment arrays are never pickled. The grid is split into
+(symbol range, horizon) shards, with symbol ranges balanced by candidate-day
+count; each shard evaluates a zero-copy slice, and the shard grids are merged
+into one file in the usual export order for `grid_hygiene_summary.py`.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import pathlib
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from typing import Sequence
+
+if __package__:
+    from .grid_backtest import (
+        GRID_SORT,
+        RESULT_COLUMNS,
+        GridInputs,
+        GridParams,
+        add_param_arguments,
+        evaluate_grid,
+        params_from_args,
+        summary_line,
+        write_grid,
+    )
+    from .lazy_import import lazy_import
+else:  # run as a script: `python analysis/grid_sweep.py`
+    from grid_backtest import (
+        GRID_SORT,
+        RESULT_COLUMNS,
+        GridInputs,
+        GridParams,
+        add_param_arguments,
+        evaluate_grid,
+        params_from_args,
+        summary_line,
+        write_grid,
+    )
+    from lazy_import import lazy_import
+
+np = lazy_import("numpy", "python3 -m pip install --user numpy pandas")
+pd = lazy_import("pandas", "python3 -m pip install --user numpy pandas")
+
+SHARDS_PER_WORKER = 4
+SYMBOLS_FILE = "symbols.npy"
+
+Shard = tuple[int, int, str]
+
+# Inputs mapped by each worker process once, in `_init_worker`.
+_shared: GridInputs | None = None
+
+
+def share_inputs(inputs: GridInputs, directory: pathlib.Path) -> None:
+    """Save the input arrays as `.npy` files for workers to memory-map."""
+    np.save(directory / SYMBOLS_FILE, inputs.symbols.astype(str))
+    for name, values in inputs.arrays().items():
+        np.save(directory / f"{name}.npy", values)
+
+
+def open_shared(directory: pathlib.Path) -> GridInputs:
+    """Read-only memory maps of the arrays written by `share_inputs`."""
+    arrays = {
+        name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in GridInputs.ARRAYS
+    }
+    return GridInputs(np.load(directory / SYMBOLS_FILE), arrays)
+
+
+def _init_worker(directory: str) -> None:
+    global _shared
+    _shared = open_shared(pathlib.Path(directory))
+
+
+def _run_shard(shard: Shard, params: GridParams) -> pd.DataFrame:
+    first, stop, horizon = shard
+    assert _shared is not None
+    return evaluate_grid(_shared.select_symbols(first, stop), replace(params, horizons=(horizon,)))
+
+
+def plan_shards(inputs: GridInputs, horizons: Sequence[str], shards: int) -> list[Shard]:
+    """(first code, stop code, horizon) shards covering every symbol with candidates.
+
+    Symbol ranges are cut at equal shares of candidate days, so shards carry
+    similar work; each range is evaluated once per horizon.
+    """
+    if not len(inputs.day_symbol):
+        return []
+    ranges = max(1, shards // max(len(horizons), 1))
+    counts = np.bincount(inputs.day_symbol, minlength=len(inputs.symbols))
+    cumulative = np.cumsum(counts)
+    cuts = np.searchsorted(cumulative, np.linspace(0, cumulative[-1], ranges + 1)[1:-1])
+    bounds = np.unique(np.concatenate([[0], cuts + 1, [len(inputs.symbols)]]))
+    return [
+        (int(first), int(stop), horizon)
+        for horizon in horizons
+        for first, stop in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+def run_sweep(
+    inputs: GridInputs,
+    params: GridParams,
+    workers: int | None = None,
+    shards: int | None = None,
+    shared_dir: pathlib.Path | None = None,
+) -> pd.DataFrame:
+    """Evaluate the grid shard by shard on `workers` processes and merge the results."""
+    workers = max(1, workers or os.cpu_count() or 1)
+    params = inputs.window(params)
+    plan = plan_shards(inputs, params.horizons, shards or workers * SHARDS_PER_WORKER)
+    with tempfile.TemporaryDirectory(prefix="grid-sweep-", dir=shared_dir) as scratch:
+        share_inputs(inputs, pathlib.Path(scratch))
+        with ProcessPoolExecutor(
+            max_workers=min(workers, max(len(plan), 1)),
+            initializer=_init_worker,
+            initargs=(scratch,),
+        ) as pool:
+            parts = list(pool.map(_run_shard, plan, [params] * len(plan)))
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    return pd.concat(parts, ignore_index=True).sort_values(
+        GRID_SORT, kind="stable", ignore_index=True
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Sharded multi-process grid sweep.")
+    parser.add_argument(
+        "--inputs",
+        type=pathlib.Path,
+        required=True,
+        help="Directory written by grid_backtest_inputs.sql",
+    )
+    parser.add_argument(
+        "--output",
+        type=pathlib.Path,
+        required=True,
+        help="Merged grid file to write (.csv, or .parquet)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=None,
+        help=f"Shards across symbols x horizons (default: {SHARDS_PER_WORKER} per worker)",
+    )
+    parser.add_argument(
+        "--shared-dir",
+        type=pathlib.Path,
+        default=None,
+        help="Where to put the memory-mapped input arrays (default: system temp dir)",
+    )
+    add_param_arguments(parser)
+    args = parser.parse_args(argv)
+    params = params_from_args(parser, args)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.shards is not None and args.shards < 1:
+        parser.error("--shards must be >= 1")
+
+    started = time.perf_counter()
+    inputs = GridInputs.load(args.inputs)
+    grid = run_sweep(inputs, params, args.workers, args.shards, args.shared_dir)
+    write_grid(grid, args.output)
+    print(summary_line(grid))
+    print(f"Wrote {args.output} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""On-disk JSON response cache shared by the Polygon/Finnhub probes.
+
+Responses are keyed on the request URL with credentials (`apiKey`, `token`)
+stripped, so rotating keys does not invalidate history. Callers tell the cache
+which trading date a response covers (`settled_through`):
+
+  • responses that only cover dates at least `settle_days` in the past are
+    stored permanently — historical grouped bars and closed earnings windows
+    never change;
+  • anything touching recent dates expires after `ttl` seconds and is then
+    revalidated with `If-None-Match` / `If-Modified-Since` when the provider
+    sent validators.
+
+The directory is bounded by `max_bytes`; the least recently used entries
+(tracked via file mtime, bumped on every hit) are evicted first, down to
+`EVICT_LOW_WATER` of the bound. Its size is kept as a running total after one
+scan, so the directory is only listed again when the total crosses the bound.
+Each entry is a gzip file holding one JSON metadata line followed by the raw
+response body, so large bodies can be streamed in and out without being parsed.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime as dt
+import gzip
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Iterator, Mapping
+
+SECRET_PARAMS = frozenset({"apikey", "token"})
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_SETTLE_DAYS = 3
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Eviction frees this much headroom so the next writes do not trigger another scan.
+EVICT_LOW_WATER = 0.9
+
+
+def cache_root() -> pathlib.Path:
+    """Per-user cache directory for data the analysis scripts derive locally."""
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return pathlib.Path(base) / "moonshot-analysis"
+
+
+def default_cache_dir() -> pathlib.Path:
+    return cache_root() / "http"
+
+
+def redact_url(url: str) -> str:
+    """Drop credential query params and normalise param order."""
+    parts = urllib.parse.urlsplit(url)
+    params = [
+        (key, value)
+        for key, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in SECRET_PARAMS
+    ]
+    query = urllib.parse.urlencode(sorted(params))
+    return urllib.parse.urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    payload: Any
+    expires_at: float | None
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at is None or self.expires_at > time.time()
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        directory: pathlib.Path,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        settle_days: int = DEFAULT_SETTLE_DAYS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.settle_days = settle_days
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Bytes on disk; seeded by the first `_evict`, then kept up to date by `_atomic`.
+        self._total: int | None = None
+
+    def _path(self, url: str) -> pathlib.Path:
+        digest = hashlib.sha256(redact_url(url).encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json.gz"
+
+    def _expiry(self, settled_through: dt.date | None) -> float | None:
+        if settled_through is not None:
+            cutoff = dt.date.today() - dt.timedelta(days=self.settle_days)
+            if settled_through <= cutoff:
+                return None
+        return time.time() + self.ttl
+
+    def _read_header(self, fh: BinaryIO) -> CacheEntry:
+        record = json.loads(fh.readline())
+        return CacheEntry(
+            url=record["url"],
+            payload=None,
+            expires_at=record.get("expires_at"),
+            etag=record.get("etag"),
+            last_modified=record.get("last_modified"),
+        )
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        path = self._path(url)
+        try:
+            with gzip.open(path, "rb") as fh:
+                entry = self._read_header(fh)
+                entry.payload = json.load(fh)
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return entry
+
+    def open_body(self, url: str) -> tuple[CacheEntry, BinaryIO] | None:
+        """Return the entry metadata and an open stream positioned at the raw JSON body.
+
+        Lets large payloads be decoded incrementally (see `json_stream`) instead
+        of materialising them; the caller closes the stream.
+        """
+        path = self._path(url)
+        try:
+            fh = gzip.open(path, "rb")
+        except OSError:
+            return None
+        try:
+            entry = self._read_header(fh)
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            fh.close()
+            return None
+        return entry, fh
+
+    def has_fresh(self, url: str) -> bool:
+        """Whether `url` would be served from the cache without a request."""
+        hit = self.open_body(url)
+        if hit is None:
+            return False
+        entry, fh = hit
+        fh.close()
+        return entry.fresh
+
+    def store(
+        self,
+        url: str,
+        payload: Any,
+        settled_through: dt.date | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        with self.writer(url, settled_through, headers) as body:
+            body.write(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+    @contextlib.contextmanager
+    def writer(
+        self,
+        url: str,
+        settled_through: dt.date | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> Iterator[BinaryIO]:
+        """Write a raw JSON response body into the cache as it is streamed.
+
+        The entry only becomes visible once the block exits cleanly.
+        """
+        headers = headers or {}
+        entry = CacheEntry(
+            url=redact_url(url),
+            payload=None,
+            expires_at=self._expiry(settled_through),
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+        )
+        with self._atomic(self._path(url), entry) as body:
+            yield body
+        self._evict()
+
+    def revalidated(self, entry: CacheEntry, settled_through: dt.date | None = None) -> Any:
+        """Record a 304 for `entry` (keeping its body) and return its payload."""
+        entry.expires_at = self._expiry(settled_through)
+        path = self._path(entry.url)
+        with gzip.open(path, "rb") as old:
+            old.readline()
+            with self._atomic(path, entry) as body:
+                shutil.copyfileobj(old, body)
+        return entry.payload
+
+    @contextlib.contextmanager
+    def _atomic(self, path: pathlib.Path, entry: CacheEntry) -> Iterator[BinaryIO]:
+        """Yield a gzip stream for the body after writing the metadata header line."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = {
+            "url": entry.url,
+            "stored_at": time.time(),
+            "expires_at": entry.expires_at,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+        }
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as fh:
+                fh.write(json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n")
+                yield fh
+            size = os.stat(tmp_name).st_size
+            try:
+                replaced = path.stat().st_size
+            except OSError:
+                replaced = 0
+            os.replace(tmp_name, path)
+            with self._lock:
+                if self._total is not None:
+                    self._total += size - replaced
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+    def _scan(self) -> list[tuple[float, int, pathlib.Path]]:
+        files = []
+        for path in self.directory.glob("*/*.json.gz"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _evict(self) -> None:
+        with self._lock:
+            if self._total is not None and self._total <= self.max_bytes:
+                return
+            # First write, or over the bound: list the directory (which also
+            # picks up entries other processes wrote) and trim LRU-first.
+            files = self._scan()
+            total = sum(size for _, size, _ in files)
+            if total > self.max_bytes:
+                target = int(self.max_bytes * EVICT_LOW_WATER)
+                files.sort()
+                for _, size, path in files:
+                    if total <= target:
+                        break
+                    try:
+                        path.unlink()
+                    except OSError:
+                        continue
+                    total -= size
+            self._total = total
+
+
+def add_cache_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--cache-dir",
+        type=pathlib.Path,
+        default=default_cache_dir(),
+        help="Directory for the on-disk HTTP response cache (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the on-disk HTTP response cache",
+    )
+
+
+def cache_from_args(args: argparse.Namespace) -> ResponseCache | None:
+    if args.no_cache:
+        return None
+    return ResponseCache(args.cache_dir)
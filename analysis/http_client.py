@@ -0,0 +1,275 @@
+"""Keep-alive JSON HTTP client shared by the analysis scripts.
+
+One persistent `http.client` connection is kept per (thread, scheme, host), so
+paginated Polygon/Finnhub calls skip the TCP+TLS handshake after the first
+request. Responses are requested gzip-compressed and decoded transparently.
+Connection errors, 429s and 5xx responses are retried with jittered
+exponential backoff; a `Retry-After` header (seconds or HTTP date) takes
+precedence over the computed delay. Other 4xx responses fail immediately.
+
+`get_json` and `stream_array` also integrate the optional `ResponseCache` and
+`TokenBucket` used by the probes.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import email.utils
+import gzip
+import http.client
+import json
+import random
+import threading
+import time
+import urllib.parse
+from typing import Any, BinaryIO, Iterator, Sequence
+
+if __package__:
+    from .http_cache import CacheEntry, ResponseCache, redact_url
+    from .json_stream import iter_array
+    from .rate_limit import TokenBucket
+else:  # run as a script: `python analysis/http_client.py`
+    from http_cache import CacheEntry, ResponseCache, redact_url
+    from json_stream import iter_array
+    from rate_limit import TokenBucket
+
+DEFAULT_TIMEOUT = 30.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class HttpError(RuntimeError):
+    def __init__(self, status: int, url: str, body: str = "") -> None:
+        super().__init__(f"HTTP {status} for {redact_url(url)} :: {body[:200]}")
+        self.status = status
+        self.url = url
+
+
+class _TeeReader:
+    """File-like wrapper that copies every byte read into `sink`."""
+
+    def __init__(self, source: BinaryIO, sink: BinaryIO) -> None:
+        self._source = source
+        self._sink = sink
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._source.read(size)
+        if chunk:
+            self._sink.write(chunk)
+        return chunk
+
+    def drain(self) -> None:
+        while self.read(1 << 16):
+            pass
+
+
+def retry_after_seconds(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=dt.timezone.utc)
+    return max(0.0, (when - dt.datetime.now(dt.timezone.utc)).total_seconds())
+
+
+class HttpClient:
+    def __init__(
+        self,
+        user_agent: str,
+        timeout: float = DEFAULT_TIMEOUT,
+        attempts: int = 5,
+        backoff: float = 1.5,
+        max_backoff: float = 60.0,
+    ) -> None:
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._local = threading.local()
+
+    def _connections(self) -> dict[tuple[str, str], http.client.HTTPConnection]:
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = {}
+            self._local.conns = conns
+        return conns
+
+    def _connection(self, scheme: str, host: str) -> http.client.HTTPConnection:
+        conns = self._connections()
+        conn = conns.get((scheme, host))
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = cls(host, timeout=self.timeout)
+            conns[(scheme, host)] = conn
+        return conn
+
+    def _discard(self, scheme: str, host: str) -> None:
+        conn = self._connections().pop((scheme, host), None)
+        if conn is not None:
+            conn.close()
+
+    def close(self) -> None:
+        """Close this thread's pooled connections."""
+        for key in list(self._connections()):
+            self._discard(*key)
+
+    def _sleep_before_retry(self, attempt: int, retry_after: float | None) -> None:
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            delay = min(self.max_backoff, self.backoff * (2**attempt))
+            delay = delay / 2 + random.uniform(0, delay / 2)
+        time.sleep(delay)
+
+    def _open(
+        self,
+        url: str,
+        headers: dict[str, str],
+        limiter: TokenBucket | None,
+    ) -> tuple[http.client.HTTPResponse, tuple[str, str]]:
+        """Return a response with status 200 or 304, retrying transient failures."""
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        request_headers = {
+            "User-Agent": self.user_agent,
+            "Accept-Encoding": "gzip",
+            "Connection": "keep-alive",
+            **headers,
+        }
+        last_error: Exception | None = None
+        retried_stale = False
+        for attempt in range(self.attempts):
+            if limiter is not None:
+                limiter.acquire()
+            retry_after = None
+            reused = key in self._connections()
+            try:
+                conn = self._connection(*key)
+                conn.request("GET", target, headers=request_headers)
+                resp = conn.getresponse()
+            except (OSError, http.client.HTTPException) as exc:
+                self._discard(*key)
+                last_error = exc
+                if reused and not retried_stale:
+                    # The server dropped an idle keep-alive connection; reconnect now.
+                    retried_stale = True
+                    continue
+            else:
+                if resp.status in (200, 304):
+                    return resp, key
+                body = resp.read().decode("utf-8", errors="ignore")
+                if resp.will_close:
+                    self._discard(*key)
+                last_error = HttpError(resp.status, url, body)
+                if resp.status not in RETRY_STATUSES:
+                    raise last_error
+                retry_after = retry_after_seconds(resp.getheader("Retry-After"))
+            if attempt < self.attempts - 1:
+                self._sleep_before_retry(attempt, retry_after)
+        if isinstance(last_error, HttpError):
+            raise last_error
+        raise RuntimeError(f"Request failed for {redact_url(url)}: {last_error}") from last_error
+
+    @staticmethod
+    def _body(resp: http.client.HTTPResponse) -> BinaryIO:
+        if (resp.getheader("Content-Encoding") or "").lower() == "gzip":
+            return gzip.GzipFile(fileobj=resp)  # type: ignore[return-value]
+        return resp  # type: ignore[return-value]
+
+    def _finish(self, resp: http.client.HTTPResponse, key: tuple[str, str]) -> None:
+        """Return the connection to the pool only if the body was fully consumed."""
+        if resp.will_close or not resp.isclosed():
+            self._discard(*key)
+
+    def get_json(
+        self,
+        url: str,
+        *,
+        cache: ResponseCache | None = None,
+        settled_through: dt.date | None = None,
+        limiter: TokenBucket | None = None,
+    ) -> Any:
+        entry: CacheEntry | None = cache.lookup(url) if cache is not None else None
+        if entry is not None and entry.fresh:
+            return entry.payload
+        headers = entry.conditional_headers() if entry is not None else {}
+        resp, key = self._open(url, headers, limiter)
+        try:
+            if resp.status == 304 and entry is not None and cache is not None:
+                resp.read()
+                return cache.revalidated(entry, settled_through)
+            raw = resp.read()
+        finally:
+            self._finish(resp, key)
+        if (resp.getheader("Content-Encoding") or "").lower() == "gzip":
+            raw = gzip.decompress(raw)
+        payload = json.loads(raw.decode("utf-8"))
+        if cache is not None:
+            cache.store(url, payload, settled_through, resp.headers)
+        return payload
+
+    def stream_array(
+        self,
+        url: str,
+        path: Sequence[str],
+        *,
+        cache: ResponseCache | None = None,
+        settled_through: dt.date | None = None,
+        limiter: TokenBucket | None = None,
+    ) -> Iterator[Any]:
+        """Yield the elements of the JSON array at `path` as the body downloads.
+
+        The body is never held in full; with a cache the decoded bytes are teed
+        into the entry as they stream. A failure mid-body propagates.
+        """
+        entry = None
+        if cache is not None:
+            hit = cache.open_body(url)
+            if hit is not None:
+                entry, body = hit
+                with body:
+                    if entry.fresh:
+                        yield from iter_array(body, path)
+                        return
+        headers = entry.conditional_headers() if entry is not None else {}
+        resp, key = self._open(url, headers, limiter)
+        try:
+            if resp.status == 304 and entry is not None and cache is not None:
+                resp.read()
+                cache.revalidated(entry, settled_through)
+                hit = cache.open_body(url)
+                if hit is None:
+                    raise RuntimeError(f"Cache entry vanished for {redact_url(url)}")
+                with hit[1] as body:
+                    yield from iter_array(body, path)
+                return
+            body = self._body(resp)
+            if cache is None:
+                yield from iter_array(body, path)
+                body.read()
+                return
+            with cache.writer(url, settled_through, resp.headers) as sink:
+                tee = _TeeReader(body, sink)
+                yield from iter_array(tee, path)
+                tee.drain()
+        finally:
+            self._finish(resp, key)
+
+
+def add_http_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Per-request socket timeout in seconds (default: %(default)s)",
+    )
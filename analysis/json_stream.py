@@ -0,0 +1,124 @@
+"""Incremental JSON decoding for large API payloads.
+
+`iter_array` walks a JSON document from a binary file object and yields the
+elements of one nested array (e.g. Polygon's top-level `results`) one at a
+time. Only the current element and a read-ahead chunk are held in memory, so
+peak usage stays flat regardless of payload size. Stdlib only: each element is
+decoded with `json.JSONDecoder.raw_decode` once enough bytes have arrived.
+"""
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any, BinaryIO, Iterator, Sequence
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+_WHITESPACE = " \t\r\n"
+_DECODER = json.JSONDecoder()
+
+
+class _Buffer:
+    def __init__(self, fp: BinaryIO, chunk_size: int) -> None:
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Append the next chunk, compacting consumed text. False at EOF."""
+        if self.eof:
+            return False
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self.eof = True
+            tail = self._decoder.decode(b"", final=True)
+        else:
+            tail = self._decoder.decode(chunk)
+        self.text = self.text[self.pos:] + tail
+        self.pos = 0
+        return bool(chunk) or bool(tail)
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character ('' at EOF) without consuming it."""
+        while True:
+            text = self.text
+            pos = self.pos
+            while pos < len(text) and text[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(text):
+                return text[pos]
+            if not self.fill():
+                return ""
+
+    def take(self, expected: str) -> None:
+        char = self.peek()
+        if char != expected:
+            raise ValueError(f"Expected {expected!r} in JSON stream, found {char!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A scalar ending exactly at the buffer edge may be truncated (e.g. a number).
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def _walk(buf: _Buffer, path: Sequence[str]) -> Iterator[Any]:
+    buf.take("{")
+    if buf.peek() == "}":
+        return
+    while True:
+        key = buf.value()
+        buf.take(":")
+        if key == path[0]:
+            if len(path) > 1:
+                yield from _walk(buf, path[1:])
+                return
+            if buf.peek() != "[":
+                value = buf.value()
+                if isinstance(value, list):
+                    yield from value
+                return
+            buf.take("[")
+            if buf.peek() == "]":
+                return
+            while True:
+                yield buf.value()
+                sep = buf.peek()
+                buf.pos += 1
+                if sep == "]":
+                    return
+                if sep != ",":
+                    raise ValueError(f"Malformed JSON array near {sep!r}")
+        buf.value()
+        sep = buf.peek()
+        buf.pos += 1
+        if sep == "}":
+            return
+        if sep != ",":
+            raise ValueError(f"Malformed JSON object near {sep!r}")
+
+
+def iter_array(
+    fp: BinaryIO,
+    path: Sequence[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Any]:
+    """Yield the elements of the array found at `path` (a sequence of object keys).
+
+    Missing keys or a `null` array yield nothing, mirroring `payload.get(key) or []`.
+    Anything after the array is not read.
+    """
+    yield from _walk(_Buffer(fp, chunk_size), tuple(path))
@@ -0,0 +1,27 @@
+"""Deferred imports for the heavy optional dependencies of the analysis CLIs.
+
+`lazy_import("pandas", hint)` returns a module object whose body only executes
+on first attribute access (via `importlib.util.LazyLoader`), so `--help`,
+argument errors and subcommands that never touch pandas/numpy start without
+paying for them. A missing package still fails up front with the pip hint.
+"""
+from __future__ import annotations
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str, install_hint: str) -> ModuleType:
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise SystemExit(f"{name} is required. install with `{install_hint}`.")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
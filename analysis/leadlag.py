@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""StockTwits vs Reddit lead/lag from a local, timestamp-sorted message cache.
+
+Replaces re-running `stocktwits_reddit_leadlag.sql` against the pooler: export
+messages once per window with `stocktwits_reddit_messages.sql`, `--ingest`
+the CSVs into a Parquet cache (a directory under ~/.cache/moonshot-analysis/
+with one part file per ingest, each sorted by symbol then timestamp so
+symbol/date filters prune row groups), then sweep as often as needed:
+
+    python -m analysis leadlag --ingest /tmp/messages_2025-09.csv
+    python -m analysis leadlag --start 2025-09-01 --end 2025-10-01 --max-lag 48
+
+Two views are reported:
+  • First mention per ticker-day (the SQL report): the first StockTwits and
+    first Reddit timestamp of each (UTC day, symbol), paired with a sorted
+    merge join; lead is StockTwits minus Reddit in minutes, so negative means
+    StockTwits spoke first. Percentiles are discrete, as PERCENTILE_DISC.
+  • Hourly cross-correlation: per symbol, hourly mention counts and net
+    sentiment of each source are correlated at every lag in
+    [-max_lag, max_lag] at once via zero-padded FFTs over the
+    (symbols x hours) matrices. A positive lag k correlates StockTwits at
+    hour t with Reddit at t + k, i.e. StockTwits leading.
+
+Requires pandas + pyarrow (install with `python3 -m pip install --user pandas
+pyarrow`).
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import importlib.util
+import os
+import pathlib
+import sys
+import time
+from typing import Any, Iterable, Sequence
+
+if __package__:
+    from .http_cache import cache_root
+    from .lazy_import import lazy_import
+    from .ticker_days import label_sentiment
+else:  # run as a script: `python analysis/leadlag.py`
+    from http_cache import cache_root
+    from lazy_import import lazy_import
+    from ticker_days import label_sentiment
+
+np = lazy_import("numpy", "python3 -m pip install --user numpy pandas pyarrow")
+pd = lazy_import("pandas", "python3 -m pip install --user numpy pandas pyarrow")
+
+CACHE_PATH = cache_root() / "stocktwits_reddit_messages"
+CACHE_ROW_GROUP = 262_144
+# Ingests beyond this many part files are merged back into one.
+CACHE_MAX_PARTS = 32
+MESSAGE_COLUMNS = ["source", "message_id", "symbol", "created_at", "sentiment"]
+STOCKTWITS, REDDIT = "stocktwits", "reddit"
+REDDIT_LABELS = {"POSITIVE": 1.0, "NEGATIVE": -1.0}
+DEFAULT_MAX_LAG = 24
+DEFAULT_MIN_MESSAGES = 20
+HOUR_US = 3_600_000_000
+DAY_US = 24 * HOUR_US
+
+
+def _require_pyarrow() -> None:
+    if importlib.util.find_spec("pyarrow") is None:
+        raise SystemExit(
+            "pyarrow is required for the message cache. install with "
+            "`python3 -m pip install --user pyarrow`."
+        )
+
+
+def _epoch_us(timestamps: pd.Series) -> np.ndarray:
+    naive = timestamps.dt.tz_convert("UTC").dt.tz_localize(None)
+    return naive.to_numpy("datetime64[us]").view(np.int64)
+
+
+def message_sentiment(source: pd.Series, label: pd.Series, score: pd.Series) -> np.ndarray:
+    """+1/-1/0 for StockTwits labels; the model score (else the label) for Reddit."""
+    labels = label.astype("category")
+    st_values = np.append(label_sentiment(labels.cat.categories), 0)[labels.cat.codes.to_numpy()]
+    reddit_labels = labels.cat.categories.astype(str).str.strip().str.upper()
+    rd_label_values = np.append(
+        reddit_labels.map(lambda value: REDDIT_LABELS.get(value, 0.0)).to_numpy(np.float64), 0.0
+    )[labels.cat.codes.to_numpy()]
+    rd_values = score.to_numpy(np.float64, na_value=np.nan)
+    rd_values = np.where(np.isnan(rd_values), rd_label_values, rd_values)
+    return np.where(source.to_numpy() == STOCKTWITS, st_values, rd_values)
+
+
+def read_export(path: pathlib.Path) -> pd.DataFrame:
+    """Load one `stocktwits_reddit_messages.sql` CSV in cache layout."""
+    raw = pd.read_csv(
+        path,
+        dtype={"source": str, "message_id": str, "symbol": str, "label": str, "score": "float64"},
+    )
+    source = raw["source"].str.strip().str.lower()
+    return pd.DataFrame(
+        {
+            "source": source,
+            "message_id": raw["message_id"],
+            "symbol": raw["symbol"].str.strip().str.upper(),
+            "created_at": pd.to_datetime(raw["created_at"], utc=True, format="ISO8601").dt.as_unit(
+                "us"
+            ),
+            "sentiment": message_sentiment(source, raw["label"], raw["score"]).astype(np.float32),
+        }
+    )
+
+
+def _unique_sorted(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """Later copies of a message win; rows sorted by (symbol, created_at)."""
+    table = pd.concat(frames, ignore_index=True)
+    table = table.drop_duplicates(["source", "message_id", "symbol"], keep="last")
+    return table.sort_values(["symbol", "created_at"], kind="stable", ignore_index=True)
+
+
+class MessageCache:
+    """Directory of Parquet parts, one per ingest; rows keyed by (source, message_id, symbol).
+
+    An ingest only writes its own part. Re-exported messages shadow their older
+    copies when loading, and every `CACHE_MAX_PARTS` ingests the parts are
+    merged back into one.
+    """
+
+    def __init__(self, path: pathlib.Path | str = CACHE_PATH) -> None:
+        self.path = pathlib.Path(path)
+
+    def parts(self) -> list[pathlib.Path]:
+        """Part files, oldest ingest first."""
+        return sorted(self.path.glob("part-*.parquet")) if self.path.is_dir() else []
+
+    def _write_part(self, table: pd.DataFrame) -> pathlib.Path:
+        self.path.mkdir(parents=True, exist_ok=True)
+        part = self.path / f"part-{time.time_ns():020d}.parquet"
+        tmp = part.with_name(f"{part.name}.tmp")
+        table[MESSAGE_COLUMNS].to_parquet(tmp, index=False, row_group_size=CACHE_ROW_GROUP)
+        os.replace(tmp, part)
+        return part
+
+    def ingest(self, exports: Iterable[pathlib.Path]) -> tuple[int, int]:
+        """Append exports to the cache as a new part; returns (rows read, parts)."""
+        _require_pyarrow()
+        frames = [read_export(path) for path in exports]
+        read = sum(len(frame) for frame in frames)
+        if read:
+            self._write_part(_unique_sorted(frames))
+        if len(self.parts()) > CACHE_MAX_PARTS:
+            self.compact()
+        return read, len(self.parts())
+
+    def compact(self) -> int:
+        """Merge every part into one; returns the number of cached messages."""
+        _require_pyarrow()
+        parts = self.parts()
+        table = _unique_sorted([pd.read_parquet(part) for part in parts])
+        merged = self._write_part(table)
+        for part in parts:
+            if part != merged:
+                part.unlink()
+        return len(table)
+
+    def load(
+        self,
+        start: dt.date | None = None,
+        end: dt.date | None = None,
+        symbols: Sequence[str] | None = None,
+    ) -> pd.DataFrame:
+        """Messages in [start, end) for `symbols`, sorted by symbol then time."""
+        _require_pyarrow()
+        parts = self.parts()
+        if not parts:
+            raise SystemExit(f"Message cache not found: {self.path} (run with --ingest first)")
+        symbol_filters: list[tuple[str, str, Any]] = []
+        if symbols:
+            symbol_filters.append(("symbol", "in", sorted({symbol.upper() for symbol in symbols})))
+        date_filters: list[tuple[str, str, Any]] = []
+        if start is not None:
+            date_filters.append(("created_at", ">=", pd.Timestamp(start, tz="UTC")))
+        if end is not None:
+            date_filters.append(("created_at", "<", pd.Timestamp(end, tz="UTC")))
+        if len(parts) == 1:
+            filters = symbol_filters + date_filters
+            return pd.read_parquet(parts[0], columns=MESSAGE_COLUMNS, filters=filters or None)
+        # A newer copy of a message may have moved out of the window, so the
+        # copies are reconciled before the dates are filtered.
+        table = _unique_sorted(
+            [
+                pd.read_parquet(part, columns=MESSAGE_COLUMNS, filters=symbol_filters or None)
+                for part in parts
+            ]
+        )
+        created = table["created_at"]
+        keep = np.ones(len(table), dtype=bool)
+        if start is not None:
+            keep &= (created >= pd.Timestamp(start, tz="UTC")).to_numpy()
+        if end is not None:
+            keep &= (created < pd.Timestamp(end, tz="UTC")).to_numpy()
+        return table[keep].reset_index(drop=True)
+
+
+class MessageArrays:
+    """Integer views of a loaded message table shared by both analyses."""
+
+    def __init__(self, messages: pd.DataFrame) -> None:
+        symbols = pd.Categorical(messages["symbol"])
+        self.symbols = symbols.categories
+        self.codes = symbols.codes.astype(np.int64)
+        self.ts = _epoch_us(messages["created_at"])
+        self.sentiment = messages["sentiment"].to_numpy(np.float64)
+        source = messages["source"].to_numpy()
+        self.is_stocktwits = source == STOCKTWITS
+        self.is_reddit = source == REDDIT
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+
+def _first_per_day(arrays: MessageArrays, mask: np.ndarray, first_day: int, days: int):
+    """Sorted (symbol, day) keys and the first timestamp of each, for one source."""
+    ts = arrays.ts[mask]
+    keys = arrays.codes[mask] * days + (ts // DAY_US - first_day)
+    # Rows are sorted by (symbol, time), so each key's first row is its first mention.
+    firsts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else keys
+    return keys[firsts], ts[firsts]
+
+
+def first_mention_leads(arrays: MessageArrays) -> pd.DataFrame:
+    """Per (day, symbol) first-mention timestamps of both sources and the lead."""
+    if not len(arrays):
+        return pd.DataFrame(columns=["day", "symbol", "lead_minutes"])
+    first_day = int(arrays.ts.min() // DAY_US)
+    days = int(arrays.ts.max() // DAY_US) - first_day + 1
+    st_keys, st_ts = _first_per_day(arrays, arrays.is_stocktwits, first_day, days)
+    rd_keys, rd_ts = _first_per_day(arrays, arrays.is_reddit, first_day, days)
+    keys, st_at, rd_at = np.intersect1d(st_keys, rd_keys, assume_unique=True, return_indices=True)
+    day = (np.datetime64("1970-01-01") + (keys % days + first_day).astype("timedelta64[D]"))
+    return pd.DataFrame(
+        {
+            "day": day,
+            "symbol": np.asarray(arrays.symbols)[keys // days],
+            "lead_minutes": (st_ts[st_at] - rd_ts[rd_at]) / 60e6,
+        }
+    )
+
+
+def _percentile_disc(sorted_values: np.ndarray, fraction: float) -> float:
+    """First value whose cumulative share reaches `fraction` (PERCENTILE_DISC)."""
+    return float(sorted_values[max(int(np.ceil(fraction * len(sorted_values))) - 1, 0)])
+
+
+def lead_summary(leads: pd.DataFrame) -> pd.DataFrame:
+    minutes = np.sort(leads["lead_minutes"].to_numpy(np.float64))
+    row: dict[str, Any] = {
+        "ticker_days": len(minutes),
+        "st_leads": int((minutes < 0).sum()),
+        "rd_leads": int((minutes > 0).sum()),
+        "simultaneous": int((minutes == 0).sum()),
+    }
+    for name, fraction in (("median", 0.5), ("p25", 0.25), ("p75", 0.75)):
+        value = _percentile_disc(minutes, fraction) if len(minutes) else np.nan
+        row[f"{name}_lead_min"] = round(value, 2)
+    return pd.DataFrame([row])
+
+
+def hourly_matrices(
+    arrays: MessageArrays,
+    mask: np.ndarray,
+    first_hour: int,
+    hours: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """(symbols x hours) mention counts and net sentiment for one source."""
+    size = len(arrays.symbols) * hours
+    cells = arrays.codes[mask] * hours + (arrays.ts[mask] // HOUR_US - first_hour)
+    counts = np.bincount(cells, minlength=size).astype(np.float64)
+    sentiment = np.bincount(cells, weights=arrays.sentiment[mask], minlength=size)
+    shape = (len(arrays.symbols), hours)
+    return counts.reshape(shape), sentiment.reshape(shape)
+
+
+def cross_correlation(a: np.ndarray, b: np.ndarray, max_lag: int) -> np.ndarray:
+    """Row-wise correlation of a[t] with b[t + k] for k in [-max_lag, max_lag].
+
+    Rows are centred and the lagged products summed with one zero-padded FFT
+    per matrix, normalised so lag 0 equals the Pearson r of the row pair.
+    Constant rows give NaN.
+    """
+    length = a.shape[1]
+    a = a - a.mean(axis=1, keepdims=True)
+    b = b - b.mean(axis=1, keepdims=True)
+    norm = np.sqrt((a * a).sum(axis=1) * (b * b).sum(axis=1))
+    # Padding to >= length + max_lag keeps the circular products from wrapping.
+    size = 1 << int(np.ceil(np.log2(max(length + max_lag, 2))))
+    products = np.fft.irfft(np.conj(np.fft.rfft(a, size)) * np.fft.rfft(b, size), size)
+    lags = np.arange(-max_lag, max_lag + 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(norm[:, None] > 0, products[:, lags % size] / norm[:, None], np.nan)
+
+
+def lag_profile(
+    arrays: MessageArrays,
+    start: dt.date | None,
+    end: dt.date | None,
+    max_lag: int,
+    min_messages: int,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Mean cross-correlation per lag across symbols, and each symbol's peak lag.
+
+    Only symbols with at least `min_messages` messages on both sources count.
+    """
+    first_hour = (
+        int(pd.Timestamp(start, tz="UTC").value // 1000 // HOUR_US)
+        if start is not None
+        else int(arrays.ts.min() // HOUR_US)
+    )
+    last_hour = (
+        int(pd.Timestamp(end, tz="UTC").value // 1000 // HOUR_US) - 1
+        if end is not None
+        else int(arrays.ts.max() // HOUR_US)
+    )
+    hours = last_hour - first_hour + 1
+    st_counts, st_sentiment = hourly_matrices(arrays, arrays.is_stocktwits, first_hour, hours)
+    rd_counts, rd_sentiment = hourly_matrices(arrays, arrays.is_reddit, first_hour, hours)
+    keep = (st_counts.sum(axis=1) >= min_messages) & (rd_counts.sum(axis=1) >= min_messages)
+    lags = np.arange(-max_lag, max_lag + 1)
+    series = {
+        "mentions": cross_correlation(st_counts[keep], rd_counts[keep], max_lag),
+        "sentiment": cross_correlation(st_sentiment[keep], rd_sentiment[keep], max_lag),
+    }
+    profile = pd.DataFrame({"lag_hours": lags})
+    peaks = pd.DataFrame(index=pd.Index(np.asarray(arrays.symbols)[keep], name="symbol"))
+    peaks["stocktwits_messages"] = st_counts[keep].sum(axis=1).astype(np.int64)
+    peaks["reddit_messages"] = rd_counts[keep].sum(axis=1).astype(np.int64)
+    with np.errstate(invalid="ignore"):
+        for name, corr in series.items():
+            valid = ~np.isnan(corr).all(axis=1)
+            profile[f"{name}_symbols"] = (~np.isnan(corr)).sum(axis=0)
+            profile[f"{name}_corr"] = (
+                np.nanmean(corr[valid], axis=0) if valid.any() else np.full(len(lags), np.nan)
+            )
+            best = np.full(len(corr), np.nan)
+            best[valid] = lags[np.nanargmax(corr[valid], axis=1)]
+            peaks[f"{name}_peak_lag"] = best
+    return profile, peaks
+
+
+def _format_table(df: pd.DataFrame) -> str:
+    """Return a Markdown formatted table."""
+    return df.round(3).to_markdown(tablefmt="pipe", index=False)  # type: ignore[no-any-return]
+
+
+def build_report(
+    messages: pd.DataFrame,
+    start: dt.date | None,
+    end: dt.date | None,
+    max_lag: int,
+    min_messages: int,
+) -> str:
+    arrays = MessageArrays(messages)
+    sections = [
+        f"Messages: {int(arrays.is_stocktwits.sum())} StockTwits, "
+        f"{int(arrays.is_reddit.sum())} Reddit across {len(arrays.symbols)} symbols",
+    ]
+    sections.append(
+        "## First Mention per Ticker-Day (lead = StockTwits - Reddit, minutes)\n\n"
+        + _format_table(lead_summary(first_mention_leads(arrays)))
+    )
+    if len(arrays):
+        profile, peaks = lag_profile(arrays, start, end, max_lag, min_messages)
+        lead_share = []
+        for name in ("mentions", "sentiment"):
+            peak = peaks[f"{name}_peak_lag"].dropna()
+            if len(peak):
+                lead_share.append(
+                    f"{name}: StockTwits leads for {int((peak > 0).sum())}/{len(peak)} symbols, "
+                    f"Reddit for {int((peak < 0).sum())}, peak at 0h for {int((peak == 0).sum())}"
+                )
+        sections.append(
+            f"## Hourly Cross-Correlation ({len(peaks)} symbols with >= {min_messages} "
+            "messages per source; positive lag = StockTwits leads)\n\n"
+            + _format_table(profile)
+            + ("\n\n" + "\n".join(f"- {line}" for line in lead_share) if lead_share else "")
+        )
+    return "\n\n".join(sections) + "\n"
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="StockTwits vs Reddit lead/lag from the local message cache."
+    )
+    parser.add_argument(
+        "--cache",
+        type=pathlib.Path,
+        default=CACHE_PATH,
+        help="Parquet message cache directory (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--ingest",
+        type=pathlib.Path,
+        nargs="+",
+        default=[],
+        help="stocktwits_reddit_messages.sql CSV exports to merge into the cache first",
+    )
+    parser.add_argument("--start", type=dt.date.fromisoformat, help="First UTC day (inclusive)")
+    parser.add_argument("--end", type=dt.date.fromisoformat, help="Last UTC day (exclusive)")
+    parser.add_argument(
+        "--symbols",
+        type=lambda value: [symbol.strip() for symbol in value.split(",") if symbol.strip()],
+        help="Comma-separated symbols (default: all cached)",
+    )
+    parser.add_argument(
+        "--max-lag",
+        type=int,
+        default=DEFAULT_MAX_LAG,
+        help="Largest lag in hours, both directions (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--min-messages",
+        type=int,
+        default=DEFAULT_MIN_MESSAGES,
+        help="Messages per source a symbol needs for the cross-correlation (default: %(default)s)",
+    )
+    parser.add_argument("--output", type=pathlib.Path, help="Write the Markdown report here")
+    args = parser.parse_args(argv)
+    if args.max_lag < 0:
+        parser.error("--max-lag must be >= 0")
+    if args.start and args.end and args.start >= args.end:
+        parser.error("--start must be before --end")
+
+    cache = MessageCache(args.cache)
+    missing = [path for path in args.ingest if not path.exists()]
+    if missing:
+        raise SystemExit(f"Export not found: {missing[0]}")
+    if args.ingest:
+        read, parts = cache.ingest(args.ingest)
+        print(f"Ingested {read} rows; cache now holds {parts} part file(s) ({cache.path})")
+    messages = cache.load(args.start, args.end, args.symbols)
+    report = build_report(messages, args.start, args.end, args.max_lag, args.min_messages)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(report)
+        print(f"Wrote {args.output}")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
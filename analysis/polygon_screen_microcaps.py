@@ -4,18 +4,41 @@ from __future__ import annotations
 import argparse
 import csv
 import datetime as dt
-import json
 import os
 import sys
 import time
-import urllib.error
-import urllib.request
+from array import array
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from math import sqrt
+from typing import Iterable, Iterator
+
+if __package__:
+    from .bar_store import BAR_COLUMNS, DailyBarStore
+    from .http_cache import ResponseCache, add_cache_args, cache_from_args
+    from .http_client import HttpClient, add_http_args
+    from .lazy_import import lazy_import
+    from .rate_limit import TokenBucket, get_limiter
+    from .trading_calendar import recent_sessions
+else:  # run as a script: `python analysis/polygon_screen_microcaps.py`
+    from bar_store import BAR_COLUMNS, DailyBarStore
+    from http_cache import ResponseCache, add_cache_args, cache_from_args
+    from http_client import HttpClient, add_http_args
+    from lazy_import import lazy_import
+    from rate_limit import TokenBucket, get_limiter
+    from trading_calendar import recent_sessions
+
+np = lazy_import("numpy", "python3 -m pip install --user numpy pandas")
+pd = lazy_import("pandas", "python3 -m pip install --user numpy pandas")
 
 API_URL = "https://api.polygon.io/v2/aggs/grouped/locale/us/market/stocks/{date}?adjusted=true"
+# Shared with finnhub_earnings_probe.py's polygon limiter (requests/second).
+DEFAULT_RATE_LIMIT = 4.0
 
+HTTP = HttpClient("moonshot-microcap-screen/1.0", attempts=3)
 
-def parse_args() -> argparse.Namespace:
+
+def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Screen micro/meme-cap stocks using Polygon grouped daily data.")
     parser.add_argument("--days", type=int, default=20, help="Number of recent trading days to average (default: 20)")
     parser.add_argument("--adv-min", type=float, default=5e6, help="Minimum average dollar volume (default: 5e6)")
@@ -25,111 +48,417 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--limit", type=int, default=25, help="Number of rows to display (default: 25)")
     parser.add_argument("--min-days", type=int, default=10, help="Minimum observations per symbol (default: 10)")
     parser.add_argument("--sleep", type=float, default=0.25, help="Delay between API calls (default: 0.25s)")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help=(
+            "Grouped-daily requests kept in flight (default: 1 = sequential). Values > 1 "
+            "pace requests with a shared rate limiter and ignore --sleep"
+        ),
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_RATE_LIMIT,
+        help="Polygon request budget in requests/second for concurrent mode "
+        "(default: %(default)g)",
+    )
     parser.add_argument("--output", type=str, help="Optional CSV path to write results")
     parser.add_argument("--verbose", action="store_true", help="Print progress details")
-    return parser.parse_args()
+    parser.add_argument(
+        "--store",
+        type=str,
+        help=(
+            "Optional SQLite bar store; only sessions missing from the store are "
+            "downloaded and the rolling stats are computed from it"
+        ),
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Decode grouped-daily payloads incrementally so peak memory stays flat "
+            "instead of holding each full response"
+        ),
+    )
+    add_cache_args(parser)
+    add_http_args(parser)
+    args = parser.parse_args(argv)
+    if args.rate <= 0:
+        parser.error("--rate must be > 0")
+    return args
+
 
+def http_get(
+    url: str,
+    cache: ResponseCache | None = None,
+    settled_through: dt.date | None = None,
+    limiter: TokenBucket | None = None,
+) -> dict:
+    return HTTP.get_json(url, cache=cache, settled_through=settled_through, limiter=limiter)
 
-def http_get(url: str) -> dict:
-    req = urllib.request.Request(url, headers={"User-Agent": "moonshot-microcap-screen/1.0"})
-    for attempt in range(3):
-        try:
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                if resp.status != 200:
-                    raise RuntimeError(f"HTTP {resp.status} for {url}")
-                return json.loads(resp.read().decode("utf-8"))
-        except (urllib.error.HTTPError, urllib.error.URLError, TimeoutError) as exc:
-            if attempt == 2:
-                raise RuntimeError(f"Polygon request failed: {exc}") from exc
-            time.sleep(1.5 * (attempt + 1))
-    raise RuntimeError("Polygon request failed after retries")
+
+def http_iter_results(
+    url: str,
+    cache: ResponseCache | None = None,
+    settled_through: dt.date | None = None,
+    limiter: TokenBucket | None = None,
+) -> Iterator[dict]:
+    """Streaming counterpart of `http_get` that yields `results` rows one at a time."""
+    return HTTP.stream_array(
+        url, ("results",), cache=cache, settled_through=settled_through, limiter=limiter
+    )
 
 
 def trading_dates(days: int) -> list[str]:
-    today = dt.date.today()
-    collected: list[str] = []
-    cursor = today
-    while len(collected) < days:
-        date_str = cursor.strftime("%Y-%m-%d")
-        collected.append(date_str)
-        cursor -= dt.timedelta(days=1)
-    return collected
-
-
-def stdev(values: list[float]) -> float:
-    if len(values) < 2:
-        return 0.0
-    mean = sum(values) / len(values)
-    var = sum((v - mean) ** 2 for v in values) / (len(values) - 1)
-    return sqrt(var)
-
-
-def screen(args: argparse.Namespace, api_key: str) -> list[dict[str, object]]:
-    records: dict[str, dict[str, object]] = {}
-    gotten_days = 0
-    for date_str in trading_dates(args.days * 2):
-        if gotten_days >= args.days:
-            break
-        url = f"{API_URL.format(date=date_str)}&apiKey={api_key}"
-        payload = http_get(url)
-        results = payload.get("results") or []
-        if not results:
+    """Most recent NYSE sessions (newest first), skipping weekends and holidays."""
+    return [session.date.isoformat() for session in recent_sessions(days)]
+
+
+def day_frame(date_str: str, results: Iterable[dict]) -> pd.DataFrame:
+    """Normalise one grouped-daily payload into `BAR_COLUMNS` rows.
+
+    `results` may be a lazy row iterator; rows are consumed one at a time into
+    compact typed columns.
+    """
+    tickers: list[str] = []
+    close = array("d")
+    open_ = array("d")
+    dollar = array("d")
+    for row in results:
+        ticker = row.get("T")
+        c = row.get("c")
+        volume = row.get("v")
+        vw = row.get("vw")
+        if not ticker or c is None or volume is None or vw is None:
             continue
-        gotten_days += 1
-        if args.verbose:
-            print(f"Fetched {len(results)} rows for {date_str}", file=sys.stderr)
-        for row in results:
-            ticker = row.get("T")
-            close = row.get("c")
-            open_ = row.get("o")
-            volume = row.get("v")
-            vw = row.get("vw")
-            if not ticker or close is None or volume is None or vw is None:
-                continue
-            entry = records.setdefault(
-                ticker,
-                {
-                    "dollar": [],
-                    "moves": [],
-                    "last_close": close,
-                    "last_date": date_str,
-                },
+        o = row.get("o")
+        tickers.append(ticker)
+        close.append(c)
+        open_.append(o if o is not None else float("nan"))
+        dollar.append(volume * vw)
+    close_arr = np.frombuffer(close, dtype=float)
+    open_arr = np.frombuffer(open_, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        move = np.where(open_arr > 0, np.abs((close_arr - open_arr) / open_arr), np.nan)
+    return pd.DataFrame(
+        {
+            "day": date_str,
+            "ticker": tickers,
+            "dollar_volume": np.frombuffer(dollar, dtype=float),
+            "move": move,
+            "close": close_arr,
+        },
+        columns=BAR_COLUMNS,
+    )
+
+
+def day_url(date_str: str, api_key: str) -> str:
+    return f"{API_URL.format(date=date_str)}&apiKey={api_key}"
+
+
+def fetch_day(
+    date_str: str,
+    api_key: str,
+    cache: ResponseCache | None = None,
+    limiter: TokenBucket | None = None,
+) -> list[dict]:
+    url = day_url(date_str, api_key)
+    payload = http_get(url, cache, dt.date.fromisoformat(date_str), limiter)
+    return payload.get("results") or []
+
+
+def load_day(
+    date_str: str,
+    api_key: str,
+    cache: ResponseCache | None = None,
+    limiter: TokenBucket | None = None,
+    stream: bool = False,
+) -> pd.DataFrame:
+    if stream:
+        url = day_url(date_str, api_key)
+        results = http_iter_results(url, cache, dt.date.fromisoformat(date_str), limiter)
+    else:
+        results = fetch_day(date_str, api_key, cache, limiter)
+    return day_frame(date_str, results)
+
+
+def iter_day_results(
+    dates: Iterable[str],
+    args: argparse.Namespace,
+    api_key: str,
+    cache: ResponseCache | None = None,
+) -> Iterator[tuple[str, pd.DataFrame]]:
+    """Yield `(date, bars)` in date order while prefetching ahead.
+
+    With `--concurrency N` up to N requests stay in flight and are paced by the
+    shared Polygon limiter, so downloads overlap with decoding and aggregation
+    in the caller. Breaking out of the loop cancels requests not yet started.
+    Sequentially, `--sleep` only follows days that were not served from cache.
+    """
+    if args.concurrency <= 1:
+        for date_str in dates:
+            cached = cache is not None and cache.has_fresh(day_url(date_str, api_key))
+            yield date_str, load_day(date_str, api_key, cache, stream=args.stream)
+            if not cached:
+                time.sleep(args.sleep)
+        return
+
+    limiter = get_limiter("polygon", args.rate)
+    pending: deque[tuple[str, Future]] = deque()
+    remaining = iter(dates)
+    pool = ThreadPoolExecutor(max_workers=args.concurrency)
+    try:
+        for date_str in remaining:
+            pending.append(
+                (
+                    date_str,
+                    pool.submit(load_day, date_str, api_key, cache, limiter, args.stream),
+                )
             )
-            entry["last_close"] = close
-            entry["last_date"] = date_str
-            entry["dollar"].append(volume * vw)
-            if open_ and open_ > 0:
-                entry["moves"].append(abs((close - open_) / open_))
-        time.sleep(args.sleep)
-    rows: list[dict[str, object]] = []
-    for ticker, entry in records.items():
-        obs = len(entry["dollar"])
-        if obs < args.min_days:
-            continue
-        avg_dollar = sum(entry["dollar"]) / obs
-        if avg_dollar < args.adv_min or avg_dollar > args.adv_max:
-            continue
-        price = entry["last_close"]
-        if price < args.price_min or price > args.price_max:
-            continue
-        vol = stdev(entry["moves"])
-        if not entry["moves"]:
+            if len(pending) >= args.concurrency:
+                break
+        while pending:
+            date_str, future = pending.popleft()
+            bars = future.result()
+            next_date = next(remaining, None)
+            if next_date is not None:
+                pending.append(
+                    (
+                        next_date,
+                        pool.submit(load_day, next_date, api_key, cache, limiter, args.stream),
+                    )
+                )
+            yield date_str, bars
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_window_results(
+    dates: list[str],
+    needed: int,
+    args: argparse.Namespace,
+    api_key: str,
+    cache: ResponseCache | None = None,
+) -> Iterator[tuple[str, pd.DataFrame]]:
+    """`iter_day_results` that only prefetches the first `needed` dates.
+
+    Later dates are requested only if the caller keeps consuming (e.g. a
+    session came back empty), so prefetching never spends requests past the
+    lookback window.
+    """
+    yield from iter_day_results(dates[:needed], args, api_key, cache)
+    yield from iter_day_results(dates[needed:], args, api_key, cache)
+
+
+class TickerStats:
+    """Constant-memory running statistics per ticker for the screen.
+
+    Per-ticker state lives in preallocated NumPy buffers indexed by a ticker
+    id (grown by doubling), independent of the lookback length. Each session
+    is folded in with vectorised updates: dollar-volume sum/count, a Welford
+    mean/variance of absolute moves, and the close of the newest session seen.
+    """
+
+    __slots__ = (
+        "index",
+        "tickers",
+        "size",
+        "obs",
+        "dollar_sum",
+        "move_n",
+        "move_mean",
+        "move_m2",
+        "last_close",
+        "last_day",
+    )
+
+    def __init__(self, capacity: int = 16384) -> None:
+        self.index: dict[str, int] = {}
+        self.tickers: list[str] = []
+        self.size = 0
+        self.obs = np.zeros(capacity, dtype=np.int32)
+        self.dollar_sum = np.zeros(capacity, dtype=float)
+        self.move_n = np.zeros(capacity, dtype=np.int32)
+        self.move_mean = np.zeros(capacity, dtype=float)
+        self.move_m2 = np.zeros(capacity, dtype=float)
+        self.last_close = np.zeros(capacity, dtype=float)
+        self.last_day = np.full(capacity, -1, dtype=np.int64)
+
+    def _grow(self, needed: int) -> None:
+        capacity = self.obs.size
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("obs", "dollar_sum", "move_n", "move_mean", "move_m2", "last_close"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[: old.size] = old
+            setattr(self, name, new)
+        last_day = np.full(capacity, -1, dtype=np.int64)
+        last_day[: self.last_day.size] = self.last_day
+        self.last_day = last_day
+
+    def _ids(self, tickers: Iterable[str]) -> np.ndarray:
+        ids = []
+        for ticker in tickers:
+            idx = self.index.get(ticker)
+            if idx is None:
+                idx = len(self.tickers)
+                self.index[ticker] = idx
+                self.tickers.append(ticker)
+            ids.append(idx)
+        self.size = len(self.tickers)
+        self._grow(self.size)
+        return np.asarray(ids, dtype=np.int64)
+
+    def add_day(self, date_str: str, bars: pd.DataFrame) -> None:
+        """Fold one session of `BAR_COLUMNS` rows (one row per ticker) into the stats."""
+        bars = bars.drop_duplicates("ticker", keep="last")
+        ids = self._ids(bars["ticker"])
+        dollar = bars["dollar_volume"].to_numpy(dtype=float)
+        moves = bars["move"].to_numpy(dtype=float)
+        close = bars["close"].to_numpy(dtype=float)
+
+        self.obs[ids] += 1
+        self.dollar_sum[ids] += dollar
+
+        has_move = ~np.isnan(moves)
+        move_ids = ids[has_move]
+        x = moves[has_move]
+        n = self.move_n[move_ids] + 1
+        delta = x - self.move_mean[move_ids]
+        mean = self.move_mean[move_ids] + delta / n
+        self.move_m2[move_ids] += delta * (x - mean)
+        self.move_mean[move_ids] = mean
+        self.move_n[move_ids] = n
+
+        day = dt.date.fromisoformat(date_str).toordinal()
+        newer = self.last_day[ids] < day
+        self.last_day[ids[newer]] = day
+        self.last_close[ids[newer]] = close[newer]
+
+
+def collect_bars(
+    args: argparse.Namespace,
+    api_key: str,
+    cache: ResponseCache | None = None,
+) -> TickerStats:
+    stats = TickerStats()
+    sessions = 0
+    candidates = trading_dates(args.days * 2)
+    for date_str, bars in iter_window_results(candidates, args.days, args, api_key, cache):
+        if bars.empty:
             continue
-        annual_vol = vol * sqrt(252)
-        rows.append(
-            {
-                "symbol": ticker,
-                "avg_dollar_volume": avg_dollar,
-                "last_close": price,
-                "daily_move": sum(entry["moves"]) / len(entry["moves"]),
-                "stdev_move": vol,
-                "annualized_vol": annual_vol,
-                "observations": obs,
-                "last_date": entry["last_date"],
-            }
-        )
-    rows.sort(key=lambda r: (r["annualized_vol"], r["avg_dollar_volume"]), reverse=True)
-    return rows[: args.limit]
+        if args.verbose:
+            print(f"Fetched {len(bars)} rows for {date_str}", file=sys.stderr)
+        stats.add_day(date_str, bars)
+        sessions += 1
+        if sessions >= args.days:
+            break
+    return stats
+
+
+def collect_bars_from_store(
+    args: argparse.Namespace,
+    api_key: str,
+    store: DailyBarStore,
+    cache: ResponseCache | None = None,
+) -> TickerStats:
+    """Top up the bar store with missing sessions, then fold the window from it.
+
+    Days before today are marked settled once fetched (even when empty), so a
+    nightly run only downloads the newest session.
+    """
+    today = dt.date.today().isoformat()
+    candidates = trading_dates(args.days * 2)
+    missing = [date_str for date_str in candidates if store.settled_day(date_str) is None]
+    window = set(candidates[: args.days])
+    needed = sum(1 for date_str in missing if date_str in window)
+    fetched = iter_window_results(missing, needed, args, api_key, cache)
+    stats = TickerStats()
+    sessions = 0
+    try:
+        for date_str in candidates:
+            if sessions >= args.days:
+                break
+            row_count = store.settled_day(date_str)
+            if row_count is None:
+                _, bars = next(fetched)
+                row_count = store.save_day(
+                    date_str,
+                    bars[BAR_COLUMNS[1:]].itertuples(index=False, name=None),
+                    settled=date_str < today,
+                )
+                if args.verbose:
+                    print(f"Fetched {row_count} rows for {date_str}", file=sys.stderr)
+            else:
+                bars = pd.DataFrame(store.load_rows([date_str]), columns=BAR_COLUMNS)
+                if args.verbose:
+                    print(f"Loaded {row_count} stored rows for {date_str}", file=sys.stderr)
+            if row_count:
+                stats.add_day(date_str, bars)
+                sessions += 1
+    finally:
+        fetched.close()
+    return stats
+
+
+def summarise_bars(stats: TickerStats, args: argparse.Namespace) -> list[dict[str, object]]:
+    """Apply the ADV/price/observation filters as boolean masks over `stats`."""
+    size = stats.size
+    if size == 0:
+        return []
+    obs = stats.obs[:size]
+    avg_dollar = stats.dollar_sum[:size] / np.maximum(obs, 1)
+    move_count = stats.move_n[:size]
+    daily_move = stats.move_mean[:size]
+    stdev_move = np.where(
+        move_count > 1,
+        np.sqrt(stats.move_m2[:size] / np.maximum(move_count - 1, 1)),
+        0.0,
+    )
+    annual_vol = stdev_move * sqrt(252)
+    last_close = stats.last_close[:size]
+
+    mask = (
+        (obs >= args.min_days)
+        & (avg_dollar >= args.adv_min)
+        & (avg_dollar <= args.adv_max)
+        & (last_close >= args.price_min)
+        & (last_close <= args.price_max)
+        & (move_count > 0)
+    )
+    selected = np.flatnonzero(mask)
+    order = selected[np.lexsort((avg_dollar[selected], annual_vol[selected]))[::-1]]
+    return [
+        {
+            "symbol": stats.tickers[i],
+            "avg_dollar_volume": float(avg_dollar[i]),
+            "last_close": float(last_close[i]),
+            "daily_move": float(daily_move[i]),
+            "stdev_move": float(stdev_move[i]),
+            "annualized_vol": float(annual_vol[i]),
+            "observations": int(obs[i]),
+            "last_date": dt.date.fromordinal(int(stats.last_day[i])).isoformat(),
+        }
+        for i in order[: args.limit]
+    ]
+
+
+def screen(
+    args: argparse.Namespace,
+    api_key: str,
+    cache: ResponseCache | None = None,
+    store: DailyBarStore | None = None,
+) -> list[dict[str, object]]:
+    if store is not None:
+        stats = collect_bars_from_store(args, api_key, store, cache)
+    else:
+        stats = collect_bars(args, api_key, cache)
+    return summarise_bars(stats, args)
 
 
 def write_output(rows: list[dict[str, object]], output: str | None) -> None:
@@ -162,17 +491,25 @@ def write_output(rows: list[dict[str, object]], output: str | None) -> None:
         print(f"\nWrote {len(rows)} rows to {output_path}")
 
 
-def main() -> int:
-    args = parse_args()
+def main(argv: Iterable[str] | None = None) -> int:
+    args = parse_args(argv)
+    HTTP.timeout = args.timeout
     api_key = os.environ.get("POLYGON_API_KEY")
     if not api_key:
         print("POLYGON_API_KEY env var is required", file=sys.stderr)
         return 1
+    if args.concurrency < 1:
+        print("--concurrency must be at least 1", file=sys.stderr)
+        return 1
+    store = DailyBarStore(args.store) if args.store else None
     try:
-        rows = screen(args, api_key)
+        rows = screen(args, api_key, cache_from_args(args), store)
     except RuntimeError as exc:
         print(str(exc), file=sys.stderr)
         return 2
+    finally:
+        if store is not None:
+            store.close()
     write_output(rows, args.output)
     return 0
 
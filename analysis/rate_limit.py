@@ -0,0 +1,56 @@
+"""Thread-safe token-bucket rate limiter shared by the analysis probes.
+
+Provider quotas are expressed as requests per second. Every worker that talks
+to the same provider should draw from the same bucket (see `get_limiter`) so
+the aggregate request rate stays under quota regardless of how many threads
+are in flight.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens/second refill, up to `burst` stored."""
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until `tokens` are available, then consume them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait_for = (tokens - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+
+_LIMITERS: dict[str, TokenBucket] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_limiter(name: str, rate: float, burst: float | None = None) -> TokenBucket:
+    """Return the process-wide limiter for `name`, creating it on first use."""
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(name)
+        if limiter is None:
+            limiter = TokenBucket(rate, burst)
+            _LIMITERS[name] = limiter
+        return limiter
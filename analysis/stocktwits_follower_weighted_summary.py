@@ -2,99 +2,176 @@
 """Compute follower-weighted StockTwits sentiment aggregates using the calibration export.
 
 Reads `analysis/stocktwits_reddit_calibration.csv` (generated by
-`analysis/stocktwits_reddit_calibration.sql`) and prints:
+`analysis/stocktwits_reddit_calibration.sql`, or the CSV given as the first
+argument) and prints:
   • Number of ticker-days examined
   • Correlation between Reddit average score and StockTwits simple average
   • Correlation between Reddit average score and follower-weighted average
   • Average follower coverage and message counts
+  • Pearson and Spearman for both series with bootstrap confidence intervals
+    (and, with --by-symbol, the same per symbol)
+Ticker-day aggregation (and label normalisation) is shared with
+`stocktwits_reddit_calibration_summary.py` via `ticker_days.py`.
 The script is a quick prototype for comparing follower-weighted scores to
 our Reddit baseline; it can be extended to emit CSV/JSON if desired.
 """
 
+from __future__ import annotations
+
+import argparse
+import sys
 from pathlib import Path
-import csv
-import math
-from collections import defaultdict
-
-CAL_PATH = Path(__file__).with_name("stocktwits_reddit_calibration.csv")
-if not CAL_PATH.exists():
-    raise SystemExit(f"Calibration export not found: {CAL_PATH}")
-
-agg = defaultdict(lambda: {
-    "follower_sum": 0,
-    "weighted_sum": 0,
-    "simple_sum": 0,
-    "count": 0,
-    "reddit": None,
-})
-
-with CAL_PATH.open() as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        key = (row["day"], row["symbol"])
-        followers = int(row["st_followers"]) if row.get("st_followers") else 0
-        label = (row.get("st_label") or "").upper()
-        if label == "BULLISH":
-            st_val = 1
-        elif label == "BEARISH":
-            st_val = -1
-        else:
-            st_val = 0
-        reddit = row.get("reddit_avg_score")
-        reddit_val = float(reddit) if reddit not in (None, "") else None
-
-        bucket = agg[key]
-        bucket["follower_sum"] += followers
-        bucket["weighted_sum"] += st_val * followers
-        bucket["simple_sum"] += st_val
-        bucket["count"] += 1
-        if bucket["reddit"] is None and reddit_val is not None:
-            bucket["reddit"] = reddit_val
-
-records = []
-for (day, symbol), data in agg.items():
-    if data["count"] == 0:
-        continue
-    follower_sum = data["follower_sum"]
-    weighted_avg = (data["weighted_sum"] / follower_sum) if follower_sum > 0 else None
-    records.append({
-        "day": day,
-        "symbol": symbol,
-        "messages": data["count"],
-        "simple_avg": data["simple_sum"] / data["count"],
-        "weighted_avg": weighted_avg,
-        "follower_sum": follower_sum,
-        "reddit_avg": data["reddit"],
-    })
-
-def corr(pairs):
-    if len(pairs) < 2:
-        return None
-    xs = [x for x, _ in pairs]
-    ys = [y for _, y in pairs]
-    mean_x = sum(xs) / len(xs)
-    mean_y = sum(ys) / len(ys)
-    num = sum((x - mean_x) * (y - mean_y) for x, y in pairs)
-    den_x = math.sqrt(sum((x - mean_x) ** 2 for x in xs))
-    den_y = math.sqrt(sum((y - mean_y) ** 2 for y in ys))
-    if den_x == 0 or den_y == 0:
-        return None
-    return num / (den_x * den_y)
-
-simple_pairs = [
-    (r["reddit_avg"], r["simple_avg"])
-    for r in records
-    if r["reddit_avg"] is not None
-]
-weighted_pairs = [
-    (r["reddit_avg"], r["weighted_avg"])
-    for r in records
-    if r["reddit_avg"] is not None and r["weighted_avg"] is not None
-]
-
-print(f"ticker_days: {len(records)}")
-print(f"simple_vs_reddit_corr: {corr(simple_pairs):.6f}")
-print(f"weighted_vs_reddit_corr: {corr(weighted_pairs):.6f}")
-print(f"avg_follower_sum: {sum(r['follower_sum'] for r in records) / len(records):.2f}")
-print(f"avg_messages_per_day: {sum(r['messages'] for r in records) / len(records):.2f}")
-print(f"records_with_weighted: {len(weighted_pairs)}")
+from typing import Sequence
+
+if __package__:
+    from .correlation import (
+        DEFAULT_CONFIDENCE,
+        DEFAULT_RESAMPLES,
+        bootstrap_ci,
+        grouped_correlation,
+        pearson,
+        spearman,
+    )
+    from .lazy_import import lazy_import
+    from .ticker_days import CALIBRATION_PATH, load_ticker_days
+else:  # run as a script: `python analysis/stocktwits_follower_weighted_summary.py`
+    from correlation import (
+        DEFAULT_CONFIDENCE,
+        DEFAULT_RESAMPLES,
+        bootstrap_ci,
+        grouped_correlation,
+        pearson,
+        spearman,
+    )
+    from lazy_import import lazy_import
+    from ticker_days import CALIBRATION_PATH, load_ticker_days
+
+np = lazy_import("numpy", "python3 -m pip install --user numpy pandas")
+
+
+SERIES = ("simple", "weighted")
+
+
+def fmt(value: float, spec: str = ".6f") -> str:
+    return "n/a" if np.isnan(value) else format(value, spec)
+
+
+def fmt_ci(interval: tuple[float, float]) -> str:
+    low, high = interval
+    return "n/a" if np.isnan(low) else f"[{low:.3f}, {high:.3f}]"
+
+
+def correlation_table(sentiment: np.ndarray, reddit: np.ndarray, args: argparse.Namespace) -> str:
+    """n, Pearson and Spearman (with bootstrap CIs) of each sentiment row vs Reddit."""
+    pct = f"{args.confidence:.0%}"
+    pearson_r = pearson(sentiment, reddit)
+    spearman_r = spearman(sentiment, reddit)
+    ci = f"{pct} CI"
+    lines = [f"{'series':<9} {'n':>6} {'pearson':>9} {ci:>16} {'spearman':>9} {ci:>16}"]
+    for name, values, r, rho in zip(SERIES, sentiment, pearson_r, spearman_r):
+        cis = [
+            fmt_ci(
+                bootstrap_ci(
+                    values,
+                    reddit,
+                    method,
+                    resamples=args.bootstrap,
+                    confidence=args.confidence,
+                    seed=args.seed,
+                )
+            )
+            for method in ("pearson", "spearman")
+        ]
+        n = int((~np.isnan(values) & ~np.isnan(reddit)).sum())
+        lines.append(
+            f"{name:<9} {n:>6} {fmt(r, '.3f'):>9} {cis[0]:>16} {fmt(rho, '.3f'):>9} {cis[1]:>16}"
+        )
+    return "\n".join(lines)
+
+
+def symbol_table(days, sentiment: np.ndarray, reddit: np.ndarray, min_days: int) -> str:
+    """Per-symbol Pearson/Spearman for both series, most-covered symbols first."""
+    tables = [
+        grouped_correlation(days["symbol"], values, reddit, min_count=min_days)
+        .add_prefix(f"{name}_")
+        for name, values in zip(SERIES, sentiment)
+    ]
+    table = tables[0].join(tables[1], how="left")
+    if table.empty:
+        return f"No symbol has {min_days}+ ticker-days with Reddit coverage."
+    table = table.sort_values("simple_n", ascending=False, kind="stable")
+    table["weighted_n"] = table["weighted_n"].fillna(0).astype(int)
+    return table.to_string(float_format=lambda v: f"{v:.3f}", na_rep="n/a")
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "input",
+        nargs="?",
+        type=Path,
+        default=CALIBRATION_PATH,
+        help="Calibration export CSV (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=DEFAULT_RESAMPLES,
+        help="Bootstrap resamples for the confidence intervals; 0 disables (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=DEFAULT_CONFIDENCE,
+        help="Confidence level of the bootstrap intervals (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Bootstrap RNG seed (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--by-symbol",
+        action="store_true",
+        help="Also print per-symbol correlations (grouped, one pass per series)",
+    )
+    parser.add_argument(
+        "--min-days",
+        type=int,
+        default=5,
+        help="Minimum ticker-days with Reddit coverage for --by-symbol rows (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    if args.bootstrap < 0:
+        parser.error("--bootstrap must be >= 0")
+    if not 0 < args.confidence < 1:
+        parser.error("--confidence must be between 0 and 1")
+    if args.min_days < 2:
+        parser.error("--min-days must be at least 2")
+    if not args.input.exists():
+        raise SystemExit(f"Calibration export not found: {args.input}")
+
+    days = load_ticker_days(args.input)
+    simple_avg = days["sentiment_sum"] / days["messages"]
+    weighted_avg = (days["weighted_sum"] / days["follower_sum"]).where(days["follower_sum"] > 0)
+    # Both series in one array; NaN (no Reddit score / no followers) drops the pair.
+    sentiment = np.stack([simple_avg.to_numpy(np.float64), weighted_avg.to_numpy(np.float64)])
+    reddit = days["reddit_avg"].to_numpy(np.float64)
+    simple_r, weighted_r = pearson(sentiment, reddit)
+    records_with_weighted = int((~np.isnan(sentiment[1]) & ~np.isnan(reddit)).sum())
+
+    print(f"ticker_days: {len(days)}")
+    print(f"simple_vs_reddit_corr: {fmt(simple_r)}")
+    print(f"weighted_vs_reddit_corr: {fmt(weighted_r)}")
+    if len(days):
+        print(f"avg_follower_sum: {days['follower_sum'].mean():.2f}")
+        print(f"avg_messages_per_day: {days['messages'].mean():.2f}")
+    print(f"records_with_weighted: {records_with_weighted}")
+    print()
+    print(correlation_table(sentiment, reddit, args))
+    if args.by_symbol:
+        print()
+        print(symbol_table(days, sentiment, reddit, args.min_days))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,134 +1,71 @@
 #!/usr/bin/env python3
-"""Summarise StockTwits vs Reddit calibration sample exported via stocktwits_reddit_calibration.sql."""
+"""Summarise StockTwits vs Reddit calibration sample exported via stocktwits_reddit_calibration.sql.
+
+Messages are reduced to ticker-days by `ticker_days.load_ticker_days`.
+"""
 from __future__ import annotations
 
-import csv
-import math
+import argparse
 import sys
-from collections import defaultdict
 from pathlib import Path
-
-DEFAULT_PATH = Path("analysis/stocktwits_reddit_calibration.csv")
-
-
-def parse_int(value: str | None) -> int:
-    return int(value) if value not in (None, "") else 0
-
-
-def parse_float(value: str | None) -> float:
-    if value in (None, ""):
-        return 0.0
-    return float(value)
-
-
-def corr(xs: list[float], ys: list[float]) -> float | None:
-    if len(xs) != len(ys) or len(xs) < 2:
-        return None
-    mean_x = sum(xs) / len(xs)
-    mean_y = sum(ys) / len(ys)
-    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
-    var_x = sum((x - mean_x) ** 2 for x in xs)
-    var_y = sum((y - mean_y) ** 2 for y in ys)
-    if var_x <= 0 or var_y <= 0:
-        return None
-    return cov / math.sqrt(var_x * var_y)
-
-
-def main(path: Path) -> None:
+from typing import Sequence
+
+if __package__:
+    from .correlation import pearson
+    from .lazy_import import lazy_import
+    from .ticker_days import CALIBRATION_PATH, load_ticker_days
+else:  # run as a script: `python analysis/stocktwits_reddit_calibration_summary.py`
+    from correlation import pearson
+    from lazy_import import lazy_import
+    from ticker_days import CALIBRATION_PATH, load_ticker_days
+
+np = lazy_import("numpy", "python3 -m pip install --user numpy pandas")
+
+DEFAULT_PATH = CALIBRATION_PATH
+OVERLAP_BUCKETS = [
+    "Both Bullish",
+    "Both Bearish",
+    "Both Neutral",
+    "ST Bullish / Reddit Non-Pos",
+    "ST Bearish / Reddit Non-Neg",
+]
+
+
+def summarise(path: Path) -> None:
     if not path.exists():
         sys.stderr.write(f"Input CSV not found: {path}\n")
         sys.exit(1)
 
-    per_day = {}
-    message_rows = 0
-
-    with path.open(newline="") as infile:
-        reader = csv.DictReader(infile)
-        for row in reader:
-            message_rows += 1
-            day = row["day"]
-            symbol = row["symbol"].upper()
-            key = (day, symbol)
-            rec = per_day.setdefault(
-                key,
-                {
-                    "st_messages": 0,
-                    "st_bullish": 0,
-                    "st_bearish": 0,
-                    "st_sentiment_sum": 0.0,
-                    "st_weighted_sum": 0.0,
-                    "st_followers": 0,
-                    "reddit_mentions": None,
-                    "reddit_pos": None,
-                    "reddit_neg": None,
-                    "reddit_avg": None,
-                },
-            )
-
-            label = row.get("st_label", "")
-            followers = parse_int(row.get("st_followers"))
-            sentiment_val = 1.0 if label == "Bullish" else -1.0 if label == "Bearish" else 0.0
-
-            rec["st_messages"] += 1
-            rec["st_sentiment_sum"] += sentiment_val
-            rec["st_followers"] += followers
-            rec["st_weighted_sum"] += sentiment_val * followers
-            if label == "Bullish":
-                rec["st_bullish"] += 1
-            elif label == "Bearish":
-                rec["st_bearish"] += 1
-
-            if rec["reddit_mentions"] is None:
-                rec["reddit_mentions"] = parse_int(row.get("reddit_mentions"))
-                rec["reddit_pos"] = parse_int(row.get("reddit_positive"))
-                rec["reddit_neg"] = parse_int(row.get("reddit_negative"))
-                rec["reddit_avg"] = parse_float(row.get("reddit_avg_score"))
-
-    total_ticker_days = len(per_day)
-    overlap_counts = defaultdict(int)
-    st_weighted_vals: list[float] = []
-    st_simple_vals: list[float] = []
-    reddit_vals: list[float] = []
-
-    for rec in per_day.values():
-        st_net = rec["st_bullish"] - rec["st_bearish"]
-        reddit_pos = rec["reddit_pos"] or 0
-        reddit_neg = rec["reddit_neg"] or 0
-        reddit_net = reddit_pos - reddit_neg
-
-        if st_net > 0 and reddit_net > 0:
-            bucket = "Both Bullish"
-        elif st_net < 0 and reddit_net < 0:
-            bucket = "Both Bearish"
-        elif st_net == 0 and reddit_net == 0:
-            bucket = "Both Neutral"
-        elif st_net > 0 and reddit_net <= 0:
-            bucket = "ST Bullish / Reddit Non-Pos"
-        elif st_net < 0 and reddit_net >= 0:
-            bucket = "ST Bearish / Reddit Non-Neg"
-        else:
-            bucket = "Mixed"
-        overlap_counts[bucket] += 1
-
-        if rec["st_messages"] > 0:
-            st_simple_avg = rec["st_sentiment_sum"] / rec["st_messages"]
-        else:
-            st_simple_avg = 0.0
-
-        if rec["st_followers"] > 0:
-            st_weighted_avg = rec["st_weighted_sum"] / rec["st_followers"]
-        elif rec["st_messages"] > 0:
-            st_weighted_avg = st_simple_avg
-        else:
-            st_weighted_avg = 0.0
-
-        if rec["reddit_avg"] is not None:
-            st_weighted_vals.append(st_weighted_avg)
-            st_simple_vals.append(st_simple_avg)
-            reddit_vals.append(rec["reddit_avg"])
-
-    weighted_corr = corr(st_weighted_vals, reddit_vals)
-    simple_corr = corr(st_simple_vals, reddit_vals)
+    days = load_ticker_days(path)
+    message_rows = int(days["messages"].sum())
+    total_ticker_days = len(days)
+
+    st_net = (days["bullish"] - days["bearish"]).to_numpy()
+    reddit_net = (days["reddit_positive"].fillna(0) - days["reddit_negative"].fillna(0)).to_numpy()
+    buckets = np.select(
+        [
+            (st_net > 0) & (reddit_net > 0),
+            (st_net < 0) & (reddit_net < 0),
+            (st_net == 0) & (reddit_net == 0),
+            st_net > 0,
+            st_net < 0,
+        ],
+        OVERLAP_BUCKETS,
+        default="Mixed",
+    )
+    # Buckets in order of first appearance, so equal counts keep a stable order.
+    labels, first_seen, counts = np.unique(buckets, return_index=True, return_counts=True)
+    overlap_counts = {
+        labels[i]: int(counts[i]) for i in np.argsort(first_seen, kind="stable")
+    }
+
+    st_simple = days["sentiment_sum"] / days["messages"]
+    st_weighted = (days["weighted_sum"] / days["follower_sum"]).where(
+        days["follower_sum"] > 0, st_simple
+    )
+    # Ticker-days without Reddit aggregates count as a 0.0 average score.
+    reddit = days["reddit_avg"].fillna(0.0)
+    weighted_corr, simple_corr = pearson(np.stack([st_weighted, st_simple]), reddit.to_numpy())
 
     print(f"Total StockTwits messages: {message_rows}")
     print(f"Total ticker-days:        {total_ticker_days}")
@@ -139,25 +76,38 @@ def main(path: Path) -> None:
         print(f"  {bucket:<28} {count:5d} ({pct:5.1f}%)")
 
     print()
-    if weighted_corr is not None:
+    if not np.isnan(weighted_corr):
         print(f"Corr(st_weighted, reddit_avg): {weighted_corr:0.3f}")
     else:
         print("Corr(st_weighted, reddit_avg): n/a")
 
-    if simple_corr is not None:
+    if not np.isnan(simple_corr):
         print(f"Corr(st_simple, reddit_avg):   {simple_corr:0.3f}")
     else:
         print("Corr(st_simple, reddit_avg):   n/a")
 
     print()
     print("Follower-weighted averages (sample):")
-    if st_weighted_vals:
-        print(f"  Mean ST weighted: {sum(st_weighted_vals)/len(st_weighted_vals):0.3f}")
-        print(f"  Mean Reddit avg:  {sum(reddit_vals)/len(reddit_vals):0.3f}")
+    if total_ticker_days:
+        print(f"  Mean ST weighted: {st_weighted.mean():0.3f}")
+        print(f"  Mean Reddit avg:  {reddit.mean():0.3f}")
     else:
         print("  No overlap values to summarise")
 
 
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "input",
+        nargs="?",
+        type=Path,
+        default=DEFAULT_PATH,
+        help="Calibration export CSV (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    summarise(args.input)
+    return 0
+
+
 if __name__ == "__main__":
-    csv_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PATH
-    main(csv_path)
+    sys.exit(main())
@@ -1,6 +1,8 @@
 -- stocktwits_reddit_leadlag.sql
 -- Run with: psql "$PGURI" -f analysis/stocktwits_reddit_leadlag.sql
 -- Produces lead/lag stats for StockTwits vs Reddit per ticker-day.
+-- For repeated sweeps (and hourly cross-correlation) export messages once with
+-- stocktwits_reddit_messages.sql and run `python -m analysis leadlag` locally.
 
 \if :{?start_date} \else \set start_date '' \endif
 \if :{?end_date}   \else \set end_date ''   \endif
@@ -0,0 +1,71 @@
+-- stocktwits_reddit_messages.sql
+-- Message-level StockTwits + Reddit export for the local lead/lag engine
+-- (analysis/leadlag.py). The StockTwits JSON is flattened once per export
+-- window; lead/lag sweeps then run against the local cache instead of
+-- re-running jsonb_array_elements on the pooler.
+-- Usage:
+--   psql "$PGURI" \
+--     -v start_date='2025-09-01' \
+--     -v end_date='2025-10-01'   \
+--     -v model_version='gpt-sent-v1' -v min_conf=0.70 \
+--     -f analysis/stocktwits_reddit_messages.sql \
+--     > /tmp/messages_2025-09.csv
+--   python -m analysis leadlag --ingest /tmp/messages_2025-09.csv
+-- Reddit label/score come from one model (model_version, confidence >= min_conf,
+-- as in grid_backtest_inputs.sql); mentions without such a score keep NULLs.
+
+\if :{?start_date} \else \set start_date '' \endif
+\if :{?end_date}   \else \set end_date ''   \endif
+\if :{?model_version} \else \set model_version 'gpt-sent-v1' \endif
+\if :{?min_conf}      \else \set min_conf      0.70          \endif
+
+COPY (
+WITH params AS (
+  SELECT
+    COALESCE(NULLIF(:'start_date','')::date,
+             (now() AT TIME ZONE 'utc')::date - 7) AS start_date,
+    COALESCE(NULLIF(:'end_date','')::date,
+             (now() AT TIME ZONE 'utc')::date + 1) AS end_date_exclusive
+),
+stocktwits AS (
+  -- A message is stored under every snapshot that captured it; keep one per symbol.
+  SELECT DISTINCT ON (msg->>'id', upper(sh.symbol))
+    'stocktwits'::text AS source,
+    msg->>'id' AS message_id,
+    upper(sh.symbol) AS symbol,
+    (msg->>'created_at')::timestamptz AS created_at,
+    CASE
+      WHEN jsonb_typeof(msg->'sentiment') = 'string' THEN msg->>'sentiment'
+      ELSE coalesce(msg->'entities'->'sentiment'->>'basic', msg->'sentiment'->>'basic')
+    END AS label,
+    NULL::numeric AS score
+  FROM params, sentiment_history sh
+  CROSS JOIN LATERAL jsonb_array_elements(sh.metadata->'messages') msg
+  WHERE sh.source = 'stocktwits'
+    AND sh.collected_at >= params.start_date
+    AND sh.collected_at <  params.end_date_exclusive
+  ORDER BY msg->>'id', upper(sh.symbol), sh.collected_at DESC
+),
+reddit AS (
+  -- One row per mention even if the model scored it more than once.
+  SELECT DISTINCT ON (m.mention_id)
+    'reddit'::text AS source,
+    m.mention_id::text AS message_id,
+    upper(m.symbol) AS symbol,
+    m.created_utc AS created_at,
+    s.label,
+    s.score
+  FROM params, reddit_mentions m
+  LEFT JOIN reddit_sentiment s
+    ON s.mention_id = m.mention_id
+   AND s.model_version = :'model_version'
+   AND COALESCE(s.confidence, 0) >= (:'min_conf')::numeric
+  WHERE m.created_utc >= params.start_date
+    AND m.created_utc <  params.end_date_exclusive
+  ORDER BY m.mention_id, s.confidence DESC NULLS LAST
+)
+SELECT * FROM stocktwits
+UNION ALL
+SELECT * FROM reddit
+ORDER BY symbol, created_at
+) TO STDOUT WITH CSV HEADER;
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import math
+import pathlib
+
+from analysis.bar_store import BAR_COLUMNS, DailyBarStore
+
+
+def test_save_day_replaces_rows_and_records_settlement(tmp_path: pathlib.Path) -> None:
+    with DailyBarStore(tmp_path / "nested" / "bars.sqlite") as store:
+        assert store.settled_day("2024-01-02") is None
+        store.save_day("2024-01-02", [("AAA", 1e6, 0.1, 5.0), ("BBB", 2e6, 0.2, 6.0)], True)
+        store.save_day("2024-01-02", [("AAA", 3e6, 0.3, 7.0)], True)
+        assert store.settled_day("2024-01-02") == 1
+        assert store.load_rows(["2024-01-02"]) == [("2024-01-02", "AAA", 3e6, 0.3, 7.0)]
+
+
+def test_unsettled_days_are_fetched_again(tmp_path: pathlib.Path) -> None:
+    with DailyBarStore(tmp_path / "bars.sqlite") as store:
+        store.save_day("2024-01-03", [("AAA", 1e6, 0.1, 5.0)], settled=False)
+        assert store.settled_day("2024-01-03") is None
+        assert len(store.load_rows(["2024-01-03"])) == 1
+
+
+def test_empty_days_are_remembered(tmp_path: pathlib.Path) -> None:
+    with DailyBarStore(tmp_path / "bars.sqlite") as store:
+        assert store.save_day("2024-01-06", [], settled=True) == 0
+        assert store.settled_day("2024-01-06") == 0
+
+
+def test_nan_moves_are_stored_as_null(tmp_path: pathlib.Path) -> None:
+    with DailyBarStore(tmp_path / "bars.sqlite") as store:
+        store.save_day("2024-01-02", [("AAA", 1e6, math.nan, 5.0)], True)
+        (row,) = store.load_rows(["2024-01-02"])
+        assert dict(zip(BAR_COLUMNS, row))["move"] is None
+
+
+def test_rows_persist_across_connections(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "bars.sqlite"
+    with DailyBarStore(path) as store:
+        store.save_day("2024-01-02", [("AAA", 1e6, 0.1, 5.0)], True)
+    with DailyBarStore(path) as store:
+        assert store.settled_day("2024-01-02") == 1
+        assert store.load_rows([]) == []
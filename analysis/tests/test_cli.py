@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+from analysis.cli import SUBCOMMANDS
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+HEAVY = ("numpy", "pandas", "pyarrow", "matplotlib", "seaborn")
+
+# Runs `--help` for one subcommand and prints the heavy modules whose body ran.
+PROBE = """
+import contextlib, io, sys
+from analysis import cli
+with contextlib.redirect_stdout(io.StringIO()), contextlib.suppress(SystemExit):
+    cli.main([sys.argv[1], "--help"])
+loaded = [
+    name for name in {heavy!r}
+    if name in sys.modules and type(sys.modules[name]).__name__ != "_LazyModule"
+]
+print(",".join(loaded))
+"""
+
+
+def run(*args: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, capture_output=True, text=True, timeout=120
+    )
+
+
+@pytest.mark.parametrize("command", sorted(SUBCOMMANDS))
+def test_subcommand_help_skips_heavy_imports(command: str) -> None:
+    result = run("-c", PROBE.format(heavy=HEAVY), command)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+@pytest.mark.parametrize("command", sorted(SUBCOMMANDS))
+def test_scripts_still_run_standalone(command: str) -> None:
+    module, _ = SUBCOMMANDS[command]
+    result = run(f"analysis/{module}.py", "--help")
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.startswith("usage:")
+
+
+def test_top_level_help_lists_subcommands() -> None:
+    result = run("-m", "analysis", "--help")
+    assert result.returncode == 0, result.stderr
+    assert all(command in result.stdout for command in SUBCOMMANDS)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import correlation
+from analysis.correlation import bootstrap_ci, grouped_correlation, pearson, spearman
+
+
+def pandas_corr(x, y, method: str = "pearson") -> float:
+    """DataFrame.corr (pairwise complete; its Spearman needs no scipy)."""
+    return pd.DataFrame({"x": x, "y": y}).corr(method).loc["x", "y"]
+
+
+def sample(n: int = 400, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=n)
+    y = 0.4 * x + rng.normal(size=n)
+    x[rng.random(n) < 0.05] = np.nan
+    y[rng.random(n) < 0.05] = np.nan
+    return x, y
+
+
+@pytest.mark.parametrize("method, func", [("pearson", pearson), ("spearman", spearman)])
+def test_matches_pandas_with_missing_pairs(method: str, func) -> None:
+    x, y = sample()
+    expected = pandas_corr(x, y, method)
+    assert func(x, y) == pytest.approx(expected)
+
+
+def test_stacked_series_correlate_against_one_target() -> None:
+    x, y = sample()
+    stack = np.stack([x, np.round(x, 1), -x])
+    np.testing.assert_allclose(pearson(stack, y), [pandas_corr(row, y) for row in stack])
+    np.testing.assert_allclose(
+        spearman(stack, y), [pandas_corr(row, y, "spearman") for row in stack]
+    )
+
+
+@pytest.mark.parametrize(
+    "x, y",
+    [([], []), ([1.0], [2.0]), ([1.0, 1.0, 1.0], [1.0, 2.0, 3.0]), ([1.0, np.nan], [1.0, 2.0])],
+)
+def test_degenerate_inputs_are_nan(x: list[float], y: list[float]) -> None:
+    assert np.isnan(pearson(x, y))
+    assert np.isnan(spearman(x, y))
+    assert bootstrap_ci(x, y) == (pytest.approx(np.nan, nan_ok=True),) * 2
+
+
+@pytest.mark.parametrize("distinct", [6, 300])
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+def test_weighted_resamples_match_materialised_resamples(distinct: int, method: str) -> None:
+    rng = np.random.default_rng(1)
+    n = 300
+    x = rng.integers(0, distinct, n).astype(float)
+    y = x + rng.integers(0, 3, n)
+    pairs, inverse, counts = np.unique(
+        np.column_stack([x, y]), axis=0, return_inverse=True, return_counts=True
+    )
+    weights = correlation._draw_weights(rng, 20, n, inverse.ravel(), counts)
+    assert (weights.sum(axis=1) == n).all()
+    px, py = pairs[:, 0], pairs[:, 1]
+    if method == "spearman":
+        x_uniques, x_codes = np.unique(px, return_inverse=True)
+        y_uniques, y_codes = np.unique(py, return_inverse=True)
+        px = correlation._weighted_ranks(weights, x_codes, len(x_uniques))
+        py = correlation._weighted_ranks(weights, y_codes, len(y_uniques))
+    scores = correlation._weighted_pearson(weights, px, py)
+    func = spearman if method == "spearman" else pearson
+    for row, score in zip(weights.astype(int), scores):
+        resample = np.repeat(pairs, row, axis=0)
+        assert score == pytest.approx(func(resample[:, 0], resample[:, 1]))
+
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+def test_bootstrap_interval_brackets_the_estimate(method: str) -> None:
+    x, y = sample(2_000)
+    estimate = spearman(x, y) if method == "spearman" else pearson(x, y)
+    low, high = bootstrap_ci(x, y, method=method, resamples=500, seed=3)
+    assert low < estimate < high
+    assert high - low < 0.15
+    assert bootstrap_ci(x, y, method=method, resamples=500, seed=3) == (low, high)
+
+
+def test_bootstrap_blocks_only_bound_memory(monkeypatch: pytest.MonkeyPatch) -> None:
+    x, y = sample(500)
+    whole = bootstrap_ci(x, y, resamples=300, seed=7)
+    monkeypatch.setattr(correlation, "BOOTSTRAP_BLOCK", 500 * 7)
+    assert bootstrap_ci(x, y, resamples=300, seed=7) == pytest.approx(whole)
+
+
+def test_unknown_method() -> None:
+    with pytest.raises(ValueError):
+        bootstrap_ci([1, 2, 3], [1, 2, 3], method="kendall")
+
+
+def test_grouped_correlation_matches_groupby() -> None:
+    x, y = sample(600)
+    rng = np.random.default_rng(2)
+    keys = rng.choice(["GME", "AMC", "BB", "X"], 600, p=[0.5, 0.3, 0.195, 0.005])
+    table = grouped_correlation(keys, x, y, min_count=5)
+    frame = pd.DataFrame({"key": keys, "x": x, "y": y}).dropna()
+    expected = {
+        key: (
+            len(group),
+            pandas_corr(group["x"], group["y"]),
+            pandas_corr(group["x"], group["y"], "spearman"),
+        )
+        for key, group in frame.groupby("key")
+        if len(group) >= 5
+    }
+    assert table.index.tolist() == sorted(expected)
+    for key, (n, r, rho) in expected.items():
+        assert table.loc[key, "n"] == n
+        assert table.loc[key, "pearson"] == pytest.approx(r)
+        assert table.loc[key, "spearman"] == pytest.approx(rho)
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import datetime as dt
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import feature_cube
+from analysis.bar_store import DailyBarStore
+from analysis.feature_cube import FEATURES, FeatureCube, build_cube
+from analysis.tests.test_ticker_days import EDGE_CASES
+from analysis.trading_calendar import sessions_between
+
+START = dt.date(2025, 7, 1)
+END = dt.date(2025, 9, 30)
+SYMBOLS = ["AMC", "BBB", "CCC", "GME", "ZZZ"]
+VOL_WINDOW = 5
+
+
+@pytest.fixture(scope="module")
+def bars() -> pd.DataFrame:
+    """Bars from well before the cube window, with days missing per symbol."""
+    rng = np.random.default_rng(3)
+    days = [str(session.date) for session in sessions_between(dt.date(2025, 5, 1), END)]
+    rows = []
+    for symbol in SYMBOLS:
+        closes = np.exp(np.cumsum(rng.normal(0, 0.04, len(days)))) * rng.uniform(1, 20)
+        for day, close in zip(days, closes):
+            if rng.random() < 0.05:
+                continue
+            rows.append(
+                {
+                    "day": day,
+                    "ticker": symbol.lower() if symbol == "ZZZ" else symbol,
+                    "dollar_volume": float(rng.uniform(1e5, 1e7)),
+                    "move": float(rng.normal(0, 0.05)),
+                    "close": float(close),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture(scope="module")
+def sources(tmp_path_factory: pytest.TempPathFactory, bars: pd.DataFrame) -> dict:
+    root = tmp_path_factory.mktemp("sources")
+    calibration = root / "calibration.csv"
+    calibration.write_text(EDGE_CASES)
+    store = root / "bars.sqlite"
+    with DailyBarStore(store) as db:
+        for day, rows in bars.groupby("day"):
+            db.save_day(
+                day,
+                list(rows[["ticker", "dollar_volume", "move", "close"]].itertuples(False, None)),
+                True,
+            )
+    return {"calibration": calibration, "bar_store": store}
+
+
+@pytest.fixture(scope="module")
+def cube(tmp_path_factory: pytest.TempPathFactory, sources: dict) -> FeatureCube:
+    path = tmp_path_factory.mktemp("cube") / "nested" / "cube.npy"
+    build_cube(path, START, END, vol_window=VOL_WINDOW, **sources)
+    return FeatureCube(path)
+
+
+def reference_market(bars: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Close-to-close returns and rolling volatility over every session, with pandas."""
+    sessions = pd.Index([str(session.date) for session in sessions_between(START, END)])
+    seed = [str(s.date) for s in sessions_between(dt.date(2025, 5, 1), START)][-VOL_WINDOW - 2 :]
+    axis = pd.Index(seed[:-1]).append(sessions)
+    close = (
+        bars.assign(ticker=bars["ticker"].str.upper())
+        .pivot(index="day", columns="ticker", values="close")
+        .reindex(axis)
+        .astype(float)
+    )
+    returns = close.pct_change(fill_method=None)
+    volatility = returns.rolling(VOL_WINDOW, min_periods=VOL_WINDOW).std()
+    return {
+        name: frame.loc[sessions, SYMBOLS].T
+        for name, frame in {"close": close, "return": returns, "volatility": volatility}.items()
+    }
+
+
+def test_axes(cube: FeatureCube) -> None:
+    assert list(cube.symbols) == SYMBOLS
+    assert [day.item() for day in cube.days] == [s.date for s in sessions_between(START, END)]
+    assert cube.features == FEATURES
+    assert cube.values.dtype == np.float32
+    assert cube.meta["vol_window"] == VOL_WINDOW
+
+
+@pytest.mark.parametrize("feature", ["close", "return", "volatility"])
+def test_market_features_match_pandas(
+    cube: FeatureCube, bars: pd.DataFrame, feature: str
+) -> None:
+    expected = reference_market(bars)[feature].to_numpy()
+    result = cube.select(features=[feature])[:, :, 0]
+    np.testing.assert_array_equal(np.isnan(result), np.isnan(expected))
+    np.testing.assert_allclose(result, expected.astype(np.float32), rtol=1e-6, equal_nan=True)
+    # The seed sessions give a full volatility window from the first day on.
+    if feature == "volatility":
+        assert not np.isnan(result[:, 0]).all()
+
+
+def test_holiday_sentiment_rolls_into_the_next_session(cube: FeatureCube) -> None:
+    """Labor Day 2025 (Sep 1) and Sep 2 both land on the Sep 2 session."""
+    table = cube.frame(["GME", "AMC"], dt.date(2025, 8, 29), dt.date(2025, 9, 3))
+    table = table.set_index(["day", "symbol"])
+    gme = table.loc[(dt.date(2025, 9, 2), "GME")]
+    assert gme["st_messages"] == 4
+    assert gme["st_sentiment"] == pytest.approx(-1 / 4)
+    assert gme["st_weighted_sentiment"] == pytest.approx(80 / 170)
+    assert gme["reddit_mentions"] == 7
+    assert gme["reddit_positive"] == 3
+    assert gme["reddit_negative"] == 3
+    assert gme["reddit_avg_score"] == pytest.approx((0.4 * 5 - 0.5 * 2) / 7)
+    amc = table.loc[(dt.date(2025, 9, 2), "AMC")]
+    assert amc["st_messages"] == 2
+    assert amc["st_weighted_sentiment"] == pytest.approx(0.0)
+    quiet = table.drop(index=dt.date(2025, 9, 2), level="day")
+    assert (quiet["st_messages"] == 0).all()
+    assert quiet["st_sentiment"].isna().all()
+    assert list(table.index.get_level_values("day").unique()) == [
+        dt.date(2025, 8, 29),
+        dt.date(2025, 9, 2),
+        dt.date(2025, 9, 3),
+    ]
+
+
+def test_select_returns_views_for_ranges(cube: FeatureCube) -> None:
+    block = cube.select(["BBB", "CCC", "GME"], dt.date(2025, 8, 1), dt.date(2025, 8, 31))
+    august = sessions_between(dt.date(2025, 8, 1), dt.date(2025, 8, 31))
+    assert block.shape == (3, len(august), len(FEATURES))
+    assert np.shares_memory(block, cube.values)
+    gathered = cube.select(["GME", "AMC"], features=["return", "close"])
+    assert not np.shares_memory(gathered, cube.values)
+    rows = [SYMBOLS.index("GME"), SYMBOLS.index("AMC")]
+    columns = [FEATURES.index("return"), FEATURES.index("close")]
+    np.testing.assert_array_equal(gathered, cube.values[rows][:, :, columns])
+
+
+def test_unknown_symbols_and_features(cube: FeatureCube) -> None:
+    with pytest.raises(KeyError, match="XYZ"):
+        cube.select(["gme", "XYZ"])
+    with pytest.raises(KeyError, match="nope"):
+        cube.select(features=["close", "nope"])
+    assert cube.select([" gme "]).shape[0] == 1
+
+
+def test_sources_not_given_stay_nan(tmp_path: pathlib.Path, sources: dict) -> None:
+    path = tmp_path / "cube.npy"
+    build_cube(path, START, END, calibration=sources["calibration"])
+    cube = FeatureCube(path)
+    assert list(cube.symbols) == ["AMC", "GME"]
+    assert np.isnan(cube.select(features=feature_cube.MARKET_FEATURES)).all()
+
+
+def test_rebuild_keeps_open_maps_valid(tmp_path: pathlib.Path, sources: dict) -> None:
+    path = tmp_path / "cube.npy"
+    build_cube(path, START, END, calibration=sources["calibration"])
+    old = FeatureCube(path)
+    before = np.array(old.values)
+    build_cube(path, START, END, **sources)
+    np.testing.assert_array_equal(old.values, before)
+    assert FeatureCube(path).values.shape[0] == len(SYMBOLS)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["cube.json", "cube.npy"]
+
+
+def test_missing_cube(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(SystemExit, match="--build"):
+        FeatureCube(tmp_path / "cube.npy")
+
+
+def test_default_path_is_under_the_user_cache() -> None:
+    assert feature_cube.CUBE_PATH.parent.name == "moonshot-analysis"
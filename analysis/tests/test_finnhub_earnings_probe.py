@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import datetime as dt
+import pathlib
+import threading
+
+import pytest
+
+from analysis import finnhub_earnings_probe as probe
+from analysis.http_client import HttpError
+from analysis.rate_limit import TokenBucket
+
+WORKING = ("v1", probe.API_PATTERNS[1])
+START, END = dt.date(2024, 1, 1), dt.date(2024, 3, 31)
+
+
+@pytest.fixture
+def polygon(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Only the v1 path-style endpoint exists, and it does not know ZZZZ."""
+    calls: list[str] = []
+    lock = threading.Lock()
+
+    def fake_get(url, limiter=None, cache=None, settled_through=None):
+        with lock:
+            calls.append(url)
+        path = url.split("?")[0]
+        if not path.startswith("https://api.polygon.io/v1/reference/earnings/"):
+            raise HttpError(404, url)
+        ticker = path.rsplit("/", 1)[1]
+        if ticker == "ZZZZ":
+            raise HttpError(404, url)
+        return {"results": [{"ticker": ticker, "reportDate": "2024-02-01"}]}
+
+    monkeypatch.setattr(probe, "http_get", fake_get)
+    return calls
+
+
+def test_endpoint_is_resolved_once_before_fanning_out(polygon: list[str]) -> None:
+    tickers = [f"T{index}" for index in range(20)]
+    memo = probe.EndpointMemo()
+    results = probe.fetch_all_concurrent(
+        probe.PROVIDER_POLYGON, tickers, START, END, "key", 8, TokenBucket(1000), None, memo
+    )
+    assert all(results[ticker][0]["ticker"] == ticker for ticker in tickers)
+    candidates = len(probe.API_VERSIONS) * len(probe.API_PATTERNS)
+    assert len(polygon) == candidates + len(tickers) - 1
+    assert memo.working == WORKING
+
+
+def test_unknown_ticker_keeps_the_working_endpoint(polygon: list[str]) -> None:
+    memo = probe.EndpointMemo()
+    probe.fetch_polygon_earnings("AAA", START, END, "key", 0.0, endpoints=memo)
+    with pytest.raises(HttpError):
+        probe.fetch_polygon_earnings("ZZZZ", START, END, "key", 0.0, endpoints=memo)
+    assert memo.working == WORKING
+    polygon.clear()
+    probe.fetch_polygon_earnings("BBB", START, END, "key", 0.0, endpoints=memo)
+    assert len(polygon) == 1
+
+
+def test_memo_is_persisted_and_expires(
+    tmp_path: pathlib.Path, polygon: list[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / probe.ENDPOINT_MEMO_FILENAME
+    probe.fetch_polygon_earnings("AAA", START, END, "key", 0.0, endpoints=probe.EndpointMemo(path))
+    reloaded = probe.EndpointMemo(path)
+    assert reloaded.working == WORKING
+    assert reloaded.candidates() == [WORKING]
+    now = probe.time.time()
+    monkeypatch.setattr(probe.time, "time", lambda: now + probe.ENDPOINT_MEMO_TTL_SECONDS + 1)
+    assert probe.EndpointMemo(path).working is None
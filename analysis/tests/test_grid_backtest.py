@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import grid_backtest
+from analysis.grid_backtest import GridInputs, GridParams, evaluate_grid, hold_days
+
+PARAMS = GridParams(
+    min_mentions_list=(1, 3, 6),
+    pos_thresh_list=(0.1, 0.2, 0.35),
+    start=dt.date(2025, 6, 5),
+    end=dt.date(2025, 9, 20),
+    min_trades=2,
+    min_volume_z=-1.5,
+    rsi_short_min=20,
+)
+KEYS = ["symbol", "horizon", "side", "min_mentions", "pos_thresh"]
+
+
+def make_frames(symbols: int = 15, seed: int = 7) -> tuple[pd.DataFrame, ...]:
+    """Exported-inputs-shaped frames with gaps, NaN/zero closes and mixed-case symbols."""
+    rng = np.random.default_rng(seed)
+    sessions = pd.bdate_range("2025-05-20", "2025-10-10")
+    calendar = pd.date_range("2025-06-01", "2025-09-30")
+    daily, prices, universe = [], [], []
+    for index in range(symbols):
+        symbol = f"T{index:03d}"
+        closes = np.exp(np.cumsum(rng.normal(0, 0.03, len(sessions)))) * rng.uniform(1, 50)
+        traded = rng.random(len(sessions)) > 0.03
+        close = closes[traded]
+        close[rng.random(len(close)) < 0.01] = np.nan
+        close[rng.random(len(close)) < 0.005] = 0
+        prices.append(
+            pd.DataFrame(
+                {
+                    "symbol": symbol if index % 7 else symbol.lower(),
+                    "d": sessions[traded].strftime("%Y-%m-%d"),
+                    "close": close,
+                }
+            )
+        )
+        picked = calendar[rng.random(len(calendar)) < 0.4]
+        n = len(picked)
+        daily.append(
+            pd.DataFrame(
+                {
+                    "symbol": symbol,
+                    "d": picked.strftime("%Y-%m-%d"),
+                    "mentions": rng.integers(1, 12, n),
+                    "avg_raw": np.round(rng.normal(0, 0.3, n), 2),
+                    "avg_abs": rng.uniform(0, 0.6, n),
+                    "pos_rate": rng.uniform(0, 1, n),
+                    "neg_rate": rng.uniform(0, 1, n),
+                    "is_hvv": rng.choice(["t", "f"], n, p=[0.8, 0.2]),
+                    "volume_zscore_20": np.where(rng.random(n) < 0.1, np.nan, rng.normal(0, 1, n)),
+                    "volume_ratio_avg_20": rng.uniform(0, 3, n),
+                    "volume_share_20": rng.uniform(0, 1, n),
+                    "rsi_14": rng.uniform(10, 90, n),
+                }
+            )
+        )
+        if index % 5:
+            universe.append(
+                {
+                    "symbol": symbol,
+                    **dict.fromkeys(grid_backtest.UNIVERSE_FEATURES, 1.0),
+                    "avg_daily_dollar_volume_30d": rng.uniform(1e5, 1e8),
+                    "hard_to_borrow_flag": rng.choice(["t", "f", None]),
+                }
+            )
+    return pd.concat(daily), pd.concat(prices), pd.DataFrame(universe)
+
+
+def reference_grid(daily: pd.DataFrame, prices: pd.DataFrame, params: GridParams) -> pd.DataFrame:
+    """Trade-by-trade evaluation with the SQL's semantics, one pocket at a time."""
+    prices = prices.assign(symbol=prices["symbol"].str.upper()).sort_values(["symbol", "d"])
+    by_symbol = {symbol: rows.reset_index(drop=True) for symbol, rows in prices.groupby("symbol")}
+    days = daily[
+        (daily["avg_abs"].fillna(0) >= params.avg_abs_min)
+        & (daily["is_hvv"] == "t")
+        & (daily["d"] >= str(params.start))
+        & (daily["d"] < str(params.end))
+        & (daily["volume_zscore_20"] >= params.min_volume_z)
+    ]
+    trades = []
+    for horizon in params.horizons:
+        hold = hold_days(horizon)
+        for side, direction in grid_backtest.SIDE_DIRECTIONS.items():
+            for min_mentions in params.min_mentions_list:
+                mentions = days["mentions"] >= max(params.min_mentions_req, min_mentions)
+                for pos_thresh in params.pos_thresh_list:
+                    if side == "LONG":
+                        gate = (days["pos_rate"] >= params.pos_rate_min) & (
+                            days["avg_raw"] >= pos_thresh
+                        )
+                    else:
+                        gate = (
+                            (days["neg_rate"] >= params.pos_rate_min)
+                            & (days["avg_raw"] <= -pos_thresh)
+                            & (days["rsi_14"] >= params.rsi_short_min)
+                        )
+                    for row in days[mentions & gate].itertuples():
+                        closes = by_symbol[row.symbol]
+                        exit_close = closes["close"].shift(-hold)
+                        entries = closes[(closes["d"] >= row.d) & exit_close.notna()]
+                        if not len(entries):
+                            continue
+                        entry = entries.index[0]
+                        entry_close = closes.loc[entry, "close"]
+                        if np.isnan(entry_close) or entry_close == 0:
+                            continue
+                        ret = direction * (exit_close[entry] / entry_close - 1)
+                        trades.append((row.symbol, horizon, side, min_mentions, pos_thresh, ret))
+    frame = pd.DataFrame(trades, columns=[*KEYS, "ret"])
+    grid = (
+        frame.groupby(KEYS)["ret"]
+        .agg(
+            trades="size",
+            avg_ret="mean",
+            median_ret="median",
+            win_rate=lambda ret: (ret > 0).mean(),
+            stdev_ret=lambda ret: ret.std(ddof=0),
+        )
+        .reset_index()
+    )
+    grid = grid[grid["trades"] >= params.min_trades]
+    grid["sharpe"] = np.where(grid["stdev_ret"] > 0, grid["avg_ret"] / grid["stdev_ret"], np.nan)
+    return grid.sort_values(KEYS, ignore_index=True)
+
+
+@pytest.fixture(scope="module")
+def frames() -> tuple[pd.DataFrame, ...]:
+    return make_frames()
+
+
+@pytest.fixture(scope="module")
+def grid(frames: tuple[pd.DataFrame, ...]) -> pd.DataFrame:
+    return evaluate_grid(GridInputs.from_frames(*frames), PARAMS)
+
+
+def test_matches_trade_by_trade_reference(frames, grid: pd.DataFrame) -> None:
+    daily, prices, _ = frames
+    expected = reference_grid(daily, prices, PARAMS)
+    assert len(expected) > 100
+    result = grid[expected.columns]
+    pd.testing.assert_frame_equal(
+        result.reset_index(drop=True), expected, check_dtype=False, rtol=1e-9
+    )
+
+
+def test_block_size_does_not_change_results(
+    frames, grid: pd.DataFrame, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(grid_backtest, "BLOCK_CELLS", 50)
+    pd.testing.assert_frame_equal(evaluate_grid(GridInputs.from_frames(*frames), PARAMS), grid)
+
+
+def test_export_columns(grid: pd.DataFrame) -> None:
+    assert list(grid.columns) == grid_backtest.RESULT_COLUMNS
+    assert set(grid["band"]) <= {"STRONG", "MODERATE", "WEAK", "VERY_WEAK"}
+    assert grid.loc[grid["pos_thresh"] == 0.35, "band"].eq("STRONG").all()
+    # Symbols missing from the universe export keep NaN features.
+    missing = grid["symbol"].isin(["T000", "T005", "T010"])
+    assert grid.loc[missing, "avg_daily_dollar_volume_30d"].isna().all()
+    assert grid.loc[~missing, "avg_daily_dollar_volume_30d"].notna().all()
+    assert grid["symbol"].str.isupper().all()
+
+
+def test_window_defaults_to_the_exported_days(frames) -> None:
+    inputs = GridInputs.from_frames(*frames)
+    params = inputs.window(GridParams())
+    assert params.start == dt.date(2025, 6, 1)
+    assert params.end > dt.date(2025, 9, 29)
+
+
+@pytest.mark.parametrize("horizon", ["0d", "1w", "d"])
+def test_unsupported_horizons(horizon: str) -> None:
+    with pytest.raises(ValueError):
+        hold_days(horizon)
+
+
+def test_empty_inputs() -> None:
+    daily, prices, _ = make_frames(symbols=2)
+    grid = evaluate_grid(GridInputs.from_frames(daily.iloc[:0], prices), PARAMS)
+    assert grid.empty
+    assert list(grid.columns) == grid_backtest.RESULT_COLUMNS
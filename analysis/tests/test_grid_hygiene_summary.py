@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import grid_hygiene_summary as ghs
+
+SYMBOLS = ["AAA", "BBB", "CCC", "GME", "AMC", "TSLA"]
+
+
+def make_grid(rows: int = 300, seed: int = 0, blanks_from: int = 50) -> pd.DataFrame:
+    """Synthetic grid export; integer and metric cells go blank after `blanks_from`."""
+    rng = np.random.default_rng(seed)
+    grid = pd.DataFrame(
+        {
+            "model_version": "gpt",
+            "symbol": rng.choice(SYMBOLS, rows),
+            "horizon": rng.choice(["1d", "3d", "5d"], rows),
+            "side": rng.choice(["LONG", "SHORT"], rows),
+            "min_mentions": rng.integers(2, 7, rows).astype(float),
+            "pos_thresh": rng.choice([0.05, 0.1, 0.15], rows),
+            "band": rng.choice(["WEAK", "STRONG", None], rows),
+            "sharpe": rng.normal(0, 1.5, rows).round(6),
+            "trades": rng.integers(1, 200, rows).astype(float),
+            "avg_daily_dollar_volume_30d": rng.uniform(1e6, 5e10, rows).round(2),
+            "avg_sentiment_health_score": rng.uniform(0, 1, rows).round(4),
+            "avg_beta_vs_spy": rng.uniform(0, 2, rows).round(4),
+        }
+    )
+    late = np.arange(rows) >= blanks_from
+    for col in ("min_mentions", "trades", "sharpe"):
+        grid.loc[late & (rng.random(rows) < 0.1), col] = np.nan
+    return grid
+
+
+def write_csv(grid: pd.DataFrame, path: pathlib.Path) -> pathlib.Path:
+    grid.to_csv(path, index=False, na_rep="")
+    return path
+
+
+@pytest.fixture
+def promoted(tmp_path: pathlib.Path) -> pd.DataFrame:
+    path = tmp_path / "promoted.csv"
+    pd.DataFrame(
+        {
+            "symbol": ["aaa ", "GME", "TSLA", "ZZZ"],
+            "horizon": ["1d", "3d", "5d", "1d"],
+            "side": ["long", "SHORT", "LONG", "LONG"],
+            "min_mentions": [2, 3, 4, 2],
+            "pos_thresh": [0.05, 0.1, 0.15, 0.05],
+            "is_enabled": ["true", "t", "false", "1"],
+        }
+    ).to_csv(path, index=False)
+    return ghs.load_promoted(path)
+
+
+def test_blank_integer_cells_load_as_nullable(tmp_path: pathlib.Path) -> None:
+    path = write_csv(make_grid(), tmp_path / "grid.csv")
+    grid = ghs.load_grid(path)
+    assert str(grid["min_mentions"].dtype) == "Int16"
+    assert str(grid["trades"].dtype) == "Int32"
+    assert grid["trades"].isna().any() and grid["min_mentions"].isna().any()
+    # The Parquet sidecar round-trips the same frame.
+    assert ghs.parquet_cache_path(path).exists()
+    pd.testing.assert_frame_equal(ghs.load_grid(path), grid)
+
+
+def test_streamed_sidecar_accepts_blanks_after_the_first_chunk(tmp_path: pathlib.Path) -> None:
+    path = write_csv(make_grid(blanks_from=50), tmp_path / "grid.csv")
+    streamed = pd.concat(ghs.iter_grid_chunks(path, chunksize=40))
+    assert ghs.parquet_cache_path(path).exists()
+    from_sidecar = pd.concat(ghs.iter_grid_chunks(path, chunksize=40))
+    expected = ghs.load_grid(path, parquet_cache=False)
+    pd.testing.assert_frame_equal(streamed, expected)
+    pd.testing.assert_frame_equal(from_sidecar, expected)
+
+
+def test_tag_promoted_matches_key_lookup(promoted: pd.DataFrame) -> None:
+    grid = make_grid(blanks_from=10**6)
+    grid.loc[:4, ["symbol", "horizon", "side", "min_mentions", "pos_thresh"]] = [
+        ["AAA", "1d", "LONG", 2, 0.05],
+        ["GME", "3d", "SHORT", 3, 0.1],
+        ["TSLA", "5d", "LONG", 4, 0.15],
+        ["AAA", "1d", "LONG", 2, 0.1],
+        ["GME", "3d", "LONG", 3, 0.1],
+    ]
+    grid = grid[ghs.GRID_COLUMNS].astype(ghs.GRID_DTYPES)
+    keys = set(promoted.itertuples(index=False, name=None))
+    expected = [
+        key in keys for key in grid[ghs.GRID_KEY_COLUMNS].itertuples(index=False, name=None)
+    ]
+    flags = ghs.tag_promoted(grid, promoted)
+    assert flags.tolist() == expected
+    assert flags[:5].tolist() == [True, True, False, False, False]
+
+
+@pytest.mark.parametrize("chunksize", [7, 37, 10_000])
+def test_chunked_summary_matches_in_memory(
+    tmp_path: pathlib.Path, promoted: pd.DataFrame, chunksize: int
+) -> None:
+    path = write_csv(make_grid(), tmp_path / "grid.csv")
+    summaries, tables = ghs.analyse_grid(ghs.load_grid(path), promoted)
+    chunk_summaries, chunk_tables = ghs.analyse_grid_chunks(
+        ghs.iter_grid_chunks(path, chunksize, parquet_cache=False), promoted
+    )
+    assert chunk_summaries == summaries
+    for title, table in chunk_tables.items():
+        # Top rows from several chunks no longer share one categorical dtype.
+        pd.testing.assert_frame_equal(table.astype(object), tables[title].astype(object))
+
+
+def test_summary_tables_match_pandas(tmp_path: pathlib.Path, promoted: pd.DataFrame) -> None:
+    grid = ghs.load_grid(write_csv(make_grid(), tmp_path / "grid.csv"))
+    _, tables = ghs.analyse_grid(grid, promoted, top_k=15)
+    frame = grid.astype({"trades": "float64", "sharpe": "float64"})
+    by_horizon = frame.groupby("horizon", observed=True)
+    horizon = tables["Horizon Summary"]
+    np.testing.assert_allclose(horizon["n"], by_horizon["sharpe"].count())
+    np.testing.assert_allclose(horizon["sharpe_avg"], by_horizon["sharpe"].mean().round(3))
+    np.testing.assert_allclose(horizon["trades_avg"], by_horizon["trades"].mean().round(1))
+    band = tables["Band vs Sharpe"]
+    np.testing.assert_allclose(
+        band["max"], frame.groupby("band", observed=True)["sharpe"].max().round(3)
+    )
+    top = tables["Top Pockets by Sharpe"]
+    assert top.index.tolist() == frame["sharpe"].nlargest(15).index.tolist()
+
+
+def write_runs(directory: pathlib.Path, days: int) -> list[pathlib.Path]:
+    directory.mkdir(exist_ok=True)
+    return [
+        write_csv(make_grid(seed=day), directory / f"grid_2025-06-0{day}_2025-09-1{day}.csv")
+        for day in range(1, days + 1)
+    ]
+
+
+def test_history_only_ingests_new_or_changed_exports(tmp_path: pathlib.Path) -> None:
+    exports = write_runs(tmp_path / "exports", 3)
+    history = ghs.GridHistory(tmp_path / ghs.HISTORY_INDEX_NAME)
+    assert history.update(exports) == [path.name for path in exports]
+    assert history.update(exports) == []
+    write_csv(make_grid(seed=9), exports[1])
+    reopened = ghs.GridHistory(tmp_path / ghs.HISTORY_INDEX_NAME)
+    assert reopened.update(exports) == [exports[1].name]
+    assert reopened.ordered_runs() == [path.name for path in exports]
+    assert reopened.runs[exports[0].name]["run_date"] == "2025-09-11"
+
+
+def test_history_headline_stats(tmp_path: pathlib.Path) -> None:
+    (export,) = write_runs(tmp_path / "exports", 1)
+    history = ghs.GridHistory(tmp_path / ghs.HISTORY_INDEX_NAME)
+    history.update([export], chunksize=40, top_k=25)
+    sharpe = pd.read_csv(export)["sharpe"]
+    run = history.runs[export.name]
+    assert run["pockets"] == len(sharpe)
+    assert run["sharpe_avg"] == pytest.approx(sharpe.mean(), rel=1e-6)
+    assert run["top_k"] == 25
+    assert run["top_sharpe_avg"] == pytest.approx(sharpe.nlargest(25).mean(), rel=1e-6)
+
+
+def test_history_rescores_runs_indexed_with_another_top_k(tmp_path: pathlib.Path) -> None:
+    exports = write_runs(tmp_path / "exports", 2)
+    history = ghs.GridHistory(tmp_path / ghs.HISTORY_INDEX_NAME)
+    history.update(exports[:1])
+    assert history.update(exports, top_k=5) == [exports[1].name]
+    for export in exports:
+        run = history.runs[export.name]
+        best = pd.read_csv(export)["sharpe"].nlargest(5).mean()
+        assert run["top_k"] == 5
+        assert run["top_sharpe_avg"] == pytest.approx(best, rel=1e-6)
+    assert history.run_overview()["top_k"].tolist() == [5, 5]
+
+
+def test_history_keeps_the_last_row_per_pocket(tmp_path: pathlib.Path) -> None:
+    grid = make_grid(rows=20, blanks_from=10**6)
+    duplicate = grid.iloc[[3]].assign(sharpe=9.5, model_version="claude")
+    path = write_csv(pd.concat([grid, duplicate]), tmp_path / "grid_2025-09-11.csv")
+    history = ghs.GridHistory(tmp_path / ghs.HISTORY_INDEX_NAME)
+    history.update([path])
+    rows = history.read([path.name])
+    key = grid.loc[3, ghs.GRID_KEY_COLUMNS].tolist()
+    matches = rows[(rows[ghs.GRID_KEY_COLUMNS] == key).all(axis=1)]
+    assert len(rows) == len(grid.drop_duplicates(ghs.GRID_KEY_COLUMNS))
+    assert matches["sharpe"].tolist() == [9.5]
+
+
+def test_history_report_tracks_promoted_drift_and_churn(
+    tmp_path: pathlib.Path, promoted: pd.DataFrame
+) -> None:
+    exports = write_runs(tmp_path / "exports", 2)
+    history = ghs.GridHistory(tmp_path / ghs.HISTORY_INDEX_NAME)
+    history.update(exports)
+    entered, left = history.top_k_churn(10)
+
+    def top_pockets(export: pathlib.Path) -> set[tuple]:
+        run = history.read([export.name]).dropna(subset=["sharpe"])
+        top = run.nlargest(10, "sharpe", keep="all")[ghs.GRID_KEY_COLUMNS]
+        return set(top.itertuples(index=False, name=None))
+
+    before, after = (top_pockets(export) for export in exports)
+    assert len(entered) == len(after - before)
+    assert len(left) == len(before - after)
+    report = ghs.history_report(history, promoted, top_k=10)
+    assert list(report)[0] == "Grid Runs"
+    drift = history.promoted_drift(promoted)
+    assert len(drift) == len(promoted)
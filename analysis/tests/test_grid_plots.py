@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import grid_plots
+
+matplotlib = pytest.importorskip("matplotlib")
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+from matplotlib import cbook  # noqa: E402
+
+
+def make_raw(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    adv = 10 ** rng.normal(9, 0.8, rows)
+    adv[:5] = [0, -1, np.nan, 1e9, 1e9]
+    sharpe = rng.normal(0, 1.2, rows)
+    sharpe[5:8] = np.nan
+    return pd.DataFrame(
+        {
+            "avg_daily_dollar_volume_30d": adv,
+            "sharpe": sharpe,
+            "horizon": rng.choice(["1d", "3d", "5d"], rows),
+            "band": rng.choice(["WEAK", "STRONG", None], rows),
+        }
+    )
+
+
+def test_hexbin_payload_matches_matplotlib() -> None:
+    raw = make_raw(20_000)
+    payload = grid_plots._adv_payload(raw, max_points=1_000, large_mode="hexbin")
+    keep = (raw["avg_daily_dollar_volume_30d"] > 0) & raw["sharpe"].notna()
+    assert payload["mode"] == "hexbin"
+    assert payload["total"] == int(keep.sum())
+    assert len(payload["counts"]) < payload["total"] // 4
+
+    fig, (direct_ax, binned_ax) = plt.subplots(1, 2)
+    direct = direct_ax.hexbin(
+        raw.loc[keep, "avg_daily_dollar_volume_30d"],
+        raw.loc[keep, "sharpe"],
+        xscale="log",
+        gridsize=grid_plots.HEXBIN_GRIDSIZE,
+        mincnt=1,
+    )
+    binned = binned_ax.hexbin(
+        10 ** payload["x"],
+        payload["y"],
+        C=payload["counts"],
+        reduce_C_function=np.sum,
+        xscale="log",
+        extent=payload["extent"],
+        gridsize=grid_plots.HEXBIN_GRIDSIZE,
+        mincnt=1,
+    )
+    np.testing.assert_array_equal(binned.get_array(), direct.get_array())
+    np.testing.assert_allclose(binned.get_offsets(), direct.get_offsets())
+    plt.close(fig)
+
+
+def test_small_or_sampled_scatters_keep_points() -> None:
+    raw = make_raw(500)
+    small = grid_plots._adv_payload(raw, max_points=1_000, large_mode="hexbin")
+    assert small["mode"] == "scatter"
+    assert len(small["adv"]) == small["total"] == 500 - 6
+    sampled = grid_plots._adv_payload(raw, max_points=100, large_mode="sample")
+    assert len(sampled["adv"]) == 100
+    assert set(sampled["sharpe"]) <= set(small["sharpe"])
+
+
+def test_band_payload_matches_matplotlib_box_stats() -> None:
+    raw = make_raw(2_000)
+    payload = grid_plots._band_payload(raw, max_points=10**6)
+    for stats in payload["stats"]:
+        values = raw.loc[raw["band"] == stats["label"], "sharpe"].dropna().to_numpy()
+        (expected,) = cbook.boxplot_stats(values, whis=1.5)
+        for key in ("q1", "med", "q3", "whislo", "whishi"):
+            assert stats[key] == pytest.approx(expected[key])
+        np.testing.assert_array_equal(np.sort(stats["fliers"]), np.sort(expected["fliers"]))
+    assert [stats["label"] for stats in payload["stats"]] == ["STRONG", "WEAK"]
+
+
+def test_render_plots_writes_every_chart(tmp_path: pathlib.Path) -> None:
+    pytest.importorskip("seaborn")
+    raw = make_raw(3_000)
+    horizon = pd.DataFrame({"sharpe_avg": [0.1, -0.2, 0.3]}, index=["1d", "3d", "5d"])
+    tables = {"Raw": raw, "Horizon Summary": horizon}
+    paths = grid_plots.render_plots(tables, tmp_path, max_points=500, workers=2, dpi=50)
+    assert [path.name for path in paths] == [
+        grid_plots.PLOT_FILES[kind] for kind in grid_plots.PLOT_KINDS
+    ]
+    assert all(path.stat().st_size > 0 for path in paths)
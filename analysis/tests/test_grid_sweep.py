@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.grid_backtest import GridInputs, evaluate_grid
+from analysis.grid_sweep import open_shared, plan_shards, run_sweep, share_inputs
+from analysis.tests.test_grid_backtest import PARAMS, make_frames
+
+
+@pytest.fixture(scope="module")
+def inputs() -> GridInputs:
+    return GridInputs.from_frames(*make_frames(symbols=25, seed=11))
+
+
+@pytest.fixture(scope="module")
+def grid(inputs: GridInputs) -> pd.DataFrame:
+    return evaluate_grid(inputs, PARAMS)
+
+
+@pytest.mark.parametrize("shards", [1, 5, 12, 200])
+def test_sweep_matches_single_pass(inputs: GridInputs, grid: pd.DataFrame, shards: int) -> None:
+    result = run_sweep(inputs, PARAMS, workers=2, shards=shards)
+    assert len(grid) > 100
+    pd.testing.assert_frame_equal(result, grid)
+
+
+def test_sweep_in_shared_dir(
+    inputs: GridInputs, grid: pd.DataFrame, tmp_path: pathlib.Path
+) -> None:
+    pd.testing.assert_frame_equal(run_sweep(inputs, PARAMS, workers=2, shared_dir=tmp_path), grid)
+    assert not any(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize("shards", [1, 3, 7, 30])
+def test_plan_covers_every_symbol_once_per_horizon(inputs: GridInputs, shards: int) -> None:
+    horizons = ("1d", "3d", "5d")
+    plan = plan_shards(inputs, horizons, shards)
+    assert len(plan) <= max(shards, len(horizons))
+    for horizon in horizons:
+        ranges = sorted((first, stop) for first, stop, h in plan if h == horizon)
+        assert ranges[0][0] == 0 and ranges[-1][1] == len(inputs.symbols)
+        assert all(stop == first for (_, stop), (first, _) in zip(ranges, ranges[1:]))
+        assert all(first < stop for first, stop in ranges)
+
+
+def test_plan_without_candidates(inputs: GridInputs) -> None:
+    daily, prices, _ = make_frames(symbols=2)
+    assert plan_shards(GridInputs.from_frames(daily.iloc[:0], prices), ("1d",), 4) == []
+
+
+def test_shared_inputs_round_trip(inputs: GridInputs, tmp_path: pathlib.Path) -> None:
+    share_inputs(inputs, tmp_path)
+    shared = open_shared(tmp_path)
+    assert list(shared.symbols) == list(inputs.symbols)
+    for name, values in inputs.arrays().items():
+        np.testing.assert_array_equal(shared.arrays()[name], values)
+    pd.testing.assert_frame_equal(evaluate_grid(shared, PARAMS), evaluate_grid(inputs, PARAMS))
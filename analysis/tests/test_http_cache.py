@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+import pathlib
+
+import pytest
+
+from analysis import http_cache
+from analysis.http_cache import ResponseCache, redact_url
+
+URL = "https://api.polygon.io/v2/aggs/grouped/locale/us/market/stocks/2024-01-02?adjusted=true"
+OLD_DAY = dt.date(2024, 1, 2)
+
+
+@pytest.fixture
+def cache(tmp_path: pathlib.Path) -> ResponseCache:
+    return ResponseCache(tmp_path / "http", ttl=60)
+
+
+def test_redact_url_strips_credentials() -> None:
+    url = "https://finnhub.io/api/v1/calendar?from=2024-01-01&token=abc&apiKey=def"
+    assert redact_url(url) == "https://finnhub.io/api/v1/calendar?from=2024-01-01"
+
+
+def test_entries_are_shared_across_api_keys(cache: ResponseCache) -> None:
+    cache.store(f"{URL}&apiKey=old", {"results": [1, 2]}, OLD_DAY)
+    entry = cache.lookup(f"{URL}&apiKey=new")
+    assert entry is not None
+    assert entry.payload == {"results": [1, 2]}
+    assert entry.url == URL
+
+
+def test_settled_days_never_expire(cache: ResponseCache) -> None:
+    cache.store(URL, {"results": []}, OLD_DAY)
+    entry = cache.lookup(URL)
+    assert entry.expires_at is None
+    assert entry.fresh
+
+
+def test_recent_days_expire_after_ttl(
+    cache: ResponseCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache.store(URL, {"results": []}, dt.date.today(), {"ETag": '"v1"'})
+    assert cache.has_fresh(URL)
+    now = http_cache.time.time()
+    monkeypatch.setattr(http_cache.time, "time", lambda: now + 61)
+    entry = cache.lookup(URL)
+    assert not entry.fresh
+    assert not cache.has_fresh(URL)
+    assert entry.conditional_headers() == {"If-None-Match": '"v1"'}
+
+
+def test_revalidated_keeps_the_body_and_refreshes_expiry(
+    cache: ResponseCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache.store(URL, {"results": [7]}, dt.date.today())
+    now = http_cache.time.time()
+    monkeypatch.setattr(http_cache.time, "time", lambda: now + 61)
+    stale = cache.lookup(URL)
+    assert cache.revalidated(stale, dt.date.today()) == {"results": [7]}
+    entry = cache.lookup(URL)
+    assert entry.fresh
+    assert entry.payload == {"results": [7]}
+
+
+def test_has_fresh_is_false_for_missing_entries(cache: ResponseCache) -> None:
+    assert cache.lookup(URL) is None
+    assert not cache.has_fresh(URL)
+
+
+def test_failed_writer_leaves_no_entry(cache: ResponseCache) -> None:
+    with pytest.raises(RuntimeError):
+        with cache.writer(URL, OLD_DAY) as body:
+            body.write(b'{"results": [')
+            raise RuntimeError("connection dropped")
+    assert cache.lookup(URL) is None
+    assert not list(cache.directory.rglob("*.tmp"))
+
+
+def test_eviction_drops_least_recently_used_entries(tmp_path: pathlib.Path) -> None:
+    cache = ResponseCache(tmp_path, max_bytes=10**9)
+    urls = [f"{URL}&page={index}" for index in range(4)]
+    for age, url in enumerate(reversed(urls)):
+        cache.store(url, {"results": [url] * 50}, OLD_DAY)
+        path = cache._path(url)
+        os.utime(path, (1_000_000 - age, 1_000_000 - age))
+    sizes = [cache._path(url).stat().st_size for url in urls]
+    # Room for the two newest entries plus the low-water headroom.
+    cache.max_bytes = int(sum(sizes[-2:]) / http_cache.EVICT_LOW_WATER) + 1
+    cache._total = None
+    cache._evict()
+    assert [cache.lookup(url) is not None for url in urls] == [False, False, True, True]
+    assert cache._total == sum(sizes[-2:])
+
+
+def test_running_total_tracks_writes_without_rescanning(
+    cache: ResponseCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache.store(URL, {"results": []}, OLD_DAY)
+    scans = []
+    monkeypatch.setattr(cache, "_scan", lambda: scans.append(1) or [])
+    cache.store(f"{URL}&page=2", {"results": []}, OLD_DAY)
+    cache.store(URL, {"results": [1]}, OLD_DAY)
+    assert scans == []
+    assert cache._total == sum(path.stat().st_size for path in cache.directory.rglob("*.gz"))
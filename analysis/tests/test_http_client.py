@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import datetime as dt
+import email.utils
+import gzip
+import http.server
+import json
+import pathlib
+import threading
+from typing import Iterator
+
+import pytest
+
+from analysis.http_cache import ResponseCache
+from analysis.http_client import HttpClient, HttpError, retry_after_seconds
+
+PAYLOAD = {"results": [{"T": "AAA", "c": 1.0}, {"T": "BBB", "c": 2.0}], "status": "OK"}
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+    def send_json(self, status: int, payload: object, **headers: str) -> None:
+        body = json.dumps(payload).encode()
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name.replace("_", "-"), value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        server = self.server
+        server.requests.append((self.path, dict(self.headers)))
+        if self.path.startswith("/flaky") and server.failures:
+            server.failures -= 1
+            self.send_json(503, {"error": "busy"}, Retry_After="0")
+        elif self.path.startswith("/missing"):
+            self.send_json(404, {"error": "not found"})
+        elif self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self.send_json(200, PAYLOAD, ETag='"v1"')
+
+
+@pytest.fixture
+def server() -> Iterator[http.server.ThreadingHTTPServer]:
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.requests = []
+    httpd.connections = 0
+    httpd.failures = 0
+    thread = threading.Thread(
+        target=httpd.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def base_url(server: http.server.ThreadingHTTPServer) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@pytest.fixture
+def client() -> Iterator[HttpClient]:
+    client = HttpClient("analysis-tests", timeout=5, attempts=3, backoff=0)
+    yield client
+    client.close()
+
+
+def test_requests_reuse_one_gzip_connection(server, client: HttpClient) -> None:
+    for page in range(3):
+        assert client.get_json(f"{base_url(server)}/data?page={page}") == PAYLOAD
+    assert server.connections == 1
+    assert all(headers["Accept-Encoding"] == "gzip" for _, headers in server.requests)
+
+
+def test_transient_errors_are_retried(server, client: HttpClient) -> None:
+    server.failures = 2
+    assert client.get_json(f"{base_url(server)}/flaky") == PAYLOAD
+    assert len(server.requests) == 3
+
+
+def test_retries_give_up_with_the_last_status(server, client: HttpClient) -> None:
+    server.failures = 5
+    with pytest.raises(HttpError) as info:
+        client.get_json(f"{base_url(server)}/flaky")
+    assert info.value.status == 503
+    assert len(server.requests) == 3
+
+
+def test_client_errors_fail_fast_and_redact_keys(server, client: HttpClient) -> None:
+    with pytest.raises(HttpError) as info:
+        client.get_json(f"{base_url(server)}/missing?apiKey=secret")
+    assert info.value.status == 404
+    assert "secret" not in str(info.value)
+    assert len(server.requests) == 1
+
+
+def test_stale_cache_entries_are_revalidated(
+    server, client: HttpClient, tmp_path: pathlib.Path
+) -> None:
+    cache = ResponseCache(tmp_path, ttl=-1)
+    url = f"{base_url(server)}/data"
+    assert client.get_json(url, cache=cache, settled_through=dt.date.today()) == PAYLOAD
+    assert client.get_json(url, cache=cache, settled_through=dt.date.today()) == PAYLOAD
+    assert [headers.get("If-None-Match") for _, headers in server.requests] == [None, '"v1"']
+
+
+def test_settled_responses_are_served_from_cache(
+    server, client: HttpClient, tmp_path: pathlib.Path
+) -> None:
+    cache = ResponseCache(tmp_path)
+    url = f"{base_url(server)}/data"
+    settled = dt.date(2024, 1, 2)
+    assert client.get_json(url, cache=cache, settled_through=settled) == PAYLOAD
+    assert client.get_json(url, cache=cache, settled_through=settled) == PAYLOAD
+    assert len(server.requests) == 1
+
+
+def test_stream_array_tees_the_body_into_the_cache(
+    server, client: HttpClient, tmp_path: pathlib.Path
+) -> None:
+    cache = ResponseCache(tmp_path)
+    url = f"{base_url(server)}/data"
+    settled = dt.date(2024, 1, 2)
+    rows = list(client.stream_array(url, ("results",), cache=cache, settled_through=settled))
+    assert rows == PAYLOAD["results"]
+    assert cache.lookup(url).payload == PAYLOAD
+    cached = client.stream_array(url, ("results",), cache=cache, settled_through=settled)
+    assert list(cached) == PAYLOAD["results"]
+    assert len(server.requests) == 1
+    # The streamed body was fully read, so the connection stays pooled.
+    assert client.get_json(f"{base_url(server)}/other") == PAYLOAD
+    assert server.connections == 1
+
+
+def test_retry_after_seconds() -> None:
+    assert retry_after_seconds(None) is None
+    assert retry_after_seconds("2.5") == 2.5
+    assert retry_after_seconds("-3") == 0.0
+    assert retry_after_seconds("soon") is None
+    later = dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=120)
+    assert 100 < retry_after_seconds(email.utils.format_datetime(later)) <= 120
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from analysis.json_stream import iter_array
+
+PAYLOAD = {
+    "status": "OK",
+    "queryCount": 3,
+    "meta": {"note": "braces } and ] inside \"strings\"", "results": ["not", "this"]},
+    "results": [
+        {"T": "AAA", "c": 1.5, "v": 100, "nested": {"x": [1, 2, {"y": None}]}},
+        {"T": "ÉCLAIR", "c": -2e-3, "v": 0, "flag": True},
+        [1, "two", 3.0],
+        "plain",
+        None,
+    ],
+    "next_url": None,
+}
+
+
+def stream(payload: object, **dump: object) -> io.BytesIO:
+    return io.BytesIO(json.dumps(payload, **dump).encode("utf-8"))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_matches_json_load(chunk_size: int, indent: int | None) -> None:
+    fp = stream(PAYLOAD, indent=indent, ensure_ascii=False)
+    assert list(iter_array(fp, ("results",), chunk_size)) == PAYLOAD["results"]
+
+
+def test_nested_path() -> None:
+    fp = stream(PAYLOAD)
+    assert list(iter_array(fp, ("meta", "results"), 3)) == ["not", "this"]
+
+
+@pytest.mark.parametrize(
+    "payload", [{"status": "OK"}, {"results": None}, {"results": []}, {"meta": {}}]
+)
+def test_missing_or_empty_arrays_yield_nothing(payload: dict) -> None:
+    assert list(iter_array(stream(payload), ("results",))) == []
+
+
+def test_elements_are_yielded_before_the_body_ends() -> None:
+    class Truncated(io.BytesIO):
+        def read(self, size: int = -1) -> bytes:
+            data = super().read(size)
+            if not data:
+                raise ConnectionError("body cut off")
+            return data
+
+    body = b'{"results": [{"T": "AAA"}, {"T": "BBB"}, {"T": "CC'
+    rows = iter_array(Truncated(body), ("results",), 4)
+    assert next(rows) == {"T": "AAA"}
+    assert next(rows) == {"T": "BBB"}
+    with pytest.raises(ConnectionError):
+        next(rows)
+
+
+def test_malformed_json_raises() -> None:
+    with pytest.raises(ValueError):
+        list(iter_array(io.BytesIO(b'{"results": [1 2]}'), ("results",)))
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import datetime as dt
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import leadlag
+from analysis.leadlag import MessageArrays, MessageCache
+
+pytest.importorskip("pyarrow")
+
+HEADER = "source,message_id,symbol,created_at,label,score\n"
+
+
+def write_export(path: pathlib.Path, rows: list[str]) -> pathlib.Path:
+    path.write_text(HEADER + "\n".join(rows) + "\n")
+    return path
+
+
+def random_export(path: pathlib.Path, rows: int = 400, seed: int = 0) -> pathlib.Path:
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2025-09-01", tz="UTC")
+    lines = []
+    for index in range(rows):
+        source = "stocktwits" if rng.random() < 0.5 else "reddit"
+        when = start + pd.Timedelta(minutes=int(rng.integers(0, 5 * 24 * 60)))
+        if source == "stocktwits":
+            label, score = rng.choice(["Bullish", "Bearish", ""]), ""
+        else:
+            label, score = rng.choice(["positive", "negative"]), f"{rng.uniform(-1, 1):.3f}"
+        symbol = rng.choice(["GME", "amc", "BB "])
+        lines.append(f"{source},{source[0]}{index},{symbol},{when.isoformat()},{label},{score}")
+    return write_export(path, lines)
+
+
+def test_message_sentiment() -> None:
+    source = pd.Series(["stocktwits"] * 3 + ["reddit"] * 3)
+    label = pd.Series([" bullish", "BEARISH", None, "Positive", "negative", "neutral"])
+    score = pd.Series([np.nan, 0.9, np.nan, np.nan, np.nan, 0.25])
+    np.testing.assert_array_equal(
+        leadlag.message_sentiment(source, label, score), [1, -1, 0, 1, -1, 0.25]
+    )
+
+
+def test_ingest_appends_parts_and_later_copies_win(tmp_path: pathlib.Path) -> None:
+    cache = MessageCache(tmp_path / "cache")
+    first = write_export(
+        tmp_path / "a.csv",
+        [
+            "stocktwits,1,GME,2025-09-01T10:00:00Z,Bullish,",
+            "reddit,9,AMC,2025-09-01T11:00:00Z,positive,0.5",
+        ],
+    )
+    second = write_export(
+        tmp_path / "b.csv",
+        [
+            "stocktwits,1,GME,2025-09-01T10:00:00Z,Bearish,",
+            "reddit,10,GME,2025-09-02T09:00:00Z,negative,",
+        ],
+    )
+    assert cache.ingest([first]) == (2, 1)
+    part = cache.parts()[0]
+    written = part.stat().st_mtime_ns
+    assert cache.ingest([second]) == (2, 2)
+    assert part.stat().st_mtime_ns == written
+    messages = cache.load(None, None, None)
+    assert messages["message_id"].tolist() == ["9", "1", "10"]
+    assert messages["sentiment"].tolist() == [0.5, -1.0, -1.0]
+
+
+def test_load_filters_and_matches_a_single_ingest(tmp_path: pathlib.Path) -> None:
+    exports = [random_export(tmp_path / f"{seed}.csv", seed=seed) for seed in range(3)]
+    split = MessageCache(tmp_path / "split")
+    for export in exports:
+        split.ingest([export])
+    whole = MessageCache(tmp_path / "whole")
+    whole.ingest(exports)
+    start, end = dt.date(2025, 9, 2), dt.date(2025, 9, 4)
+    loaded = split.load(start, end, ["GME", "AMC"])
+    pd.testing.assert_frame_equal(loaded, whole.load(start, end, ["GME", "AMC"]))
+    assert set(loaded["symbol"]) == {"GME", "AMC"}
+    assert loaded["created_at"].min() >= pd.Timestamp(start, tz="UTC")
+    assert loaded["created_at"].max() < pd.Timestamp(end, tz="UTC")
+    assert loaded.equals(loaded.sort_values(["symbol", "created_at"], kind="stable"))
+
+
+def test_parts_are_compacted(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(leadlag, "CACHE_MAX_PARTS", 2)
+    cache = MessageCache(tmp_path / "cache")
+    expected = None
+    for seed in range(3):
+        cache.ingest([random_export(tmp_path / f"{seed}.csv", seed=seed)])
+        if seed == 1:
+            assert len(cache.parts()) == 2
+            expected = cache.load(None, None, None)
+    assert len(cache.parts()) == 1
+    assert len(cache.load(None, None, None)) > len(expected)
+
+
+def test_missing_cache(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(SystemExit):
+        MessageCache(tmp_path / "missing").load(None, None, None)
+
+
+def test_first_mention_leads_match_groupby(tmp_path: pathlib.Path) -> None:
+    cache = MessageCache(tmp_path / "cache")
+    cache.ingest([random_export(tmp_path / "m.csv", rows=2_000)])
+    messages = cache.load(None, None, None)
+    leads = leadlag.first_mention_leads(MessageArrays(messages))
+    frame = messages.assign(day=messages["created_at"].dt.tz_localize(None).dt.floor("D"))
+    first = frame.groupby(["day", "symbol", "source"])["created_at"].min().unstack().dropna()
+    expected = (first["stocktwits"] - first["reddit"]).dt.total_seconds() / 60
+    result = leads.set_index(["day", "symbol"])["lead_minutes"].sort_index()
+    np.testing.assert_allclose(result.to_numpy(), expected.sort_index().to_numpy())
+    assert result.index.get_level_values("symbol").tolist() == (
+        expected.sort_index().index.get_level_values("symbol").tolist()
+    )
+
+
+def test_cross_correlation_matches_direct_sums() -> None:
+    rng = np.random.default_rng(4)
+    a, b = rng.poisson(3, (4, 50)).astype(float), rng.poisson(3, (4, 50)).astype(float)
+    a[3] = 2.0  # constant row
+    result = leadlag.cross_correlation(a, b, 6)
+    for row in range(3):
+        x = a[row] - a[row].mean()
+        y = b[row] - b[row].mean()
+        norm = np.sqrt((x * x).sum() * (y * y).sum())
+        for index, lag in enumerate(range(-6, 7)):
+            if lag >= 0:
+                expected = (x[: len(x) - lag] * y[lag:]).sum() / norm
+            else:
+                expected = (x[-lag:] * y[: len(y) + lag]).sum() / norm
+            assert result[row, index] == pytest.approx(expected)
+        assert result[row, 6] == pytest.approx(np.corrcoef(a[row], b[row])[0, 1])
+    assert np.isnan(result[3]).all()
+
+
+def test_lead_summary_uses_discrete_percentiles() -> None:
+    leads = pd.DataFrame({"lead_minutes": [-30.0, -10.0, 0.0, 5.0, 60.0]})
+    (row,) = leadlag.lead_summary(leads).to_dict("records")
+    assert row["st_leads"] == 2 and row["rd_leads"] == 2 and row["simultaneous"] == 1
+    assert (row["p25_lead_min"], row["median_lead_min"], row["p75_lead_min"]) == (-10, 0, 5)
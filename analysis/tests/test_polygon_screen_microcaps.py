@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import pathlib
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import polygon_screen_microcaps as screen
+from analysis.bar_store import DailyBarStore
+from analysis.http_cache import ResponseCache
+
+
+def test_sequential_days_only_sleep_after_network_fetches(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = ResponseCache(tmp_path)
+    cache.store(screen.day_url("2024-01-02", "key"), {"results": []}, dt.date(2024, 1, 2))
+    fetched: list[str] = []
+    sleeps: list[float] = []
+
+    def fake_get(url, cache, settled_through, limiter):
+        hit = cache.lookup(url)
+        if hit is not None and hit.fresh:
+            return hit.payload
+        fetched.append(url)
+        return {"results": []}
+
+    monkeypatch.setattr(screen, "http_get", fake_get)
+    monkeypatch.setattr(screen.time, "sleep", sleeps.append)
+    args = argparse.Namespace(concurrency=1, sleep=0.5, stream=False)
+    results = screen.iter_day_results(["2024-01-02", "2024-01-03"], args, "key", cache)
+    days = [day for day, _ in results]
+    assert days == ["2024-01-02", "2024-01-03"]
+    assert fetched == [screen.day_url("2024-01-03", "key")]
+    assert sleeps == [0.5]
+
+
+def fake_grouped_daily(url: str) -> dict:
+    """Deterministic grouped-daily payload for the date in `url`."""
+    day = dt.date.fromisoformat(re.search(r"\d{4}-\d{2}-\d{2}", url).group())
+    rng = np.random.default_rng(day.toordinal())
+    results = []
+    for index in range(12):
+        if rng.random() < 0.15:
+            continue  # not every ticker trades every session
+        close = float(rng.uniform(0.5, 30))
+        row = {"T": f"T{index:02d}", "c": close, "v": float(rng.integers(1e4, 1e7))}
+        row["vw"] = close * float(rng.uniform(0.95, 1.05))
+        if rng.random() > 0.1:
+            row["o"] = close * float(rng.uniform(0.8, 1.2))
+        results.append(row)
+    return {"results": results}
+
+
+SCREEN_ARGV = [
+    "--days", "8", "--min-days", "3", "--adv-min", "0", "--adv-max", "1e13",
+    "--price-min", "1", "--price-max", "25", "--limit", "100", "--sleep", "0",
+]
+
+
+@pytest.fixture
+def grouped_daily(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    requested: list[str] = []
+
+    def fake_get(url, cache=None, settled_through=None, limiter=None):
+        requested.append(url)
+        return fake_grouped_daily(url)
+
+    monkeypatch.setattr(screen, "http_get", fake_get)
+    return requested
+
+
+def reference_screen(args: argparse.Namespace) -> pd.DataFrame:
+    """Straight pandas version of the screen over the same sessions."""
+    frames = []
+    for day in screen.trading_dates(args.days):
+        frame = pd.DataFrame(fake_grouped_daily(screen.day_url(day, "key"))["results"])
+        frame["day"] = day
+        frames.append(frame)
+    bars = pd.concat(frames, ignore_index=True)
+    bars["dollar_volume"] = bars["v"] * bars["vw"]
+    bars["move"] = ((bars["c"] - bars["o"]) / bars["o"]).abs()
+    bars = bars.sort_values("day")
+    grouped = bars.groupby("T")
+    table = pd.DataFrame(
+        {
+            "avg_dollar_volume": grouped["dollar_volume"].mean(),
+            "last_close": grouped["c"].last(),
+            "daily_move": grouped["move"].mean(),
+            "stdev_move": grouped["move"].std().fillna(0.0),
+            "observations": grouped.size(),
+            "moves": grouped["move"].count(),
+        }
+    )
+    table = table[
+        (table["observations"] >= args.min_days)
+        & table["last_close"].between(args.price_min, args.price_max)
+        & (table["moves"] > 0)
+    ]
+    return table.drop(columns="moves").sort_index()
+
+
+def test_screen_matches_pandas_reference(grouped_daily: list[str]) -> None:
+    args = screen.parse_args(SCREEN_ARGV)
+    rows = pd.DataFrame(screen.screen(args, "key")).set_index("symbol").sort_index()
+    expected = reference_screen(args)
+    assert list(rows.index) == list(expected.index)
+    pd.testing.assert_frame_equal(
+        rows[expected.columns], expected, check_dtype=False, check_names=False
+    )
+
+
+def test_bar_store_reruns_match_direct_screen(
+    tmp_path: pathlib.Path, grouped_daily: list[str]
+) -> None:
+    args = screen.parse_args(SCREEN_ARGV)
+    direct = screen.screen(args, "key")
+    with DailyBarStore(tmp_path / "bars.sqlite") as store:
+        grouped_daily.clear()
+        assert screen.screen(args, "key", store=store) == direct
+        assert len(grouped_daily) == args.days
+        grouped_daily.clear()
+        assert screen.screen(args, "key", store=store) == direct
+    today = dt.date.today().isoformat()
+    # Only a session for today is unsettled and fetched again.
+    assert all(today in url for url in grouped_daily)
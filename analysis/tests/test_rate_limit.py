@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import pytest
+
+from analysis import rate_limit
+from analysis.rate_limit import TokenBucket, get_limiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(rate_limit.time, "sleep", fake.sleep)
+    return fake
+
+
+def test_burst_is_free_then_paced_at_rate(clock: FakeClock) -> None:
+    bucket = TokenBucket(rate=4, burst=2)
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.sleeps == []
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.25)]
+
+
+def test_refill_is_capped_at_capacity(clock: FakeClock) -> None:
+    bucket = TokenBucket(rate=1, burst=3)
+    clock.now = 100.0
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def test_default_burst_allows_one_second_of_requests() -> None:
+    assert TokenBucket(rate=5).capacity == 5
+    assert TokenBucket(rate=0.5).capacity == 1
+
+
+def test_rate_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_get_limiter_shares_one_bucket_per_name(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(rate_limit, "_LIMITERS", {})
+    first = get_limiter("polygon", 5)
+    assert get_limiter("polygon", 50) is first
+    assert first.rate == 5
+    assert get_limiter("finnhub", 1) is not first
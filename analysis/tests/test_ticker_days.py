@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import contextlib
+import csv
+import importlib.util
+import io
+import math
+import pathlib
+
+import pandas as pd
+import pytest
+
+from analysis import stocktwits_reddit_calibration_summary as calibration
+from analysis import ticker_days
+from analysis.ticker_days import CALIBRATION_PATH, load_ticker_days
+
+HEADER = (
+    "day,symbol,st_message_id,st_created_at,st_label,st_followers,"
+    "reddit_mentions,reddit_positive,reddit_negative,reddit_avg_score,st_body\n"
+)
+EDGE_CASES = HEADER + "\n".join(
+    [
+        '2025-09-01,gme,1,t, bullish ,100,5,3,1,0.4,"multi\nline, body"',
+        "2025-09-01,GME ,2,t,BEARISH,,,,,,",
+        "2025-09-01,GME,3,t,,50,7,2,2,0.1,",
+        "2025-09-02,AMC,4,t,Neutral,10,,,,,",
+        "2025-09-01,AMC,5,t,Bullish,0,1,1,0,0.9,x",
+        "2025-09-02,GME,6,t,bearish,20,2,0,2,-0.5,y",
+    ]
+) + "\n"
+
+
+def reference_ticker_days(path: pathlib.Path) -> pd.DataFrame:
+    """Row-by-row aggregation with the csv module, as the summaries used to do it."""
+    days: dict[tuple[str, str], dict[str, float]] = {}
+    with path.open(newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            key = (row["day"], row["symbol"].strip().upper())
+            label = row["st_label"].strip().upper()
+            sentiment = {"BULLISH": 1, "BEARISH": -1}.get(label, 0)
+            followers = float(row["st_followers"] or 0)
+            day = days.setdefault(
+                key,
+                dict.fromkeys(ticker_days.SUM_COLUMNS, 0)
+                | dict.fromkeys(ticker_days.REDDIT_COLUMNS.values(), math.nan),
+            )
+            day["messages"] += 1
+            day["bullish"] += sentiment > 0
+            day["bearish"] += sentiment < 0
+            day["sentiment_sum"] += sentiment
+            day["follower_sum"] += followers
+            day["weighted_sum"] += sentiment * followers
+            for column, name in ticker_days.REDDIT_COLUMNS.items():
+                if math.isnan(day[name]) and row[column]:
+                    day[name] = float(row[column])
+    return pd.DataFrame(
+        [{"day": day, "symbol": symbol, **values} for (day, symbol), values in days.items()]
+    )
+
+
+@pytest.fixture(params=["pyarrow", "pandas"])
+def reader(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    if request.param == "pyarrow" and importlib.util.find_spec("pyarrow") is None:
+        pytest.skip("pyarrow not installed")
+    if request.param == "pandas":
+        real = importlib.util.find_spec
+        monkeypatch.setattr(
+            ticker_days.importlib.util,
+            "find_spec",
+            lambda name, *args: None if name == "pyarrow" else real(name, *args),
+        )
+    return request.param
+
+
+@pytest.mark.parametrize("chunksize", [2, 1_000_000])
+def test_matches_row_by_row_reference(
+    tmp_path: pathlib.Path, reader: str, chunksize: int
+) -> None:
+    path = tmp_path / "calibration.csv"
+    path.write_text(EDGE_CASES)
+    result = load_ticker_days(path, chunksize)
+    expected = reference_ticker_days(path)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert result["symbol"].tolist() == ["GME", "AMC", "AMC", "GME"]
+
+
+@pytest.mark.parametrize("chunksize", [250, 1_000_000])
+def test_checked_in_export_matches_reference(reader: str, chunksize: int) -> None:
+    result = load_ticker_days(CALIBRATION_PATH, chunksize)
+    expected = reference_ticker_days(CALIBRATION_PATH)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_empty_export(tmp_path: pathlib.Path, reader: str) -> None:
+    path = tmp_path / "calibration.csv"
+    path.write_text(HEADER)
+    result = load_ticker_days(path)
+    assert result.empty
+    assert list(result.columns)[:2] == ["day", "symbol"]
+
+
+def test_calibration_summary_output_is_unchanged() -> None:
+    # Output of the original row-by-row script on the checked-in export.
+    expected = """\
+Total StockTwits messages: 956
+Total ticker-days:        322
+
+Polarity overlap:
+  ST Bullish / Reddit Non-Pos    210 ( 65.2%)
+  Both Neutral                    79 ( 24.5%)
+  ST Bearish / Reddit Non-Neg     33 ( 10.2%)
+
+Corr(st_weighted, reddit_avg): 0.008
+Corr(st_simple, reddit_avg):   0.092
+
+Follower-weighted averages (sample):
+  Mean ST weighted: 0.288
+  Mean Reddit avg:  0.035
+"""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        calibration.summarise(CALIBRATION_PATH)
+    assert out.getvalue() == expected
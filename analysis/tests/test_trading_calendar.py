@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import datetime as dt
+
+import pytest
+
+from analysis.trading_calendar import (
+    Session,
+    early_closes,
+    holidays,
+    is_session,
+    recent_sessions,
+    sessions_between,
+)
+
+D = dt.date
+
+NYSE_2024 = [
+    D(2024, 1, 1), D(2024, 1, 15), D(2024, 2, 19), D(2024, 3, 29), D(2024, 5, 27),
+    D(2024, 6, 19), D(2024, 7, 4), D(2024, 9, 2), D(2024, 11, 28), D(2024, 12, 25),
+]
+NYSE_2025 = [
+    D(2025, 1, 1), D(2025, 1, 9), D(2025, 1, 20), D(2025, 2, 17), D(2025, 4, 18),
+    D(2025, 5, 26), D(2025, 6, 19), D(2025, 7, 4), D(2025, 9, 1), D(2025, 11, 27),
+    D(2025, 12, 25),
+]
+
+
+@pytest.mark.parametrize("year, expected", [(2024, NYSE_2024), (2025, NYSE_2025)])
+def test_published_holidays(year: int, expected: list[dt.date]) -> None:
+    assert sorted(holidays(year)) == expected
+
+
+@pytest.mark.parametrize("year, count", [(2022, 251), (2023, 250), (2024, 252)])
+def test_sessions_per_year(year: int, count: int) -> None:
+    assert len(sessions_between(D(year, 1, 1), D(year, 12, 31))) == count
+
+
+def test_weekend_holidays_are_observed() -> None:
+    assert D(2023, 1, 2) in holidays(2023)  # New Year's Day on a Sunday
+    assert D(2021, 6, 18) not in holidays(2021)  # Juneteenth before 2022
+    assert D(2022, 6, 20) in holidays(2022)
+    # Saturday New Year's Day does not close the Friday before.
+    assert is_session(D(2021, 12, 31))
+
+
+def test_early_closes() -> None:
+    assert early_closes(2024) == {D(2024, 7, 3), D(2024, 11, 29), D(2024, 12, 24)}
+    # July 3 on a Saturday is no session, so not an early close.
+    assert D(2021, 7, 3) not in early_closes(2021)
+
+
+def test_recent_sessions_walk_back_over_weekends_and_holidays() -> None:
+    assert recent_sessions(3, D(2024, 12, 26)) == [
+        Session(D(2024, 12, 26), False),
+        Session(D(2024, 12, 24), True),
+        Session(D(2024, 12, 23), False),
+    ]
+    assert recent_sessions(0) == []
+
+
+def test_sessions_between_is_oldest_first_and_inclusive() -> None:
+    sessions = sessions_between(D(2024, 3, 28), D(2024, 4, 1))
+    assert [session.date for session in sessions] == [D(2024, 3, 28), D(2024, 4, 1)]
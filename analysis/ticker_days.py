@@ -0,0 +1,173 @@
+"""Per ticker-day aggregation of the StockTwits/Reddit calibration export.
+
+`load_ticker_days` streams `stocktwits_reddit_calibration.csv` (one row per
+StockTwits message, see `stocktwits_reddit_calibration.sql`) in chunks,
+skipping the message bodies, and reduces every chunk to per `(day, symbol)`
+partial sums keyed on integer label codes; the partials are merged at the end. The result is one
+row per ticker-day that the calibration summaries share:
+
+    day, symbol, messages, bullish, bearish, sentiment_sum, follower_sum,
+    weighted_sum, reddit_mentions, reddit_positive, reddit_negative, reddit_avg
+
+Labels are normalised once for every report: case and surrounding whitespace
+are ignored, Bullish counts +1, Bearish -1, anything else (including blank) 0.
+Symbols are upper-cased. Reddit columns are per ticker-day in the export; the
+first non-null value is kept and they stay NaN when a ticker-day has none.
+Rows keep the order in which ticker-days first appear in the file.
+"""
+from __future__ import annotations
+
+import importlib.util
+import pathlib
+from typing import Any, Iterator
+
+if __package__:
+    from .lazy_import import lazy_import
+else:  # run as a script: `python analysis/ticker_days.py`
+    from lazy_import import lazy_import
+
+np = lazy_import("numpy", "python3 -m pip install --user numpy pandas")
+pd = lazy_import("pandas", "python3 -m pip install --user numpy pandas")
+
+CALIBRATION_PATH = pathlib.Path(__file__).with_name("stocktwits_reddit_calibration.csv")
+CHUNKSIZE = 1_000_000
+LABEL_SENTIMENT = {"BULLISH": 1, "BEARISH": -1}
+
+KEY_COLUMNS = ["day", "symbol"]
+SUM_COLUMNS = [
+    "messages",
+    "bullish",
+    "bearish",
+    "sentiment_sum",
+    "follower_sum",
+    "weighted_sum",
+]
+REDDIT_COLUMNS = {
+    "reddit_mentions": "reddit_mentions",
+    "reddit_positive": "reddit_positive",
+    "reddit_negative": "reddit_negative",
+    "reddit_avg_score": "reddit_avg",
+}
+LABEL_COLUMNS = ["day", "symbol", "st_label"]
+NUMERIC_COLUMNS = ["st_followers", *REDDIT_COLUMNS]
+
+
+def label_sentiment(labels: pd.Index) -> np.ndarray:
+    normalised = labels.astype(str).str.strip().str.upper()
+    return normalised.map(lambda label: LABEL_SENTIMENT.get(label, 0)).to_numpy(np.int64)
+
+
+def _normalise_symbols(symbols: pd.Index) -> np.ndarray:
+    return symbols.astype(str).str.strip().str.upper().to_numpy(dtype=object)
+
+
+def _as_text(labels: pd.Index) -> np.ndarray:
+    return labels.astype(str).to_numpy(dtype=object)
+
+
+def _by_category(column: pd.Series, mapper, missing) -> np.ndarray:
+    """Apply `mapper` to the categories once and gather the result by code."""
+    mapped = np.append(np.asarray(mapper(column.cat.categories)), missing)
+    # Missing values have code -1, which selects the appended `missing`.
+    return mapped[column.cat.codes.to_numpy()]
+
+
+def _key_codes(column: pd.Series, normalise) -> tuple[np.ndarray, np.ndarray]:
+    """Integer codes of the normalised labels of `column`, and those labels."""
+    codes, labels = pd.factorize(np.append(normalise(column.cat.categories), ""))
+    return codes[column.cat.codes.to_numpy()], np.asarray(labels, dtype=object)
+
+
+def _partials(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Reduce one chunk of messages to per ticker-day partial aggregates."""
+    day_codes, days = _key_codes(chunk["day"], _as_text)
+    symbol_codes, symbols = _key_codes(chunk["symbol"], _normalise_symbols)
+    sentiment = _by_category(chunk["st_label"], label_sentiment, 0)
+    followers = chunk["st_followers"].fillna(0).to_numpy(np.int64)
+    frame = pd.DataFrame(
+        {
+            "key": day_codes.astype(np.int64) * len(symbols) + symbol_codes,
+            "messages": np.ones(len(chunk), dtype=np.int64),
+            "bullish": (sentiment > 0).astype(np.int64),
+            "bearish": (sentiment < 0).astype(np.int64),
+            "sentiment_sum": sentiment,
+            "follower_sum": followers,
+            "weighted_sum": sentiment * followers,
+            **{name: chunk[col].to_numpy(np.float64) for col, name in REDDIT_COLUMNS.items()},
+        }
+    )
+    partial = _combine(frame.groupby("key", sort=False))
+    key = partial.index.to_numpy()
+    partial.index = pd.MultiIndex.from_arrays(
+        [days[key // len(symbols)], symbols[key % len(symbols)]], names=KEY_COLUMNS
+    )
+    return partial
+
+
+def _combine(grouped) -> pd.DataFrame:
+    return grouped.agg(
+        {
+            **{col: "sum" for col in SUM_COLUMNS},
+            **{col: "first" for col in REDDIT_COLUMNS.values()},
+        }
+    )
+
+
+def iter_message_chunks(path: pathlib.Path, chunksize: int = CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    """Stream the columns used here, with categorical day/symbol/label.
+
+    pyarrow's CSV reader is used when installed (several times faster on the
+    multi-line message bodies); otherwise pandas' C parser reads `chunksize`
+    rows at a time.
+    """
+    if importlib.util.find_spec("pyarrow") is not None:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+
+        label_type = pa.dictionary(pa.int32(), pa.string())
+        reader = pacsv.open_csv(
+            path,
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=LABEL_COLUMNS + NUMERIC_COLUMNS,
+                column_types={
+                    **{col: label_type for col in LABEL_COLUMNS},
+                    **{col: pa.float64() for col in NUMERIC_COLUMNS},
+                },
+            ),
+        )
+        with reader:
+            batches: list[Any] = []
+            rows = 0
+            for batch in reader:
+                batches.append(batch)
+                rows += batch.num_rows
+                if rows >= chunksize:
+                    yield pa.Table.from_batches(batches).to_pandas()
+                    batches, rows = [], 0
+            if batches:
+                yield pa.Table.from_batches(batches).to_pandas()
+        return
+    yield from pd.read_csv(
+        path,
+        usecols=LABEL_COLUMNS + NUMERIC_COLUMNS,
+        dtype={
+            **{col: "category" for col in LABEL_COLUMNS},
+            **{col: "float64" for col in NUMERIC_COLUMNS},
+        },
+        chunksize=chunksize,
+    )
+
+
+def load_ticker_days(
+    path: pathlib.Path = CALIBRATION_PATH,
+    chunksize: int = CHUNKSIZE,
+) -> pd.DataFrame:
+    """Read the calibration export once and return one row per ticker-day."""
+    parts = [_partials(chunk) for chunk in iter_message_chunks(path, chunksize)]
+    if not parts:
+        return pd.DataFrame(columns=KEY_COLUMNS + SUM_COLUMNS + list(REDDIT_COLUMNS.values()))
+    table = parts[0] if len(parts) == 1 else _combine(
+        pd.concat(parts).groupby(level=KEY_COLUMNS, sort=False)
+    )
+    return table.reset_index()
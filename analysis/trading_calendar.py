@@ -0,0 +1,138 @@
+"""Local NYSE trading calendar.
+
+Rule-based so it needs no data files or network access: weekdays minus the
+standard NYSE holidays (with the exchange's weekend observance rules), a short
+list of one-off closures, and the usual 1pm early closes. Used by the
+date-walking probes so they only request real sessions.
+"""
+from __future__ import annotations
+
+import datetime as dt
+from functools import lru_cache
+from typing import Iterator, NamedTuple
+
+# Unscheduled full-day closures (national days of mourning, etc.).
+SPECIAL_CLOSURES: dict[dt.date, str] = {
+    dt.date(2012, 10, 29): "Hurricane Sandy",
+    dt.date(2012, 10, 30): "Hurricane Sandy",
+    dt.date(2018, 12, 5): "National Day of Mourning (George H.W. Bush)",
+    dt.date(2025, 1, 9): "National Day of Mourning (Jimmy Carter)",
+}
+
+
+class Session(NamedTuple):
+    date: dt.date
+    early_close: bool
+
+
+def _easter(year: int) -> dt.date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return dt.date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> dt.date:
+    first = dt.date(year, month, 1)
+    offset = (weekday - first.weekday()) % 7
+    return first + dt.timedelta(days=offset + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> dt.date:
+    if month == 12:
+        last = dt.date(year, 12, 31)
+    else:
+        last = dt.date(year, month + 1, 1) - dt.timedelta(days=1)
+    return last - dt.timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: dt.date) -> dt.date:
+    """Saturday holidays move to Friday, Sunday holidays to Monday."""
+    if day.weekday() == 5:
+        return day - dt.timedelta(days=1)
+    if day.weekday() == 6:
+        return day + dt.timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=None)
+def holidays(year: int) -> dict[dt.date, str]:
+    """Full-day NYSE closures for `year`."""
+    result: dict[dt.date, str] = {}
+    new_year = dt.date(year, 1, 1)
+    # NYSE does not close on Friday Dec 31 when Jan 1 falls on a Saturday.
+    if new_year.weekday() != 5:
+        result[_observed(new_year)] = "New Year's Day"
+    result[_nth_weekday(year, 1, 0, 3)] = "Martin Luther King Jr. Day"
+    result[_nth_weekday(year, 2, 0, 3)] = "Washington's Birthday"
+    result[_easter(year) - dt.timedelta(days=2)] = "Good Friday"
+    result[_last_weekday(year, 5, 0)] = "Memorial Day"
+    if year >= 2022:
+        result[_observed(dt.date(year, 6, 19))] = "Juneteenth"
+    result[_observed(dt.date(year, 7, 4))] = "Independence Day"
+    result[_nth_weekday(year, 9, 0, 1)] = "Labor Day"
+    result[_nth_weekday(year, 11, 3, 4)] = "Thanksgiving Day"
+    result[_observed(dt.date(year, 12, 25))] = "Christmas Day"
+    for day, name in SPECIAL_CLOSURES.items():
+        if day.year == year:
+            result[day] = name
+    return result
+
+
+@lru_cache(maxsize=None)
+def early_closes(year: int) -> frozenset[dt.date]:
+    """1pm early-close sessions for `year`."""
+    candidates = [
+        dt.date(year, 7, 3),
+        _nth_weekday(year, 11, 3, 4) + dt.timedelta(days=1),
+        dt.date(year, 12, 24),
+    ]
+    return frozenset(day for day in candidates if is_session(day))
+
+
+def is_session(day: dt.date) -> bool:
+    return day.weekday() < 5 and day not in holidays(day.year)
+
+
+def is_early_close(day: dt.date) -> bool:
+    return day in early_closes(day.year)
+
+
+def sessions_between(start: dt.date, end: dt.date) -> list[Session]:
+    """All sessions in [start, end], oldest first."""
+    sessions: list[Session] = []
+    cursor = start
+    while cursor <= end:
+        if is_session(cursor):
+            sessions.append(Session(cursor, is_early_close(cursor)))
+        cursor += dt.timedelta(days=1)
+    return sessions
+
+
+def iter_sessions_back(end: dt.date | None = None) -> Iterator[Session]:
+    """Yield sessions on or before `end` (default: today), newest first."""
+    cursor = end or dt.date.today()
+    while True:
+        if is_session(cursor):
+            yield Session(cursor, is_early_close(cursor))
+        cursor -= dt.timedelta(days=1)
+
+
+def recent_sessions(count: int, end: dt.date | None = None) -> list[Session]:
+    """The `count` most recent sessions on or before `end`, newest first."""
+    sessions: list[Session] = []
+    if count <= 0:
+        return sessions
+    for session in iter_sessions_back(end):
+        sessions.append(session)
+        if len(sessions) >= count:
+            break
+    return sessions
@@ -49,6 +49,9 @@
 --     -v EXPORT_CSV=0 \\
 --     -v CSV_PATH=/tmp/grid_results.csv \\
 --     -f "$CODE_DIR/backtest_grid.sql"
+-- Local alternative: export the inputs once with analysis/grid_backtest_inputs.sql
+--   and run `python -m analysis grid-backtest` (folds/baselines/percentile gates
+--   stay SQL-only).
 -- Note on CSV export:
 --   CSV writing uses SQL COPY to STDOUT plus "\g :CSV_PATH". Pass CSV_PATH without quotes,
 --   e.g., -v EXPORT_CSV=1 -v CSV_PATH=/tmp/grid.csv